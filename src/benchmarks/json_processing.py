@@ -0,0 +1,167 @@
+'''
+ # @ : json_processing.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Benchmarks of the JSON processing quoted in doc/json_processing.md.
+
+ Run from the root of the repository on an inspect JSON:
+    python -m src.benchmarks.json_processing output/video.json
+
+ Without the AOM inspect tool, a JSON with the arrays of `ARRAY_KEYS` can be
+ written first (here at the resolution of the test video):
+    python -m src.benchmarks.json_processing output/video.json --synthetic 2048 872 21
+ '''
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from ..modules.json_processing import ARRAY_KEYS
+from ..modules.json_processing import JSON_BACKENDS
+from ..modules.json_processing import _json_backend_available
+from ..modules.json_processing import _label_blocks
+from ..modules.json_processing import block_id_dtype
+from ..modules.json_processing import get_motion_vectors
+from ..modules.json_processing import get_reference_frame
+from ..modules.json_processing import parse_frames
+
+
+def benchmark_json_backends(json_path: str, prefix: str = "frame") -> dict[str, float]:
+    """ This function is used to measure the parsing speed of every JSON backend.
+
+    The time includes the conversion of the arrays of `ARRAY_KEYS` to NumPy arrays.
+
+    Args:
+        json_path: Path to the JSON file.
+        prefix: ijson prefix of the frames.
+
+    Returns:
+        The parsing speed (MB/s) of every available backend.
+    """
+
+    size = os.path.getsize(json_path) / 2**20
+
+    result = {}
+    for backend in JSON_BACKENDS:
+
+        if not _json_backend_available(backend):
+            continue
+
+        start = time.perf_counter()
+        for frame_metadata in parse_frames(json_path, backend, prefix):
+            for key in ARRAY_KEYS:
+                if key in frame_metadata:
+                    np.asarray(frame_metadata[key])
+
+        result[backend] = size / (time.perf_counter() - start)
+
+    return result
+
+
+def write_inspect_json(json_path: str, width: int, height: int, number_frame: int, seed: int = 0) -> None:
+    """ This function is used to write a JSON laid out as the one of AOM inspect tool.
+
+    Frames are made of 16x16 blocks with random motion vectors (up to 8 pixels)
+    and reference frames. Only the arrays of `ARRAY_KEYS` are written, which are
+    most of the size of a real JSON.
+
+    Args:
+        json_path: Path to the JSON file.
+        width: Width of the frames (pixels).
+        height: Height of the frames (pixels).
+        number_frame: Number of frames.
+        seed: Seed of the random values.
+    """
+
+    rng = np.random.default_rng(seed)
+    rows, columns = height // 4, width // 4
+
+    def rows_text(values: np.ndarray) -> str:
+        return "[" + ",\n".join(json.dumps(row) for row in values.tolist()) + "]"
+
+    with open(json_path, "w", encoding="utf-8") as json_file:
+        json_file.write("{")
+
+        for frame_number in range(number_frame):
+
+            frame_text = {
+                "blockSize": rows_text(np.full((rows, columns), 6)),
+                "motionVectors": rows_text(rng.integers(-64, 65, (rows, columns, 4))),
+                "referenceFrame": rows_text(rng.integers(-1, 8, (rows, columns, 2))),
+            }
+
+            json_file.write(
+                ("," if frame_number else "")
+                + f'"frame": {{"frame": {frame_number}, "showFrame": 1, '
+                + ", ".join(f'"{key}": {text}' for key, text in frame_text.items())
+                + ', "config": {"MI_SIZE": 4}}'
+            )
+
+        json_file.write("}")
+
+
+def benchmark_frame_memory(frame_metadata: dict) -> dict[str, dict[str, int]]:
+    """ This function is used to measure the memory used by the arrays of a frame.
+
+    "before" is the size of the arrays at the pixel resolution with the default
+    dtypes (int64 block ids and reference frames, float64 motion vectors), as they
+    used to be built. "after" is the size of the block map, motion vectors and
+    reference frames built from the frame.
+
+    Args:
+        frame_metadata: Metadata of the frame (from the JSON or a `MetadataCache`).
+
+    Returns:
+        The bytes used by every array, before and after.
+    """
+
+    labels, origin_y, _ = _label_blocks(np.asarray(frame_metadata["blockSize"]))
+    labels = labels.astype(block_id_dtype(len(origin_y)), copy=False)
+    block_map = np.repeat(np.repeat(labels, 4, axis=0), 4, axis=1)
+
+    motion_vectors = get_motion_vectors(frame_metadata)
+    reference_frame = get_reference_frame(frame_metadata, list(range(8)))
+
+    return {
+        "blockMap": {
+            "before": block_map.size * np.dtype(np.int64).itemsize,
+            "after": block_map.nbytes,
+        },
+        "motionVectors": {
+            "before": int(np.prod(motion_vectors.shape)) * np.dtype(np.float64).itemsize,
+            "after": motion_vectors.values.nbytes,
+        },
+        "referenceFrame": {
+            "before": int(np.prod(reference_frame.shape)) * np.dtype(np.int64).itemsize,
+            "after": reference_frame.values.nbytes,
+        },
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("json_path", help="Inspect JSON generated by AOM inspect tool.")
+    parser.add_argument(
+        "--synthetic", nargs=3, type=int, metavar=("WIDTH", "HEIGHT", "FRAMES"),
+        help="Write a JSON of this size to json_path first (see `write_inspect_json`).",
+    )
+    arguments = parser.parse_args()
+
+    if arguments.synthetic:
+        write_inspect_json(arguments.json_path, *arguments.synthetic)
+
+    for backend, speed in benchmark_json_backends(arguments.json_path).items():
+        print(f"{backend}: {speed:.1f} MB/s")
+
+    frame_metadata = next(iter(parse_frames(arguments.json_path)))
+    for key, memory in benchmark_frame_memory(frame_metadata).items():
+        print(f"{key}: {memory['before'] / 1e6:.1f} MB -> {memory['after'] / 1e6:.1f} MB")
@@ -12,17 +12,12 @@
 
 
 import os
-import tempfile
 
 from datetime import datetime
 from tqdm import tqdm
 
-from .modules.io import check_ivf_file
-from .modules.io import copy_video
-from .modules.io import generate_json
-from .modules.io import process_images
-from .modules.json_processing import get_frame_ref_index
 from .modules.logger import start_logger
+from .modules.pipeline import run_pipeline
 
 
 def main(
@@ -30,7 +25,15 @@ def main(
     image_path: str = None,
     video_path: str = None,
     logger_level: str = "INFO",
-):
+    cache_folder: str = "output/cache",
+    pipe_encoding: bool = False,
+    ingestion: str = "auto",
+    threshold: float = 25,
+    window: int | str = None,
+    keyframes: bool = False,
+    streaming: bool = False,
+    workers: int = 1,
+) -> dict[str, str]:
 
     # Start logger.
     logger = start_logger(
@@ -40,27 +43,29 @@ def main(
 
     logger.info("Starting processing...")
 
-    logger.info("Generating temporary folder.")
-    # Generate a temporary folder.
-    temp_folder = tempfile.mkdtemp()
-
-
     if image_path:
         logger.info(f"Images as input.")
-
-        process_images(image_path, temp_folder, encoding_preset=encoding_preset)
-
     else:
         logger.info("No images as input.")
-        logger.info("Copying video to temporary folder.")
-        copy_video(video_path, temp_folder)
 
-    logger.info("Checking if the video is an ivf file.")
-    if check_ivf_file(os.path.join(temp_folder, "video.ivf")):
-        logger.info("Video is an ivf file.")
-    else:
-        logger.info("Video is not an ivf file.")
-        exit(1)
-    
-    logger.info("Processing the video.")
-    generate_json(temp_folder)
+    # Every stage is cached in the cache folder and only run again when its inputs
+    # or its parameters change.
+    paths = run_pipeline(
+        cache_folder,
+        logger,
+        image_path=image_path,
+        video_path=video_path,
+        encoding_preset=encoding_preset,
+        pipe=pipe_encoding,
+        ingestion=ingestion,
+        threshold=threshold,
+        window=window,
+        keyframes=keyframes,
+        streaming=streaming,
+        workers=workers,
+    )
+
+    logger.info(f"Adjacency saved in: {os.path.join(paths['adjacency'], 'adjacency.npz')}")
+    logger.info(f"COLMAP database saved in: {os.path.join(paths['colmap'], 'database.db')}")
+
+    return paths
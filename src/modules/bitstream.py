@@ -0,0 +1,497 @@
+'''
+ # @ : bitstream.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Read the order hints of the frames out of an AV1 ivf file.
+
+ The reference frames of the inspect JSON are reference types (LAST, GOLDEN,
+ etc.). The order hints map them to frame numbers. They are read directly from
+ the bitstream: the ivf file is split in OBUs and only the sequence header and
+ the start of every frame header are parsed (up to the reference frame indices),
+ following the uncompressed header syntax of the AV1 specification (section 5.9).
+ '''
+
+from typing import Iterator
+
+import numpy as np
+
+from .io import IVF_HEADER_SIZE
+from .io import check_ivf_file
+
+
+# Size of the header of every frame of an ivf file: frame size (uint32) and timestamp (uint64).
+IVF_FRAME_HEADER_SIZE = 12
+
+NUM_REF_FRAMES = 8
+REFS_PER_FRAME = 7
+
+OBU_SEQUENCE_HEADER = 1
+OBU_FRAME_HEADER = 3
+OBU_FRAME = 6
+
+KEY_FRAME = 0
+INTER_FRAME = 1
+INTRA_ONLY_FRAME = 2
+SWITCH_FRAME = 3
+
+# Value of seq_force_screen_content_tools and seq_force_integer_mv when they are signaled per frame.
+_SELECT = 2
+
+# Reference types (LAST_FRAME = 1 ... ALTREF_FRAME = 7), relatively to LAST_FRAME.
+_LAST2, _LAST3, _GOLDEN, _BWDREF, _ALTREF2, _ALTREF = 1, 2, 3, 4, 5, 6
+
+
+def get_frame_ref_index(temp_folder: str) -> np.ndarray:
+    """ This function is used to get the order hints out of AV1 bitstream.
+
+    When processing the metadata, if we check from reference frame index, we have
+    a number representing the type of frame (last, golden, etc). However, in our
+    case we would rather have the frame number.
+    The conversion array between frame type and frame number is the order hints.
+
+    Args:
+        temp_folder: Path to the temporary folder (with the video.ivf file).
+
+    Returns:
+        The order hints of every frame (int32 array of shape (number of frames, 8)).
+    """
+
+    return read_order_hints(f"{temp_folder}/video.ivf")
+
+
+def read_order_hints(ivf_path: str) -> np.ndarray:
+    """ Read the order hints of every frame of an AV1 ivf file.
+
+    There is one row per frame header, in decoding order. Column 0 is the intra
+    frame (always 0) and columns 1 to 7 are the order hints of the LAST to ALTREF
+    references. Intra frames and shown existing frames have no references, their
+    order hints are all 0.
+
+    Args:
+        ivf_path: Path to the ivf file.
+
+    Returns:
+        The order hints (int32 array of shape (number of frames, 8)).
+    """
+
+    if not check_ivf_file(ivf_path):
+        raise ValueError(f"{ivf_path} is not an AV1 ivf file.")
+
+    sequence_header = None
+    ref_order_hint = [0] * NUM_REF_FRAMES
+    ref_frame_type = [KEY_FRAME] * NUM_REF_FRAMES
+
+    order_hints = []
+
+    for frame in _ivf_frames(ivf_path):
+        for obu_type, temporal_id, spatial_id, payload in _obus(frame):
+
+            if obu_type == OBU_SEQUENCE_HEADER:
+                sequence_header = _parse_sequence_header(_BitReader(payload))
+
+            elif obu_type in (OBU_FRAME_HEADER, OBU_FRAME):
+                if sequence_header is None:
+                    raise ValueError(f"{ivf_path}: frame header before the sequence header.")
+
+                order_hints.append(_parse_frame_header(
+                    _BitReader(payload),
+                    sequence_header,
+                    ref_order_hint,
+                    ref_frame_type,
+                    temporal_id,
+                    spatial_id,
+                ))
+
+    return np.array(order_hints, dtype=np.int32).reshape(-1, NUM_REF_FRAMES)
+
+
+class _BitReader:
+    """ Read the bits of a buffer, most significant bit first. """
+
+    def __init__(self, data: bytes):
+
+        self._data = data
+        self._position = 0
+
+    def f(self, n: int) -> int:
+        """ Read an unsigned integer of n bits. """
+
+        value = 0
+        for _ in range(n):
+            byte = self._data[self._position >> 3]
+            value = (value << 1) | ((byte >> (7 - (self._position & 7))) & 1)
+            self._position += 1
+
+        return value
+
+    def uvlc(self) -> int:
+        """ Read a variable length unsigned integer. """
+
+        leading_zeros = 0
+        while not self.f(1):
+            leading_zeros += 1
+
+        if leading_zeros >= 32:
+            return (1 << 32) - 1
+
+        return self.f(leading_zeros) + (1 << leading_zeros) - 1
+
+
+def _leb128(data: bytes, offset: int) -> tuple[int, int]:
+    """ Read a leb128 integer.
+
+    Args:
+        data: The buffer.
+        offset: Position of the integer in the buffer.
+    Returns:
+        The value and the position after the integer.
+    """
+
+    value = 0
+    for index in range(8):
+        byte = data[offset + index]
+        value |= (byte & 0x7F) << (7 * index)
+
+        if not byte & 0x80:
+            return value, offset + index + 1
+
+    return value, offset + 8
+
+
+def _ivf_frames(ivf_path: str) -> Iterator[bytes]:
+    """ Iterate over the frames (temporal units) of an ivf file. """
+
+    with open(ivf_path, "rb") as ivf_file:
+        ivf_file.seek(IVF_HEADER_SIZE)
+
+        while len(header := ivf_file.read(IVF_FRAME_HEADER_SIZE)) == IVF_FRAME_HEADER_SIZE:
+            yield ivf_file.read(int.from_bytes(header[:4], "little"))
+
+
+def _obus(data: bytes) -> Iterator[tuple[int, int, int, memoryview]]:
+    """ Split a temporal unit in OBUs.
+
+    Args:
+        data: The temporal unit.
+    Returns:
+        An iterator over the type, temporal id, spatial id and payload of every OBU.
+    """
+
+    data = memoryview(data)
+    position = 0
+
+    while position < len(data):
+
+        header = data[position]
+        obu_type = (header >> 3) & 0xF
+        extension_flag = (header >> 2) & 1
+        has_size_field = (header >> 1) & 1
+        position += 1
+
+        temporal_id = spatial_id = 0
+        if extension_flag:
+            temporal_id = data[position] >> 5
+            spatial_id = (data[position] >> 3) & 0x3
+            position += 1
+
+        if has_size_field:
+            size, position = _leb128(data, position)
+        else:
+            size = len(data) - position
+
+        yield obu_type, temporal_id, spatial_id, data[position:position + size]
+
+        position += size
+
+
+def _parse_sequence_header(reader: _BitReader) -> dict:
+    """ Parse the fields of a sequence header needed by the frame headers. """
+
+    sequence_header = {}
+
+    reader.f(3)  # seq_profile
+    reader.f(1)  # still_picture
+    reduced = sequence_header["reduced_still_picture_header"] = reader.f(1)
+
+    sequence_header["decoder_model_info_present_flag"] = 0
+    sequence_header["equal_picture_interval"] = 0
+    sequence_header["decoder_model_present_for_this_op"] = [0]
+    sequence_header["operating_point_idc"] = [0]
+
+    if reduced:
+        reader.f(5)  # seq_level_idx[0]
+
+    else:
+        if reader.f(1):  # timing_info_present_flag
+            reader.f(32)  # num_units_in_display_tick
+            reader.f(32)  # time_scale
+            sequence_header["equal_picture_interval"] = reader.f(1)
+            if sequence_header["equal_picture_interval"]:
+                reader.uvlc()  # num_ticks_per_picture_minus_1
+
+            sequence_header["decoder_model_info_present_flag"] = reader.f(1)
+            if sequence_header["decoder_model_info_present_flag"]:
+                sequence_header["buffer_delay_length"] = reader.f(5) + 1
+                reader.f(32)  # num_units_in_decoding_tick
+                sequence_header["buffer_removal_time_length"] = reader.f(5) + 1
+                sequence_header["frame_presentation_time_length"] = reader.f(5) + 1
+
+        initial_display_delay_present_flag = reader.f(1)
+        operating_points_cnt = reader.f(5) + 1
+
+        sequence_header["operating_point_idc"] = []
+        sequence_header["decoder_model_present_for_this_op"] = []
+
+        for _ in range(operating_points_cnt):
+            sequence_header["operating_point_idc"].append(reader.f(12))
+
+            if reader.f(5) > 7:  # seq_level_idx
+                reader.f(1)  # seq_tier
+
+            decoder_model_present = 0
+            if sequence_header["decoder_model_info_present_flag"]:
+                decoder_model_present = reader.f(1)
+                if decoder_model_present:
+                    reader.f(sequence_header["buffer_delay_length"])  # decoder_buffer_delay
+                    reader.f(sequence_header["buffer_delay_length"])  # encoder_buffer_delay
+                    reader.f(1)  # low_delay_mode_flag
+            sequence_header["decoder_model_present_for_this_op"].append(decoder_model_present)
+
+            if initial_display_delay_present_flag and reader.f(1):
+                reader.f(4)  # initial_display_delay_minus_1
+
+    frame_width_bits = reader.f(4) + 1
+    frame_height_bits = reader.f(4) + 1
+    reader.f(frame_width_bits)  # max_frame_width_minus_1
+    reader.f(frame_height_bits)  # max_frame_height_minus_1
+
+    sequence_header["frame_id_numbers_present_flag"] = 0 if reduced else reader.f(1)
+    if sequence_header["frame_id_numbers_present_flag"]:
+        sequence_header["delta_frame_id_length"] = reader.f(4) + 2
+        sequence_header["id_length"] = reader.f(3) + 1 + sequence_header["delta_frame_id_length"]
+
+    reader.f(1)  # use_128x128_superblock
+    reader.f(1)  # enable_filter_intra
+    reader.f(1)  # enable_intra_edge_filter
+
+    sequence_header["enable_order_hint"] = 0
+    sequence_header["seq_force_screen_content_tools"] = _SELECT
+    sequence_header["seq_force_integer_mv"] = _SELECT
+    sequence_header["order_hint_bits"] = 0
+
+    if not reduced:
+        reader.f(1)  # enable_interintra_compound
+        reader.f(1)  # enable_masked_compound
+        reader.f(1)  # enable_warped_motion
+        reader.f(1)  # enable_dual_filter
+        sequence_header["enable_order_hint"] = reader.f(1)
+        if sequence_header["enable_order_hint"]:
+            reader.f(1)  # enable_jnt_comp
+            reader.f(1)  # enable_ref_frame_mvs
+
+        if not reader.f(1):  # seq_choose_screen_content_tools
+            sequence_header["seq_force_screen_content_tools"] = reader.f(1)
+
+        if sequence_header["seq_force_screen_content_tools"] > 0:
+            if not reader.f(1):  # seq_choose_integer_mv
+                sequence_header["seq_force_integer_mv"] = reader.f(1)
+
+        if sequence_header["enable_order_hint"]:
+            sequence_header["order_hint_bits"] = reader.f(3) + 1
+
+    return sequence_header
+
+
+def _parse_frame_header(
+    reader: _BitReader,
+    sequence_header: dict,
+    ref_order_hint: list[int],
+    ref_frame_type: list[int],
+    temporal_id: int,
+    spatial_id: int
+) -> list[int]:
+    """ Parse a frame header up to the reference frame indices.
+
+    Args:
+        reader: Reader of the frame header OBU.
+        sequence_header: The active sequence header.
+        ref_order_hint: Order hint of the frame in every reference slot (updated).
+        ref_frame_type: Frame type of the frame in every reference slot (updated).
+        temporal_id, spatial_id: Layer of the OBU.
+    Returns:
+        The order hints of the intra frame and of the 7 references.
+    """
+
+    all_frames = (1 << NUM_REF_FRAMES) - 1
+    id_length = sequence_header.get("id_length", 0)
+    order_hints = [0] * NUM_REF_FRAMES
+
+    if sequence_header["reduced_still_picture_header"]:
+        frame_type, show_frame, error_resilient_mode = KEY_FRAME, 1, 1
+
+    else:
+        if reader.f(1):  # show_existing_frame
+            frame_to_show_map_idx = reader.f(3)
+
+            if sequence_header["decoder_model_info_present_flag"] and not sequence_header["equal_picture_interval"]:
+                reader.f(sequence_header["frame_presentation_time_length"])  # frame_presentation_time
+            if sequence_header["frame_id_numbers_present_flag"]:
+                reader.f(id_length)  # display_frame_id
+
+            # Showing a key frame refreshes all the references with it.
+            if ref_frame_type[frame_to_show_map_idx] == KEY_FRAME:
+                hint = ref_order_hint[frame_to_show_map_idx]
+                ref_order_hint[:] = [hint] * NUM_REF_FRAMES
+                ref_frame_type[:] = [KEY_FRAME] * NUM_REF_FRAMES
+
+            return order_hints
+
+        frame_type = reader.f(2)
+        show_frame = reader.f(1)
+
+        if show_frame and sequence_header["decoder_model_info_present_flag"] \
+                and not sequence_header["equal_picture_interval"]:
+            reader.f(sequence_header["frame_presentation_time_length"])  # frame_presentation_time
+
+        if not show_frame:
+            reader.f(1)  # showable_frame
+
+        if frame_type == SWITCH_FRAME or (frame_type == KEY_FRAME and show_frame):
+            error_resilient_mode = 1
+        else:
+            error_resilient_mode = reader.f(1)
+
+    frame_is_intra = frame_type in (KEY_FRAME, INTRA_ONLY_FRAME)
+
+    if frame_type == KEY_FRAME and show_frame:
+        ref_order_hint[:] = [0] * NUM_REF_FRAMES
+
+    reader.f(1)  # disable_cdf_update
+
+    allow_screen_content_tools = sequence_header["seq_force_screen_content_tools"]
+    if allow_screen_content_tools == _SELECT:
+        allow_screen_content_tools = reader.f(1)
+
+    if allow_screen_content_tools and sequence_header["seq_force_integer_mv"] == _SELECT:
+        reader.f(1)  # force_integer_mv
+
+    if sequence_header["frame_id_numbers_present_flag"]:
+        reader.f(id_length)  # current_frame_id
+
+    if frame_type != SWITCH_FRAME and not sequence_header["reduced_still_picture_header"]:
+        reader.f(1)  # frame_size_override_flag
+
+    order_hint = reader.f(sequence_header["order_hint_bits"])
+
+    if not (frame_is_intra or error_resilient_mode):
+        reader.f(3)  # primary_ref_frame
+
+    if sequence_header["decoder_model_info_present_flag"] and reader.f(1):  # buffer_removal_time_present_flag
+        for operating_point_idc, decoder_model_present in zip(
+            sequence_header["operating_point_idc"],
+            sequence_header["decoder_model_present_for_this_op"],
+        ):
+            if not decoder_model_present:
+                continue
+
+            in_temporal_layer = (operating_point_idc >> temporal_id) & 1
+            in_spatial_layer = (operating_point_idc >> (spatial_id + 8)) & 1
+            if operating_point_idc == 0 or (in_temporal_layer and in_spatial_layer):
+                reader.f(sequence_header["buffer_removal_time_length"])  # buffer_removal_time
+
+    if frame_type == SWITCH_FRAME or (frame_type == KEY_FRAME and show_frame):
+        refresh_frame_flags = all_frames
+    else:
+        refresh_frame_flags = reader.f(8)
+
+    if (not frame_is_intra or refresh_frame_flags != all_frames) \
+            and error_resilient_mode and sequence_header["enable_order_hint"]:
+        for index in range(NUM_REF_FRAMES):
+            ref_order_hint[index] = reader.f(sequence_header["order_hint_bits"])
+
+    if not frame_is_intra:
+
+        frame_refs_short_signaling = sequence_header["enable_order_hint"] and reader.f(1)
+        ref_frame_idx = [0] * REFS_PER_FRAME
+
+        if frame_refs_short_signaling:
+            last_frame_idx = reader.f(3)
+            gold_frame_idx = reader.f(3)
+            ref_frame_idx = _set_frame_refs(
+                last_frame_idx, gold_frame_idx, order_hint, ref_order_hint, sequence_header["order_hint_bits"]
+            )
+
+        for index in range(REFS_PER_FRAME):
+            if not frame_refs_short_signaling:
+                ref_frame_idx[index] = reader.f(3)
+            if sequence_header["frame_id_numbers_present_flag"]:
+                reader.f(sequence_header["delta_frame_id_length"])  # delta_frame_id_minus_1
+
+        order_hints[1:] = [ref_order_hint[index] for index in ref_frame_idx]
+
+    # Reference frame update process.
+    for index in range(NUM_REF_FRAMES):
+        if (refresh_frame_flags >> index) & 1:
+            ref_order_hint[index] = order_hint
+            ref_frame_type[index] = frame_type
+
+    return order_hints
+
+
+def _set_frame_refs(
+    last_frame_idx: int,
+    gold_frame_idx: int,
+    order_hint: int,
+    ref_order_hint: list[int],
+    order_hint_bits: int
+) -> list[int]:
+    """ Infer the reference frame indices of a frame with short signaling (section 7.8). """
+
+    ref_frame_idx = [-1] * REFS_PER_FRAME
+    ref_frame_idx[0] = last_frame_idx
+    ref_frame_idx[_GOLDEN] = gold_frame_idx
+
+    used_frame = [False] * NUM_REF_FRAMES
+    used_frame[last_frame_idx] = used_frame[gold_frame_idx] = True
+
+    # Order hints relatively to the current frame, shifted so they are all positive.
+    current_hint = 1 << (order_hint_bits - 1)
+    middle = 1 << (order_hint_bits - 1)
+    shifted_order_hints = [
+        current_hint + ((hint - order_hint) & (middle - 1)) - ((hint - order_hint) & middle)
+        for hint in ref_order_hint
+    ]
+
+    def find(backward: bool, latest: bool) -> int:
+        reference, best = -1, None
+        for index, hint in enumerate(shifted_order_hints):
+            if used_frame[index] or (hint >= current_hint) != backward:
+                continue
+            if reference < 0 or (hint >= best if latest else hint < best):
+                reference, best = index, hint
+        return reference
+
+    # ALTREF is the furthest backward reference, BWDREF and ALTREF2 the closest ones.
+    for reference_type, latest in ((_ALTREF, True), (_BWDREF, False), (_ALTREF2, False)):
+        reference = find(backward=True, latest=latest)
+        if reference >= 0:
+            ref_frame_idx[reference_type] = reference
+            used_frame[reference] = True
+
+    # The remaining references are the closest forward references.
+    for reference_type in (_LAST2, _LAST3, _BWDREF, _ALTREF2, _ALTREF):
+        if ref_frame_idx[reference_type] < 0:
+            reference = find(backward=False, latest=True)
+            if reference >= 0:
+                ref_frame_idx[reference_type] = reference
+                used_frame[reference] = True
+
+    # Anything left is the reference with the earliest order hint.
+    earliest = min(range(NUM_REF_FRAMES), key=lambda index: shifted_order_hints[index])
+
+    return [earliest if index < 0 else index for index in ref_frame_idx]
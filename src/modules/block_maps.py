@@ -0,0 +1,321 @@
+'''
+ # @ : block_maps.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Compressed storage of the block maps of all the frames.
+
+ Block maps are piecewise constant: every block is a rectangle of the same id and
+ blocks are aligned on the 4x4 grid of AV1. A block map is stored at the grid
+ resolution when it is constant on every 4x4 cell, then split in chunks of rows.
+ Every chunk is delta encoded (along the rows, then along the columns), which
+ leaves almost only zeros, and compressed with zlib (or zstd if it is installed).
+
+ The area in pixels of every block is stored with the block map, so the coverage
+ of the matches can be computed without reading the block maps.
+
+ The store is a container (see `container`), the codec is saved in its flags:
+    - data: compressed chunks and block areas of every frame, one after the other.
+    - tables: for every frame, its number, shape, dtype, chunks and block areas,
+      then the offset and size of every chunk.
+ '''
+
+import os
+import zlib
+
+import numpy as np
+
+from .container import ContainerReader
+from .container import ContainerWriter
+
+
+BLOCK_MAP_MAGIC = b"AV1SFMBM"
+BLOCK_MAP_VERSION = 3
+BLOCK_MAP_CODECS = ("zlib", "zstd")
+
+_INDEX_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("height", "<i8"),
+    ("width", "<i8"),
+    ("scale", "<u1"),
+    ("dtype", "S3"),
+    ("chunk_rows", "<u4"),
+    ("first_chunk", "<u8"),
+    ("number_chunk", "<u8"),
+    ("areas_offset", "<u8"),
+    ("number_block", "<u8"),
+])
+
+_CHUNK_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("size", "<u8"),
+])
+
+
+def block_map_store_path(temp_folder: str) -> str:
+    """ Get the path of the block map store of a temporary folder.
+
+    Args:
+        temp_folder: Path to the temporary folder.
+    Returns:
+        The path of the block map store.
+    """
+
+    return os.path.join(temp_folder, "block_maps.bin")
+
+
+class BlockMapWriter(ContainerWriter):
+    """ Write block maps in a block map store, one frame at a time.
+
+    The store is written to a temporary file and moved to its path when it is
+    closed, so readers never see a partial store.
+
+    Args:
+        path: Path to the block map store (overwritten).
+        codec: "zlib", "zstd" or "auto" (zstd if the zstandard package is installed).
+        chunk_rows: Number of rows (at the stored resolution) of every chunk.
+        level: Compression level.
+    """
+
+    MAGIC = BLOCK_MAP_MAGIC
+    VERSION = BLOCK_MAP_VERSION
+
+    def __init__(self, path: str, codec: str = "auto", chunk_rows: int = 16, level: int = 3):
+
+        if codec == "auto":
+            codec = "zstd" if _zstd_available() else "zlib"
+
+        if codec not in BLOCK_MAP_CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+
+        super().__init__(path)
+
+        self.codec = codec
+        self.chunk_rows = chunk_rows
+        self.flags = BLOCK_MAP_CODECS.index(codec)
+
+        self._compress = _compressor(codec, level)
+        self._index = []
+        self._chunks = []
+
+    def write(self, frame_number: int, block_map: np.ndarray, block_areas: np.ndarray = None) -> None:
+        """ Append the block map of a frame.
+
+        Args:
+            frame_number: The frame number.
+            block_map: The block map of the frame.
+            block_areas: The area of every block in pixels (as given by `get_block_map`).
+                Counted from the block map if not given.
+        """
+
+        block_map = np.asarray(block_map)
+        block_map = block_map.astype(block_map.dtype.newbyteorder("<"), copy=False)
+
+        height, width = block_map.shape
+        scale = 4 if _is_constant_on_cells(block_map, 4) else 1
+        grid = block_map[::scale, ::scale]
+
+        entry = np.zeros((), dtype=_INDEX_DTYPE)
+        entry["frame"] = frame_number
+        entry["height"] = height
+        entry["width"] = width
+        entry["scale"] = scale
+        entry["dtype"] = grid.dtype.str.encode()
+        entry["chunk_rows"] = self.chunk_rows
+        entry["first_chunk"] = len(self._chunks)
+
+        for start in range(0, len(grid), self.chunk_rows):
+
+            chunk = self._compress(_delta_encode(grid[start:start + self.chunk_rows]).tobytes())
+
+            self._chunks.append((self._append(chunk), len(chunk)))
+
+        entry["number_chunk"] = len(self._chunks) - entry["first_chunk"]
+
+        if block_areas is None:
+            block_areas = np.bincount(block_map.ravel())
+
+        block_areas = np.asarray(block_areas, dtype="<i4")
+
+        entry["areas_offset"] = self._append(block_areas)
+        entry["number_block"] = len(block_areas)
+
+        self._index.append(entry)
+
+    def _tables(self) -> list[np.ndarray]:
+
+        return [np.array(self._index, dtype=_INDEX_DTYPE), np.array(self._chunks, dtype=_CHUNK_DTYPE)]
+
+
+class BlockMapStore(ContainerReader):
+    """ Random access to the block maps of a block map store.
+
+    Only the chunks covering the requested rows are decompressed, so a region of
+    a frame can be read without decoding the whole block map.
+
+    Args:
+        path: Path to the block map store.
+    """
+
+    MAGIC = BLOCK_MAP_MAGIC
+    VERSION = BLOCK_MAP_VERSION
+    DESCRIPTION = "block map store"
+    TABLE_DTYPES = (_INDEX_DTYPE, _CHUNK_DTYPE)
+
+    def __init__(self, path: str):
+
+        super().__init__(path)
+
+        self.codec = BLOCK_MAP_CODECS[self.flags]
+        self._decompress = _decompressor(self.codec)
+        self._chunks = self._tables[1]
+
+    def shape(self, frame_number: int) -> tuple[int, int]:
+        """ Get the shape of the block map of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The height and width of the block map.
+        """
+
+        entry = self._entry(frame_number)
+
+        return int(entry["height"]), int(entry["width"])
+
+    def areas(self, frame_number: int) -> np.ndarray:
+        """ Get the area of every block of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The area of every block in pixels (read-only view of the file).
+        """
+
+        entry = self._entry(frame_number)
+
+        return self._view(int(entry["areas_offset"]), int(entry["number_block"]), "<i4")
+
+    def read(self, frame_number: int) -> np.ndarray:
+        """ Read the block map of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The block map of the frame.
+        """
+
+        height, width = self.shape(frame_number)
+
+        return self.read_region(frame_number, 0, height, 0, width)
+
+    def read_region(self, frame_number: int, top: int, bottom: int, left: int, right: int) -> np.ndarray:
+        """ Read a region of the block map of a frame.
+
+        Args:
+            frame_number: The frame number.
+            top, bottom: First and last (excluded) rows of the region, in pixels.
+            left, right: First and last (excluded) columns of the region, in pixels.
+        Returns:
+            The block map of the region.
+        """
+
+        entry = self._entry(frame_number)
+
+        height, width = int(entry["height"]), int(entry["width"])
+        top, bottom = max(top, 0), min(bottom, height)
+        left, right = max(left, 0), min(right, width)
+
+        scale = int(entry["scale"])
+        chunk_rows = int(entry["chunk_rows"])
+        dtype = np.dtype(entry["dtype"].decode())
+        grid_width = -(-width // scale)
+
+        if bottom <= top or right <= left:
+            return np.empty((max(bottom - top, 0), max(right - left, 0)), dtype=dtype)
+
+        # Chunks covering the rows of the region.
+        first = top // scale // chunk_rows
+        last = (bottom - 1) // scale // chunk_rows
+
+        rows = []
+        for chunk_index in range(first, last + 1):
+
+            offset, size = self._chunks[int(entry["first_chunk"]) + chunk_index].tolist()
+            chunk = np.frombuffer(self._decompress(self._data[offset:offset + size]), dtype=dtype)
+            rows.append(_delta_decode(chunk.reshape(-1, grid_width)))
+
+        grid = np.concatenate(rows)
+
+        # Back to pixels, relatively to the first row of the first chunk.
+        origin = first * chunk_rows * scale
+        grid = grid[(top - origin) // scale:-(-(bottom - origin) // scale), left // scale:-(-right // scale)]
+        block_map = np.repeat(np.repeat(grid, scale, axis=0), scale, axis=1)
+
+        return block_map[(top - origin) % scale:, left % scale:][:bottom - top, :right - left]
+
+
+def _is_constant_on_cells(block_map: np.ndarray, scale: int) -> bool:
+    """ Check if a block map is made of constant cells of scale x scale pixels. """
+
+    height, width = block_map.shape
+
+    if height % scale or width % scale:
+        return False
+
+    cells = block_map.reshape(height // scale, scale, width // scale, scale)
+
+    return bool(np.all(cells == cells[:, :1, :, :1]))
+
+
+def _delta_encode(grid: np.ndarray) -> np.ndarray:
+    """ Delta encode a chunk along the rows, then along the columns (with wrap-around). """
+
+    delta = grid.copy()
+    delta[:, 1:] = grid[:, 1:] - grid[:, :-1]
+    delta[1:, :] = delta[1:, :] - delta[:-1, :]
+
+    return delta
+
+
+def _delta_decode(delta: np.ndarray) -> np.ndarray:
+    """ Invert `_delta_encode`. """
+
+    grid = np.cumsum(delta, axis=0, dtype=delta.dtype)
+
+    return np.cumsum(grid, axis=1, dtype=delta.dtype)
+
+
+def _zstd_available() -> bool:
+
+    try:
+        import zstandard
+    except ImportError:
+        return False
+
+    return True
+
+
+def _compressor(codec: str, level: int):
+
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=level).compress
+
+    return lambda data: zlib.compress(data, level)
+
+
+def _decompressor(codec: str):
+
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ImportError("zstandard is required to read block maps compressed with zstd.") from error
+        return zstandard.ZstdDecompressor().decompress
+
+    return zlib.decompress
@@ -0,0 +1,281 @@
+'''
+ # @ : colmap.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Export the features and the matches to a COLMAP database.
+
+ COLMAP reads its inputs from a SQLite database. Keypoints (x, y, scale,
+ orientation) come from the keypoint store, matches from the match store and only
+ the pairs of adjacent frames (see `sfm.image_adjacency_matrix`) are written.
+
+ The COLMAP mapper only reconstructs from the two view geometries. The matches of
+ the motion vectors are already consistent, so every adjacent pair gets a two view
+ geometry with all its matches as inliers, a calibrated configuration and identity
+ matrices: the database can be given to the mapper as is. Running
+ `colmap matches_importer` on it estimates the geometries instead.
+ Arrays are stored as blobs of raw NumPy data and every table is filled with a
+ single `executemany`, in one transaction per table (the matches and the two view
+ geometries share theirs).
+ '''
+
+import os
+import sqlite3
+
+import numpy as np
+
+from .block_maps import BlockMapStore
+from .block_maps import block_map_store_path
+from .keypoints import KeypointStore
+from .keypoints import keypoint_store_path
+from .matches import MatchStore
+
+
+# Pair ids encode both image ids: image_id1 * MAX_IMAGE_ID + image_id2.
+MAX_IMAGE_ID = 2**31 - 1
+
+# COLMAP camera model.
+SIMPLE_PINHOLE = 0
+
+# COLMAP two view geometry configuration.
+CALIBRATED = 2
+
+# Matrices and pose of the two view geometries (see `export_colmap_database`).
+_IDENTITY = np.eye(3, dtype=np.float64).tobytes()
+_QVEC = np.array([1, 0, 0, 0], dtype=np.float64).tobytes()
+_TVEC = np.zeros(3, dtype=np.float64).tobytes()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cameras (
+    camera_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    model INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    params BLOB,
+    prior_focal_length INTEGER NOT NULL);
+
+CREATE TABLE IF NOT EXISTS images (
+    image_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    name TEXT NOT NULL UNIQUE,
+    camera_id INTEGER NOT NULL,
+    prior_qw REAL,
+    prior_qx REAL,
+    prior_qy REAL,
+    prior_qz REAL,
+    prior_tx REAL,
+    prior_ty REAL,
+    prior_tz REAL,
+    CONSTRAINT image_id_check CHECK(image_id >= 0 and image_id < {max_image_id}),
+    FOREIGN KEY(camera_id) REFERENCES cameras(camera_id));
+
+CREATE TABLE IF NOT EXISTS keypoints (
+    image_id INTEGER PRIMARY KEY NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    data BLOB,
+    FOREIGN KEY(image_id) REFERENCES images(image_id) ON DELETE CASCADE);
+
+CREATE TABLE IF NOT EXISTS descriptors (
+    image_id INTEGER PRIMARY KEY NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    data BLOB,
+    FOREIGN KEY(image_id) REFERENCES images(image_id) ON DELETE CASCADE);
+
+CREATE TABLE IF NOT EXISTS matches (
+    pair_id INTEGER PRIMARY KEY NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    data BLOB);
+
+CREATE TABLE IF NOT EXISTS two_view_geometries (
+    pair_id INTEGER PRIMARY KEY NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    data BLOB,
+    config INTEGER NOT NULL,
+    F BLOB,
+    E BLOB,
+    H BLOB,
+    qvec BLOB,
+    tvec BLOB);
+
+CREATE UNIQUE INDEX IF NOT EXISTS index_name ON images(name);
+""".format(max_image_id=MAX_IMAGE_ID)
+
+
+def pair_id(image_id1: np.ndarray, image_id2: np.ndarray) -> np.ndarray:
+    """ Compute the COLMAP pair ids of pairs of images.
+
+    Args:
+        image_id1: Id of the first image of every pair.
+        image_id2: Id of the second image of every pair.
+    Returns:
+        The pair ids (the order of the images in a pair does not matter).
+    """
+
+    image_id1 = np.asarray(image_id1, dtype=np.int64)
+    image_id2 = np.asarray(image_id2, dtype=np.int64)
+
+    return np.minimum(image_id1, image_id2) * MAX_IMAGE_ID + np.maximum(image_id1, image_id2)
+
+
+def export_colmap_database(
+    database_path: str,
+    temp_folder: str,
+    matches: MatchStore,
+    pairs: np.ndarray,
+    focal_length: float = None,
+    image_paths: list[str] = None
+) -> str:
+    """ Write the keypoints and the matches of the adjacent frames to a COLMAP database.
+
+    Frame `n` is the image `n + 1`, named after the `n`-th image path. All the
+    images share a simple pinhole camera, sized after the block maps. Keypoints are
+    shifted by half a pixel to the COLMAP convention (center of the first pixel at
+    (0.5, 0.5)). Every pair of adjacent frames with matches gets a row in the
+    matches table and a two view geometry with the same matches as inliers (see
+    the module description).
+
+    Args:
+        database_path: Path to the database (overwritten).
+        temp_folder: Path to the temporary folder (with the block map and keypoint stores).
+        matches: The matches with feature ids populated.
+        pairs: The pairs of adjacent frames (see `sfm.image_adjacency_matrix`).
+        focal_length: Focal length in pixels (1.2 * the largest image side if None).
+        image_paths: Path to the image of every frame (see `io.get_ingested_images`).
+            The images are named after the base names, so COLMAP image path is the
+            folder of the images. Named like `io.copy_images` if None.
+    Returns:
+        The path to the database.
+    """
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    frames = np.unique(pairs)
+
+    if os.path.exists(database_path):
+        os.remove(database_path)
+
+    connection = sqlite3.connect(database_path)
+    connection.executescript(_SCHEMA)
+
+    # Camera, from the size of the block map of the first frame.
+    height, width = BlockMapStore(block_map_store_path(temp_folder)).shape(int(frames[0])) \
+        if len(frames) else (0, 0)
+    prior_focal_length = focal_length is not None
+    focal_length = focal_length if prior_focal_length else 1.2 * max(width, height)
+    params = np.array([focal_length, width / 2, height / 2], dtype=np.float64)
+
+    with connection:
+        connection.execute(
+            "INSERT INTO cameras VALUES (?, ?, ?, ?, ?, ?)",
+            (1, SIMPLE_PINHOLE, width, height, params.tobytes(), int(prior_focal_length)),
+        )
+
+    image_names = _image_names(image_paths, int(frames.max()) + 1 if len(frames) else 0)
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO images VALUES (?, ?, ?, NULL, NULL, NULL, NULL, NULL, NULL, NULL)",
+            ((int(frame) + 1, image_names[frame], 1) for frame in frames),
+        )
+
+    keypoints = KeypointStore(keypoint_store_path(temp_folder)) if len(frames) else None
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO keypoints VALUES (?, ?, ?, ?)",
+            ((int(frame) + 1, *_blob(_keypoint_array(keypoints, int(frame)))) for frame in frames),
+        )
+
+    grouped_matches = [(identifier, *_blob(feature_ids)) for identifier, feature_ids in _group_matches(matches, pairs)]
+
+    with connection:
+        connection.executemany("INSERT INTO matches VALUES (?, ?, ?, ?)", grouped_matches)
+        connection.executemany(
+            "INSERT INTO two_view_geometries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((*row, CALIBRATED, _IDENTITY, _IDENTITY, _IDENTITY, _QVEC, _TVEC) for row in grouped_matches),
+        )
+
+    connection.close()
+
+    return database_path
+
+
+def _image_names(image_paths: list[str], number_frame: int) -> list[str]:
+    """ Get the name of the image of every frame (see `export_colmap_database`). """
+
+    if image_paths is None:
+        width = max(4, len(str(number_frame - 1)))
+        return [f"frame_{frame:0{width}d}.png" for frame in range(number_frame)]
+
+    if len(image_paths) < number_frame:
+        raise ValueError(f"{len(image_paths)} images for {number_frame} frames.")
+
+    return [os.path.basename(image_path) for image_path in image_paths]
+
+
+def _keypoint_array(keypoints: KeypointStore, frame_number: int) -> np.ndarray:
+    """ Get the keypoints of a frame as a float32 array of (x, y, scale, orientation).
+
+    The keypoint store puts the center of the first pixel at (0, 0) and COLMAP at
+    (0.5, 0.5), so the keypoints are shifted by half a pixel.
+    """
+
+    keypoint_array = np.array(keypoints.read(frame_number).view("<f4").reshape(-1, 4), dtype=np.float32)
+    keypoint_array[:, :2] += 0.5
+
+    return keypoint_array
+
+
+def _group_matches(matches: MatchStore, pairs: np.ndarray):
+    """ Group the feature ids of the matches by pair of adjacent frames.
+
+    Args:
+        matches: The matches with feature ids populated.
+        pairs: The pairs of adjacent frames (lower frame first).
+    Returns:
+        An iterator over the pair id and the unique feature id pairs (uint32) of
+        every pair of frames with matches.
+    """
+
+    source_frame = matches["source_frame"].astype(np.int64)
+    target_frame = matches["target_frame"].astype(np.int64)
+    feature_ids = np.stack((matches["feature_id"], matches["feature_id_target"]), axis=1)
+
+    # Lower frame first.
+    swap = source_frame > target_frame
+    source_frame, target_frame = np.where(swap, target_frame, source_frame), np.where(swap, source_frame, target_frame)
+    feature_ids[swap] = feature_ids[swap, ::-1]
+
+    identifiers = pair_id(source_frame + 1, target_frame + 1)
+    keep = np.isin(identifiers, pair_id(pairs[:, 0] + 1, pairs[:, 1] + 1)) & np.all(feature_ids >= 0, axis=1)
+
+    identifiers, feature_ids = identifiers[keep], feature_ids[keep]
+    if len(identifiers) == 0:
+        return
+
+    # Sort by pair, then by feature ids, and drop the duplicated matches.
+    order = np.lexsort((feature_ids[:, 1], feature_ids[:, 0], identifiers))
+    identifiers, feature_ids = identifiers[order], feature_ids[order]
+
+    unique = np.ones(len(identifiers), dtype=bool)
+    unique[1:] = (identifiers[1:] != identifiers[:-1]) | np.any(feature_ids[1:] != feature_ids[:-1], axis=1)
+    identifiers, feature_ids = identifiers[unique], feature_ids[unique].astype(np.uint32)
+
+    starts = np.flatnonzero(np.diff(identifiers)) + 1
+
+    for identifier, pair_rows in zip(identifiers[np.r_[0, starts]].tolist(), np.split(feature_ids, starts)):
+        yield identifier, pair_rows
+
+
+def _blob(array: np.ndarray) -> tuple[int, int, bytes]:
+    """ Pack a 2D array as the rows, cols and data columns of a COLMAP table. """
+
+    array = np.ascontiguousarray(array)
+
+    return array.shape[0], array.shape[1], array.tobytes()
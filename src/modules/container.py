@@ -0,0 +1,186 @@
+'''
+ # @ : container.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Binary container shared by the stores of the frames.
+
+ The metadata cache, the block map store and the keypoint store save data for
+ every frame in a single file that is memory mapped by the readers. They share
+ the same container, and only define their magic, their version and the tables
+ of their index.
+
+ File layout:
+    - header: magic, version, flags, number of tables, offset of the directory.
+    - data: the data of every frame, one after the other.
+    - tables: structured arrays describing the data. The first table is the index
+      of the frames and has a "frame" field.
+    - directory: the offset and the number of rows of every table.
+
+ A container is written to a temporary file of its folder (a unique one, so two
+ writers of the same path do not share it) that is moved to its path when it is
+ closed, so readers never see a partial container. When the `with` body of a
+ writer raises, the temporary file is deleted instead.
+ '''
+
+import abc
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+
+# Magic (8 bytes), version (uint32), flags and number of tables (uint16) and directory offset (uint64).
+_HEADER = struct.Struct("<8sIHHQ")
+
+_DIRECTORY_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("count", "<u8"),
+])
+
+
+class ContainerWriter(abc.ABC):
+    """ Write a container, one frame at a time.
+
+    Subclasses define `MAGIC` and `VERSION`, write the data of the frames with
+    `_append` and return the tables of their index from `_tables`.
+
+    Args:
+        path: Path to the container (overwritten).
+    """
+
+    MAGIC = b""
+    VERSION = 0
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.flags = 0
+
+        descriptor, self._temp_path = tempfile.mkstemp(
+            prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or "."
+        )
+        self._file = os.fdopen(descriptor, mode="wb")
+        self._file.write(_HEADER.pack(self.MAGIC, self.VERSION, 0, 0, 0))
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # A container interrupted by an exception is incomplete: it is never published.
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def close(self) -> None:
+        """ Write the tables and the header, close the file and move it to its path. """
+
+        tables = self._tables()
+
+        directory = np.zeros(len(tables), dtype=_DIRECTORY_DTYPE)
+        for position, table in enumerate(tables):
+            directory[position] = self._append(table), len(table)
+
+        directory_offset = self._append(directory)
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(self.MAGIC, self.VERSION, self.flags, len(tables), directory_offset))
+        self._file.close()
+
+        os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        """ Close the file and delete it, leaving the previous container (if any) untouched. """
+
+        self._file.close()
+        os.remove(self._temp_path)
+
+    def _append(self, data: bytes | np.ndarray) -> int:
+        """ Append data at the end of the file.
+
+        Args:
+            data: Bytes, or an array written in its memory layout.
+        Returns:
+            The offset of the data in the file.
+        """
+
+        offset = self._file.tell()
+
+        if isinstance(data, np.ndarray):
+            np.ascontiguousarray(data).tofile(self._file)
+        else:
+            self._file.write(data)
+
+        return offset
+
+    @abc.abstractmethod
+    def _tables(self) -> list[np.ndarray]:
+        """ Get the tables of the index, the index of the frames first. """
+
+
+class ContainerReader:
+    """ Random access to the frames of a container.
+
+    Subclasses define `MAGIC`, `VERSION`, `DESCRIPTION` (used in the errors) and
+    `TABLE_DTYPES`, the dtypes of the tables of their index.
+
+    Args:
+        path: Path to the container.
+    """
+
+    MAGIC = b""
+    VERSION = 0
+    DESCRIPTION = "container"
+    TABLE_DTYPES = ()
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+
+        magic, version, self.flags, number_table, directory_offset = _HEADER.unpack(
+            self._data[:_HEADER.size].tobytes()
+        )
+
+        if magic != self.MAGIC or version != self.VERSION or number_table != len(self.TABLE_DTYPES):
+            raise ValueError(f"{path} is not a {self.DESCRIPTION} (version {self.VERSION}).")
+
+        directory = self._view(directory_offset, number_table, _DIRECTORY_DTYPE)
+
+        self._tables = [
+            self._view(int(offset), int(count), dtype)
+            for (offset, count), dtype in zip(directory.tolist(), self.TABLE_DTYPES)
+        ]
+        self._index = self._tables[0]
+
+        self._positions = {int(frame): position for position, frame in enumerate(self._index["frame"])}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, frame_number: int) -> bool:
+        return frame_number in self._positions
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        """ Frame numbers, in the order they were written. """
+
+        return self._index["frame"]
+
+    def _entry(self, frame_number: int) -> np.void:
+        """ Get the row of a frame in the index of the frames. """
+
+        return self._index[self._positions[frame_number]]
+
+    def _view(self, offset: int, count: int, dtype: np.dtype) -> np.ndarray:
+        """ Get a read-only view of `count` items of a dtype at an offset of the file. """
+
+        dtype = np.dtype(dtype)
+
+        return self._data[offset:offset + count * dtype.itemsize].view(dtype)
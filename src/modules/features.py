@@ -13,21 +13,184 @@
  Whether it is traditional methods (SIFT, etc) or experimental methods (AV1 related).
  '''
 
-import itertools
+import collections
+import concurrent.futures
+import multiprocessing.resource_tracker
+import multiprocessing.shared_memory
 import os
+import time
+from typing import Callable
+from typing import Iterator
 
-import ijson
 import loguru
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from .bitstream import get_frame_ref_index
+from .block_maps import BlockMapStore
+from .block_maps import BlockMapWriter
+from .block_maps import block_map_store_path
+from .frames import FrameSource
 from .json_processing import get_block_map
-from .json_processing import get_frame_ref_index
+from .json_processing import MiGrid
 from .json_processing import get_motion_vectors
 from .json_processing import get_reference_frame
+from .json_processing import parse_frames
+from .keypoints import KeypointWriter
+from .keypoints import keypoint_store_path
+from .matches import MatchStore
+from .matches import MatchWriter
+from .metadata import MetadataCache
+from .tracks import build_tracks
+from .tracks import stream_tracks
+from .tracks import tracks_to_matches
 
-def av1_features_and_matching(temp_folder: str, logger: loguru.Logger) -> None:
+
+# AV1 keeps up to 7 reference frames. Matches are interpolated over all the frames
+# between a frame and its references, up to 16 frames away (golden frame interval).
+REFERENCE_BUFFER_SIZE = 7
+INTERPOLATION_SPAN = 16
+STREAMING_WINDOW = REFERENCE_BUFFER_SIZE + INTERPOLATION_SPAN
+
+
+class BlockMapCache:
+    """ LRU cache of the block maps of the block map stores.
+
+    Block maps are read many times (once per match, once per pair of frames). The
+    cache keeps the decoded block maps in memory, up to a budget in bytes. The least
+    recently used block maps are evicted first. A block map bigger than the budget
+    is not counted in it: the last one loaded is kept on the side, so it is only
+    decoded again once another block map bigger than the budget replaced it.
+
+    Args:
+        max_bytes: Budget of the cache in bytes.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 30):
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._block_maps = collections.OrderedDict()
+        self._bytes_resident = 0
+        self._oversized = None
+        self._stores = {}
+
+    @property
+    def bytes_resident(self) -> int:
+        """ Number of bytes of the block maps kept in the budget. """
+
+        return self._bytes_resident
+
+    @property
+    def hit_rate(self) -> float:
+        """ Ratio of the loads served from memory. """
+
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.0
+
+    def load(self, path: str, frame_number: int) -> np.ndarray:
+        """ Load a block map, from memory if possible.
+
+        Args:
+            path: Path to the block map store.
+            frame_number: The frame number.
+
+        Returns:
+            The block map.
+        """
+
+        key = (path, frame_number)
+
+        if key in self._block_maps:
+            self.hits += 1
+            self._block_maps.move_to_end(key)
+            return self._block_maps[key]
+
+        if self._oversized is not None and self._oversized[0] == key:
+            self.hits += 1
+            return self._oversized[1]
+
+        self.misses += 1
+
+        block_map = self._store(path).read(frame_number)
+        self.put(key, block_map)
+
+        return block_map
+
+    def put(self, key: tuple[str, int], block_map: np.ndarray) -> None:
+        """ Add a block map to the cache (for example right after saving it).
+
+        Args:
+            key: (path to the block map store, frame number).
+            block_map: The block map.
+        """
+
+        self.invalidate(key)
+
+        if block_map.nbytes > self.max_bytes:
+            self._oversized = (key, block_map)
+            return
+
+        # Evict the least recently used block maps until the new one fits.
+        while self._bytes_resident + block_map.nbytes > self.max_bytes:
+            _, evicted = self._block_maps.popitem(last=False)
+            self._bytes_resident -= evicted.nbytes
+
+        self._block_maps[key] = block_map
+        self._bytes_resident += block_map.nbytes
+
+    def invalidate(self, key: tuple[str, int]) -> None:
+        """ Remove a block map from the cache.
+
+        Args:
+            key: (path to the block map store, frame number).
+        """
+
+        if self._oversized is not None and self._oversized[0] == key:
+            self._oversized = None
+
+        block_map = self._block_maps.pop(key, None)
+        if block_map is not None:
+            self._bytes_resident -= block_map.nbytes
+
+    def clear(self) -> None:
+        """ Remove all the block maps from the cache and reset the statistics. """
+
+        self._block_maps.clear()
+        self._bytes_resident = 0
+        self._oversized = None
+        self._stores.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, path: str) -> BlockMapStore:
+        """ Get the reader of a block map store, reopened if the file has been replaced. """
+
+        inode = os.stat(path).st_ino
+
+        if path not in self._stores or self._stores[path][0] != inode:
+            self._stores[path] = (inode, BlockMapStore(path))
+
+        return self._stores[path][1]
+
+
+# Cache shared by the matching and the adjacency computation (sfm module).
+block_map_cache = BlockMapCache()
+
+def av1_features_and_matching(
+    temp_folder: str,
+    logger: "loguru.Logger",
+    json_backend: str = "auto",
+    metadata_path: str = None,
+    workers: int = 1,
+    feat_files: bool = False,
+    frame_source: FrameSource = None,
+    direct_matches_path: str = None
+) -> tuple[MatchStore, pd.DataFrame]:
     """ Extract features and do the matching.
 
     Usually, to perform structure from motion, we used algorithms like SIFT to
@@ -38,6 +201,20 @@ def av1_features_and_matching(temp_folder: str, logger: loguru.Logger) -> None:
         1. Extract block information from the image and use them as features.
         2. Extract motion vectors from the encoded video.
         3. Use motion vectors to do block matching.
+        4. Group the matches in feature tracks and propagate them.
+
+    Args:
+        temp_folder: Path to the temporary folder.
+        logger: The logger.
+        json_backend: Backend used to parse the JSON file (see `parse_frames`).
+        metadata_path: Metadata cache to read the frames from, instead of the JSON file.
+        workers: Number of processes used to extract the features (see `_extract_frames`).
+        feat_files: Also export the keypoints as text `.feat` files.
+        frame_source: Source of the gray images of the frames (see `_extract_frames`).
+        direct_matches_path: Also write the matches of the motion vectors, before
+            propagation, to this file (see `sfm.observed_window`).
+    Returns:
+        The propagated matches and the feature tracks.
     """
 
     logger.info("Getting the frame reference index.")
@@ -45,128 +222,521 @@ def av1_features_and_matching(temp_folder: str, logger: loguru.Logger) -> None:
 
     logger.debug(f"Frame reference index: {frames_ref_index}")
 
-    json_file_path = f"{temp_folder}/video.json"
+    # Columnar store of the matches of all the frames.
+    matches = MatchStore()
 
-    os.makedirs(f"{temp_folder}/block_maps", exist_ok=True)
+    store_path = block_map_store_path(temp_folder)
 
-    number_frame = len([name for name in os.listdir(f"{temp_folder}/images") if os.path.isfile(name)])
+    with BlockMapWriter(store_path) as block_map_writer, \
+            KeypointWriter(keypoint_store_path(temp_folder)) as keypoint_writer:
+        frames = _read_frames(temp_folder, json_backend, metadata_path)
+        frames = _extract_frames(frames, temp_folder, workers, feat_files, frame_source)
 
-    # List of pandas dataframes to store the matches for each frame.
-    matches = [pd.DataFrame(columns=["feature_coord", "feature_id", "target_frame", "coord_target", "feature_id_target"]) for _ in range(number_frame-1)]
+        for frame_data, block_map, coord_block, block_areas, keypoints in tqdm(frames, desc="Processing frames"):
 
-    with open(json_file_path, "rb") as json_file:
-        for frame_data in tqdm(ijson.items(json_file, "frame"), desc="Processing frames"):
+            _match_frame(frame_data, coord_block, frames_ref_index, matches, logger)
 
-            frame_number = frame_data["frame"]
+            block_map_writer.write(frame_data["frame"], block_map, block_areas)
+            keypoint_writer.write(frame_data["frame"], keypoints)
+            block_map_cache.put((store_path, frame_data["frame"]), block_map)
 
-            logger.debug(f"Frame number: {frame_number}")
-            
-            frame_ref_index = eval(frames_ref_index[frame_number])
-            logger.debug(f"Frame reference index: {frame_ref_index}")
+    matches = _av1_convert_matches(temp_folder, matches)
 
-            current_block_map, coord_block = get_block_map(frame_data, temp_folder)
-            np.save(f"{temp_folder}/block_maps/frame_{frame_number}.npy", current_block_map)
+    logger.debug(
+        f"Block map cache: {block_map_cache.hit_rate:.1%} hit rate, "
+        f"{block_map_cache.bytes_resident / 2**20:.1f} MB resident"
+    )
 
-            if frame_number == 0:
-                continue
+    if direct_matches_path is not None:
+        with MatchWriter(direct_matches_path) as writer:
+            writer.write(matches)
+
+    tracks = build_tracks(matches)
+    logger.info(f"{tracks['track_id'].nunique()} tracks built out of {len(matches)} matches.")
+
+    matches = tracks_to_matches(tracks)
+
+    return matches, tracks
+
+
+def av1_stream_features_and_matching(
+    temp_folder: str,
+    logger: "loguru.Logger",
+    matches_path: str,
+    json_backend: str = "auto",
+    metadata_path: str = None,
+    workers: int = 1,
+    feat_files: bool = False,
+    frame_source: FrameSource = None,
+    direct_matches_path: str = None
+) -> str:
+    """ Extract features and do the matching with a memory bounded by a window of frames.
+
+    Same steps as `av1_features_and_matching`, but the matches are never all in
+    memory: the matches of the motion vectors are converted and written while
+    streaming the frames (see `av1_stream_matches`), then the feature tracks are
+    built from that file and their matches written to `matches_path` (see
+    `stream_tracks`).
+
+    Args:
+        temp_folder: Path to the temporary folder.
+        logger: The logger.
+        matches_path: Path to the match file of the propagated matches.
+        json_backend: Backend used to parse the JSON file (see `parse_frames`).
+        metadata_path: Metadata cache to read the frames from, instead of the JSON file.
+        workers: Number of processes used to extract the features (see `_extract_frames`).
+        feat_files: Also export the keypoints as text `.feat` files.
+        frame_source: Source of the gray images of the frames (see `_extract_frames`).
+        direct_matches_path: Path to the match file of the matches of the motion
+            vectors, before propagation (see `sfm.observed_window`). Defaults to
+            `direct_matches.bin` in the temporary folder.
+    Returns:
+        The path to the match file of the propagated matches.
+    """
+
+    direct_matches_path = av1_stream_matches(
+        temp_folder,
+        logger,
+        json_backend=json_backend,
+        metadata_path=metadata_path,
+        workers=workers,
+        feat_files=feat_files,
+        frame_source=frame_source,
+        matches_path=direct_matches_path,
+    )
+
+    number_track = stream_tracks(direct_matches_path, matches_path, STREAMING_WINDOW)
+    logger.info(f"{number_track} tracks built out of the matches of {direct_matches_path}.")
+
+    return matches_path
+
+
+def av1_stream_matches(
+    temp_folder: str,
+    logger: "loguru.Logger",
+    window: int = STREAMING_WINDOW,
+    out_of_bounds: str = "drop",
+    json_backend: str = "auto",
+    metadata_path: str = None,
+    workers: int = 1,
+    feat_files: bool = False,
+    frame_source: FrameSource = None,
+    matches_path: str = None
+) -> str:
+    """ Extract features and do the matching in a single pass over the frames.
+
+    The block maps of the last `window` frames are kept in memory. As soon as the
+    block maps of both frames of a match are available, the match is converted to
+    feature ids and written to the match file. Matches pointing to a frame that
+    left the window are dropped. Memory is therefore bounded by the window and not
+    by the length of the sequence.
+
+    Args:
+        temp_folder: Path to the temporary folder.
+        logger: The logger.
+        window: Number of block maps kept in memory.
+        out_of_bounds: Policy for the coordinates outside of the frame ("drop" or "clip").
+        json_backend: Backend used to parse the JSON file (see `parse_frames`).
+        metadata_path: Metadata cache to read the frames from, instead of the JSON file.
+        workers: Number of processes used to extract the features (see `_extract_frames`).
+        feat_files: Also export the keypoints as text `.feat` files.
+        frame_source: Source of the gray images of the frames (see `_extract_frames`).
+        matches_path: Path to the match file. Defaults to `direct_matches.bin` in the
+            temporary folder.
+    Returns:
+        The path to the match file (see `MatchStore.load_chunks`).
+    """
+
+    logger.info("Getting the frame reference index.")
+    frames_ref_index = get_frame_ref_index(temp_folder)
+
+    if matches_path is None:
+        matches_path = f"{temp_folder}/direct_matches.bin"
+
+    block_maps = collections.OrderedDict()
+    pending = MatchStore()
+    number_dropped = 0
+
+    with MatchWriter(matches_path) as writer, \
+            BlockMapWriter(block_map_store_path(temp_folder)) as block_map_writer, \
+            KeypointWriter(keypoint_store_path(temp_folder)) as keypoint_writer:
+        frames = _read_frames(temp_folder, json_backend, metadata_path)
+        frames = _extract_frames(frames, temp_folder, workers, feat_files, frame_source)
+
+        for frame_data, block_map, coord_block, block_areas, keypoints in tqdm(frames, desc="Processing frames"):
+
+            _match_frame(frame_data, coord_block, frames_ref_index, pending, logger)
+            block_maps[frame_data["frame"]] = block_map
+            block_map_writer.write(frame_data["frame"], block_map, block_areas)
+            keypoint_writer.write(frame_data["frame"], keypoints)
+
+            while len(block_maps) > window:
+                block_maps.popitem(last=False)
+
+            pending, dropped = _flush_matches(pending, block_maps, writer, out_of_bounds)
+            number_dropped += dropped
+
+        # No more frame is coming: what is still pending can not be converted.
+        number_dropped += len(pending)
+
+    logger.info(f"{writer.number_rows} matches written, {number_dropped} dropped (outside of the window).")
+
+    return matches_path
+
+
+def _read_frames(temp_folder: str, json_backend: str, metadata_path: str = None) -> Iterator[dict]:
+    """ Get the metadata of the frames from the metadata cache or the JSON file.
+
+    Args:
+        temp_folder: Path to the temporary folder.
+        json_backend: Backend used to parse the JSON file (see `parse_frames`).
+        metadata_path: Path to the metadata cache (optional).
+    Returns:
+        An iterator over the metadata of the frames.
+    """
+
+    if metadata_path is not None:
+        return iter(MetadataCache(metadata_path))
+
+    return parse_frames(f"{temp_folder}/video.json", json_backend)
+
+
+def _extract_frames(
+    frames: Iterator[dict],
+    temp_folder: str,
+    workers: int = 1,
+    feat_files: bool = False,
+    frame_source: FrameSource = None
+) -> Iterator[tuple[dict, np.ndarray, list[list[float]], np.ndarray, np.ndarray]]:
+    """ Extract the features of the frames, in parallel if several workers are used.
+
+    The block maps, keypoints and orientations of a frame do not depend on the
+    other frames. With several workers, frames are sent to a process pool as they are
+    streamed out of the metadata. Block maps come back through shared memory and
+    results are yielded in the order of the frames, so the matching stays ordered.
+
+    Args:
+        frames: The metadata of the frames.
+        temp_folder: Path to the temporary folder.
+        workers: Number of worker processes (1 to extract in the current process).
+        feat_files: Also export the keypoints as text `.feat` files.
+        frame_source: Source of the gray images of the frames. The images are read
+            from the temporary folder by `get_block_map` if None.
+    Returns:
+        An iterator over the metadata, block map, block centers, block areas and
+        keypoints of every frame.
+    """
+
+    if workers <= 1:
+        for frame_data in frames:
+            image = frame_source.read(frame_data["frame"]) if frame_source is not None else None
+            yield frame_data, *get_block_map(frame_data, temp_folder, feat_files, image)
+        return
+
+    pending = collections.deque()
 
-            motion_vectors = get_motion_vectors(frame_data)
-            reference_frame = get_reference_frame(frame_data, frame_ref_index)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
 
-            matches = _av1_match(coord_block, motion_vectors, reference_frame, matches, frame_number)
+        try:
+            for frame_data in frames:
 
-    matches = _av1_convert_matches(temp_folder, matches, current_block_map)
+                # Workers only need the block sizes of the frame (and its image).
+                task = {"frame": frame_data["frame"], "blockSize": np.asarray(frame_data["blockSize"])}
+                # The image is pickled after `submit` returns, the buffer of the source may be reused by then.
+                image = frame_source.read(frame_data["frame"]).copy() if frame_source is not None else None
+                pending.append((
+                    frame_data,
+                    executor.submit(_extract_features_worker, task, temp_folder, feat_files, image),
+                ))
 
-    for match in matches:
-        match.drop(columns=['feature_coord', 'coord_target'], inplace=True)
+                # Bound the number of frames in flight.
+                if len(pending) >= 2 * workers:
+                    frame_data, future = pending.popleft()
+                    yield frame_data, *_receive_block_map(*future.result())
 
-    matches = _av1_propagate_matches(matches)
+            while pending:
+                frame_data, future = pending.popleft()
+                yield frame_data, *_receive_block_map(*future.result())
 
+        finally:
+            # Frames still in flight after an exception, or when the iterator is closed
+            # early, own a shared memory block that nobody will receive.
+            for _, future in pending:
+                _discard_block_map(future)
 
-def _av1_convert_matches(temp_folder: str, matches: list[pd.DataFrame], current_block_map: np.ndarray) -> list[pd.DataFrame]:
+
+def _extract_features_worker(
+    frame_data: dict,
+    temp_folder: str,
+    feat_files: bool = False,
+    image: np.ndarray = None
+) -> tuple[str, tuple, str, list[list[float]], np.ndarray, np.ndarray]:
+    """ Extract the features of a frame in a worker process.
+
+    The block map is copied into a new shared memory block instead of being pickled.
+    The block is released by `_receive_block_map`.
+
+    Args:
+        frame_data: Metadata of the frame.
+        temp_folder: Path to the temporary folder.
+        feat_files: Also export the keypoints as a text `.feat` file.
+        image: Gray image of the frame (read from the temporary folder if None).
+    Returns:
+        The name of the shared memory block, the shape and dtype of the block map,
+        the block centers, the block areas and the keypoints of the frame.
+    """
+
+    block_map, coord_block, block_areas, keypoints = get_block_map(frame_data, temp_folder, feat_files, image)
+
+    shared_memory = multiprocessing.shared_memory.SharedMemory(create=True, size=max(block_map.nbytes, 1))
+    np.ndarray(block_map.shape, dtype=block_map.dtype, buffer=shared_memory.buf)[...] = block_map
+    shared_memory.close()
+
+    # The main process owns the block from now on and unlinks it. The resource
+    # tracker knows the block by its POSIX name, which starts with a slash.
+    multiprocessing.resource_tracker.unregister("/" + shared_memory.name, "shared_memory")
+
+    return shared_memory.name, block_map.shape, block_map.dtype.str, coord_block, block_areas, keypoints
+
+
+def _receive_block_map(
+    name: str,
+    shape: tuple,
+    dtype: str,
+    coord_block: list[list[float]],
+    block_areas: np.ndarray,
+    keypoints: np.ndarray
+) -> tuple[np.ndarray, list[list[float]], np.ndarray, np.ndarray]:
+    """ Get a block map sent by a worker and release its shared memory block.
+
+    Args:
+        name: Name of the shared memory block.
+        shape: Shape of the block map.
+        dtype: Dtype of the block map.
+        coord_block: The block centers of the frame.
+        block_areas: The block areas of the frame.
+        keypoints: The keypoints of the frame.
+    Returns:
+        The block map, the block centers, the block areas and the keypoints of the frame.
+    """
+
+    shared_memory = multiprocessing.shared_memory.SharedMemory(name=name)
+    block_map = np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf).copy()
+    shared_memory.close()
+    shared_memory.unlink()
+
+    return block_map, coord_block, block_areas, keypoints
+
+
+def _discard_block_map(future: concurrent.futures.Future) -> None:
+    """ Release the shared memory block of a frame that will not be received.
+
+    Args:
+        future: The future of `_extract_features_worker` for the frame.
+    """
+
+    if future.cancel() or future.exception() is not None:
+        return
+
+    shared_memory = multiprocessing.shared_memory.SharedMemory(name=future.result()[0])
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+def _match_frame(
+    frame_data: dict,
+    coord_block: list[list[float]],
+    frames_ref_index: np.ndarray,
+    matches: MatchStore,
+    logger: "loguru.Logger"
+) -> None:
+    """ Match the blocks of a frame with its references.
+
+    Args:
+        frame_data: Metadata of the frame.
+        coord_block: The block centers of the frame.
+        frames_ref_index: The order hints of every frame.
+        matches: The store of the matches (updated).
+        logger: The logger.
+    """
+
+    frame_number = frame_data["frame"]
+
+    logger.debug(f"Frame number: {frame_number}")
+
+    if frame_number == 0:
+        return
+
+    frame_ref_index = frames_ref_index[frame_number]
+    logger.debug(f"Frame reference index: {frame_ref_index}")
+
+    motion_vectors = get_motion_vectors(frame_data)
+    reference_frame = get_reference_frame(frame_data, frame_ref_index)
+
+    start = time.perf_counter()
+    _av1_match(coord_block, motion_vectors, reference_frame, matches, frame_number)
+    logger.debug(f"Matching: {len(coord_block) / (time.perf_counter() - start):.0f} blocks/s")
+
+
+def _flush_matches(
+    pending: MatchStore,
+    block_maps: dict[int, np.ndarray],
+    writer: MatchWriter,
+    out_of_bounds: str
+) -> tuple[MatchStore, int]:
+    """ Convert and write the pending matches whose block maps are available.
+
+    Args:
+        pending: The matches not converted yet.
+        block_maps: The block maps of the window, by frame number.
+        writer: The writer of the match file.
+        out_of_bounds: Policy for the coordinates outside of the frame ("drop" or "clip").
+    Returns:
+        The matches still pending and the number of matches dropped.
+    """
+
+    available = np.fromiter(block_maps.keys(), dtype=int)
+    oldest = available.min() if len(available) else 0
+
+    ready = np.isin(pending["source_frame"], available) & np.isin(pending["target_frame"], available)
+    expired = (pending["source_frame"] < oldest) | (pending["target_frame"] < oldest)
+
+    if np.any(ready):
+        writer.write(_convert_matches(pending.select(ready), block_maps.__getitem__, out_of_bounds))
+
+    if not np.any(ready | expired):
+        return pending, 0
+
+    return pending.select(~(ready | expired)), int(np.count_nonzero(expired & ~ready))
+
+
+def _av1_convert_matches(
+    temp_folder: str,
+    matches: MatchStore,
+    cache: BlockMapCache = block_map_cache,
+    out_of_bounds: str = "drop"
+) -> MatchStore:
     """ Convert the coordinates to the block index.
 
+    Matches are grouped by frame, so every block map is loaded once and all the
+    coordinates pointing to it are converted with a single lookup.
+
+    Motion vectors can point outside of the frame. Those coordinates are either
+    dropped (the whole match is removed) or clipped to the border of the frame.
+
     Args:
         temp_folder: The temporary folder.
         matches: The matches updated.
+        cache: The cache used to load the block maps.
+        out_of_bounds: Policy for the coordinates outside of the frame ("drop" or "clip").
     Returns:
         matches: The updated matches with feature IDs populated.
     """
 
-    for i in range(len(matches)):
-            
-        for idx, row in matches[i].iterrows():
-
-            current_coord = row['feature_coord']
-            target_coord = row['coord_target']
-            target_frame = row['target_frame']
-            
-            # Get feature IDs from block maps
-            feature_id = current_block_map[current_coord[1], current_coord[0]]
-            
-            # Load target frame block map
-            target_block_map = np.load(f"{temp_folder}/block_maps/frame_{target_frame}.npy")
-            feature_id_target = target_block_map[target_coord[1], target_coord[0]]
-            
-            # Update the dataframe
-            matches[i].at[idx, 'feature_id'] = feature_id
-            matches[i].at[idx, 'feature_id_target'] = feature_id_target
-    
-    return matches
+    store_path = block_map_store_path(temp_folder)
 
+    def load_block_map(frame_number: int) -> np.ndarray:
+        return cache.load(store_path, frame_number)
 
-def _av1_propagate_matches(matches: list[pd.DataFrame]) -> list[pd.DataFrame]:
-    """ Propagate the matches to other frames.
+    return _convert_matches(matches, load_block_map, out_of_bounds)
 
-    We have matches between certain frames. the idea is to propagate those matches
-    to other frames that are not directly connected.
 
-    We have a block in frame A connected by a motion vector to a block in frame B.
-    That same block is connected to another block in frame C. So we can create a
-    new match between frame A and C.
+def _convert_matches(
+    matches: MatchStore,
+    load_block_map: Callable[[int], np.ndarray],
+    out_of_bounds: str = "drop"
+) -> MatchStore:
+    """ Convert the coordinates to the block index with the given block maps.
 
     Args:
-        matches: The matches to propagate.
+        matches: The matches updated.
+        load_block_map: Function giving the block map of a frame number.
+        out_of_bounds: Policy for the coordinates outside of the frame ("drop" or "clip").
     Returns:
         matches: The updated matches with feature IDs populated.
     """
 
-    for i in range(1, len(matches)):
+    if out_of_bounds not in ("drop", "clip"):
+        raise ValueError(f"Unknown out of bounds policy: {out_of_bounds}")
+
+    keep = np.ones(len(matches), dtype=bool)
 
-        index = len(matches) - i - 1
+    sides = [
+        ("source_frame", "source_x", "source_y", "feature_id"),
+        ("target_frame", "target_x", "target_y", "feature_id_target"),
+    ]
 
-        dataframe = matches[index]
+    # Rows of both sides of the matches grouped by frame: a block map is loaded
+    # once for the sources and the targets pointing to it.
+    frames = np.concatenate([matches[frame_column] for frame_column, _, _, _ in sides])
+    order = np.argsort(frames, kind="stable")
+    frame_numbers, starts = np.unique(frames[order], return_index=True)
 
-        for idx, row in dataframe.iterrows():
+    for frame_number, positions in zip(frame_numbers, np.split(order, starts[1:])):
 
-            target_frame = row['target_frame']
-            id_target = row['feature_id_target']
+        block_map = load_block_map(frame_number)
+        height, width = block_map.shape
 
-            matches_target = matches[target_frame]
+        for side, (_, x_column, y_column, id_column) in enumerate(sides):
 
-            # Get all rows matching id_target
-            matches_target = matches_target[matches_target['feature_id_target'] == id_target]
+            rows = positions[positions // len(matches) == side] % len(matches)
+            if len(rows) == 0:
+                continue
+
+            xs = matches[x_column][rows]
+            ys = matches[y_column][rows]
 
-            # Modify feature_id for all the rows
-            matches_target['feature_id'] = id_target
+            if out_of_bounds == "clip":
+                xs = np.clip(xs, 0, width - 1)
+                ys = np.clip(ys, 0, height - 1)
+                matches[x_column][rows] = xs
+                matches[y_column][rows] = ys
 
-            # Concatenate the current dataframe with the matches_target dataframe
-            dataframe = pd.concat([dataframe, matches_target], ignore_index=True)
+            else:
+                inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                keep[rows[~inside]] = False
+                xs = np.where(inside, xs, 0)
+                ys = np.where(inside, ys, 0)
 
-        matches[index] = dataframe
-        matches[index].drop_duplicates(inplace=True)
+            matches[id_column][rows] = block_map[ys, xs]
+
+    if not np.all(keep):
+        matches = matches.select(keep)
 
     return matches
 
 
+def _av1_propagate_matches(matches: MatchStore, conflicts: str = "keep") -> MatchStore:
+    """ Propagate the matches to other frames.
+
+    We have matches between certain frames. the idea is to propagate those matches
+    to other frames that are not directly connected.
+
+    We have a block in frame A connected by a motion vector to a block in frame B.
+    That same block is connected to another block in frame C. So we can create a
+    new match between frame A and C.
+
+    The matches are first grouped in feature tracks (connected components of the
+    graph of the matches), then the observations of a track are matched together
+    (see `tracks_to_matches`).
+
+    Args:
+        matches: The matches to propagate.
+        conflicts: Policy for the tracks with two features of the same frame (see `build_tracks`).
+    Returns:
+        matches: The updated matches with feature IDs populated.
+    """
+
+    return tracks_to_matches(build_tracks(matches, conflicts))
+
 
 def _av1_match(
     coord_block: list[list[int]], 
-    motion_vectors: np.ndarray, 
-    reference_frame: np.ndarray, 
-    matches: list[pd.DataFrame],
+    motion_vectors: MiGrid | np.ndarray, 
+    reference_frame: MiGrid | np.ndarray, 
+    matches: MatchStore,
     frame_number: int
-) -> list[pd.DataFrame]:
+) -> MatchStore:
     """ Do the matching between the current frame and its references.
 
     The matching is done by using the motion vectors and the reference frame.
@@ -178,91 +748,94 @@ def _av1_match(
     frames.
 
     This function retrieves the matches using the motion vectors and the reference
-    and compute the interpolated matches.
+    and compute the interpolated matches. All the blocks of the frame are
+    processed at once.
 
     Args:
         coord_block: The list of the center coordinates of the blocks.
-        motion_vectors: The motion vectors.
-        reference_frame: The reference frame.
-        matches: Pandas dataframe to store the matches.
+        motion_vectors: The motion vectors, indexed by pixel (see `MiGrid`).
+        reference_frame: The reference frame, indexed by pixel: a `MiGrid` of the
+            reference indices mapping them to frame numbers (see `get_reference_frame`),
+            or the frame numbers (-1 for no reference).
+        matches: The store of the matches.
         frame_number: The current frame number.
     Returns:
         matches: The updated matches.
     """
 
-    frames = [frame_number]
-
-    for i in range(len(coord_block)):
+    coord_block = np.asarray(coord_block, dtype=float).reshape(-1, 2)
 
-        current_block_x, current_block_y = coord_block[i]
+    block_x = coord_block[:, 0]
+    block_y = coord_block[:, 1]
 
-        motion_vectors = motion_vectors[current_block_y, current_block_x]
-        references_frame = reference_frame[current_block_y, current_block_x]
+    pixel_x = block_x.astype(int)
+    pixel_y = block_y.astype(int)
 
-        target_coord_1 = [int(current_block_x + motion_vectors[0]), int(current_block_y + motion_vectors[1])]
-        target_coord_2 = [int(current_block_x + motion_vectors[2]), int(current_block_y + motion_vectors[3])]
-        
-        target_frame_1 = references_frame[target_coord_1[0]][target_coord_1[1]][0]
-        target_frame_2 = references_frame[target_coord_2[0]][target_coord_2[1]][1]
+    # Only the fields at the block centers are read.
+    block_motion = motion_vectors[pixel_y, pixel_x]
+    block_references = reference_frame[pixel_y, pixel_x]
 
-        coords_motion = {}
+    # The stored references are indices: -1 is no reference and 0 the intra frame.
+    # They are checked before the lookup, which maps them to frame numbers.
+    if isinstance(reference_frame, MiGrid) and reference_frame.lookup is not None:
+        referenced = reference_frame.raw[pixel_y, pixel_x] >= 1
+    else:
+        referenced = block_references != -1
 
-        if (motion_vectors[0] != 0 or motion_vectors[1] != 0) and target_frame_1 != -1:
+    # Position of every block in the current frame.
+    blocks = [np.arange(len(coord_block))]
+    frames = [np.full(len(coord_block), frame_number)]
+    xs = [pixel_x]
+    ys = [pixel_y]
 
-            frames.append(target_frame_1)
-
-            coords_motion[frame_number] = coord_block[i]
-            coords_motion[target_frame_1] = target_coord_1
-
-            if target_frame_1 > frame_number:
-                distance = target_frame_1 - frame_number
-                next = -1
-            
-            else:
-                distance = frame_number - target_frame_1
-                next = 1
+    # Positions of the blocks in the reference frames and in the in-between frames.
+    for reference in range(2):
 
-            unitary_motion = [motion_vectors[0] / distance, motion_vectors[1] / distance]
-            
-            for j in range(distance):
+        motion = block_motion[:, 2*reference:2*reference+2]
+        target_frame = block_references[:, reference].astype(int)
 
-                interpolate_coord = [int(current_block_x + unitary_motion[0] * j), int(current_block_y + unitary_motion[1] * j)]
-                next_frame = target_frame_1 + (j * next)
-                coords_motion[next_frame] = interpolate_coord
-
-        if (motion_vectors[2] != 0 or motion_vectors[3] != 0) and target_frame_2 != -1:
-
-            frames.append(target_frame_2)
-
-            if target_frame_2 > frame_number:
-                distance = target_frame_2 - frame_number
-                next = -1
-
-            else:
-                distance = frame_number - target_frame_2
-                next = 1
+        valid = np.any(motion != 0, axis=1) & referenced[:, reference] & (target_frame != frame_number)
+        valid_blocks = np.nonzero(valid)[0]
 
-            for j in range(distance):
+        distance = np.abs(target_frame[valid] - frame_number)
 
-                next_frame = target_frame_2 + (j * next)
-                current_coord = [int(current_block_x + unitary_motion[0] * j), int(current_block_y + unitary_motion[1] * j)]
-                coords_motion[next_frame] = current_coord
+        # One position per frame between the current frame (excluded) and the reference frame.
+        block_index = np.repeat(valid_blocks, distance)
+        step = np.arange(distance.sum()) - np.repeat(np.cumsum(distance) - distance, distance) + 1
+        ratio = step / np.repeat(distance, distance)
 
-        min_frame = min(frames)
-        max_frame = max(frames)
+        blocks.append(block_index)
+        frames.append(frame_number + np.sign(target_frame[block_index] - frame_number) * step)
+        xs.append((block_x[block_index] + motion[block_index, 0] * ratio).astype(int))
+        ys.append((block_y[block_index] + motion[block_index, 1] * ratio).astype(int))
 
-        # Get all frames numbers between min and max.
-        frames_numbers = list(range(min_frame, max_frame + 1))
+    blocks = np.concatenate(blocks)
+    frames = np.concatenate(frames)
+    xs = np.concatenate(xs)
+    ys = np.concatenate(ys)
 
-        pairs = list(itertools.combinations(frames_numbers, 2))
+    # When both references cover the same frame, the second one is kept.
+    order = np.lexsort((np.arange(len(blocks)), frames, blocks))
+    blocks, frames, xs, ys = blocks[order], frames[order], xs[order], ys[order]
 
-        for pair in pairs:
+    last = np.ones(len(blocks), dtype=bool)
+    last[:-1] = (blocks[1:] != blocks[:-1]) | (frames[1:] != frames[:-1])
+    blocks, frames, xs, ys = blocks[last], frames[last], xs[last], ys[last]
 
-            frame_1, frame_2 = pair
+    # Every pair of positions of the same block is a match (lower frame first).
+    group_end = np.searchsorted(blocks, blocks, side="right")
+    count = group_end - np.arange(len(blocks)) - 1
 
-            coord_1 = coords_motion[frame_1]
-            coord_2 = coords_motion[frame_2]
+    first = np.repeat(np.arange(len(blocks)), count)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(count) - count, count)
 
-            matches[frame_1].loc[-1] = [coord_1, None, frame_2, coord_2, None]
+    matches.extend(
+        source_frame=frames[first],
+        source_x=xs[first],
+        source_y=ys[first],
+        target_frame=frames[second],
+        target_x=xs[second],
+        target_y=ys[second],
+    )
 
     return matches
@@ -0,0 +1,155 @@
+'''
+ # @ : frames.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Sources of the gray images of the frames.
+
+ The orientation of the blocks is computed on the gray image of the frame. A frame
+ source gives the gray image of a frame from its number, so `get_block_map` does
+ not have to read a PNG from the temporary folder:
+    - `ImageFrameSource` reads the images of the frames with a pool of threads
+      that decodes the next frames while the current one is processed.
+    - `VideoFrameSource` decodes a video sequentially into a reused buffer, so
+      a video input needs no image at all.
+
+ Frames are expected in increasing order, as they come out of the metadata.
+ '''
+
+import abc
+import concurrent.futures
+
+import cv2
+import numpy as np
+
+
+class FrameSource(abc.ABC):
+    """ Source of the gray images of the frames, by frame number. """
+
+    def __enter__(self) -> "FrameSource":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @abc.abstractmethod
+    def read(self, frame_number: int) -> np.ndarray:
+        """ Get the gray image of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The gray image of the frame (uint8).
+        """
+
+    def close(self) -> None:
+        """ Release the resources of the source. """
+
+
+class ImageFrameSource(FrameSource):
+    """ Gray images of the frames read from image files, prefetched by a thread pool.
+
+    Args:
+        image_paths: Path to the image of every frame (frame `n` is `image_paths[n]`).
+        workers: Number of threads decoding the images.
+        prefetch: Number of frames decoded ahead of the frame being read.
+    """
+
+    def __init__(self, image_paths: list[str], workers: int = 4, prefetch: int = 8):
+
+        self.image_paths = list(image_paths)
+        self.prefetch = prefetch
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self.image_paths)
+
+    def read(self, frame_number: int) -> np.ndarray:
+
+        if not 0 <= frame_number < len(self.image_paths):
+            raise IndexError(f"No image for frame {frame_number}.")
+
+        # Frames before this one will not be read anymore.
+        for stale in [number for number in self._pending if number < frame_number]:
+            self._pending.pop(stale).cancel()
+
+        for number in range(frame_number, min(frame_number + self.prefetch + 1, len(self.image_paths))):
+            if number not in self._pending:
+                self._pending[number] = self._executor.submit(_read_gray_image, self.image_paths[number])
+
+        return self._pending.pop(frame_number).result()
+
+    def close(self) -> None:
+
+        self._executor.shutdown(cancel_futures=True)
+        self._pending.clear()
+
+
+class VideoFrameSource(FrameSource):
+    """ Gray images of the frames decoded from a video.
+
+    The video is decoded sequentially and the frames are converted into the same
+    buffers, so the image returned by `read` is only valid until the next call.
+    Reading a frame before the last one read decodes the video again from the start.
+
+    Args:
+        video_path: Path to the video (any format OpenCV can decode, ivf included).
+    """
+
+    def __init__(self, video_path: str):
+
+        self.video_path = video_path
+
+        self._capture = None
+        self._position = 0
+        self._frame = None
+        self._gray = None
+
+    def read(self, frame_number: int) -> np.ndarray:
+
+        if self._capture is None or frame_number < self._position:
+            self._open()
+
+        while self._position <= frame_number:
+            success, frame = self._capture.read(self._frame)
+            if not success:
+                raise IndexError(f"{self.video_path} has no frame {frame_number}.")
+
+            self._frame = frame
+            self._position += 1
+
+        self._gray = cv2.cvtColor(self._frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        return self._gray
+
+    def close(self) -> None:
+
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def _open(self) -> None:
+
+        self.close()
+
+        self._capture = cv2.VideoCapture(self.video_path)
+        if not self._capture.isOpened():
+            raise ValueError(f"{self.video_path} can not be decoded.")
+
+        self._position = 0
+
+
+def _read_gray_image(image_path: str) -> np.ndarray:
+    """ Read an image and convert it to gray, like `get_block_map`. """
+
+    image = cv2.imread(image_path)
+    if image is None:
+        raise FileNotFoundError(f"{image_path} can not be read.")
+
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
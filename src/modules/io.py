@@ -11,15 +11,24 @@
  '''
 
 
+import concurrent.futures
+import glob
 import os
 import shutil
 import subprocess
 
+from .metadata import build_metadata_cache
+
 
 IVF_SIGNATURE = b"DKIF"
 IVF_HEADER_SIZE = 32
 CODEC = b"AV01"
 
+INGESTION_MODES = ("copy", "hardlink", "symlink", "auto")
+
+# Manifest of the images, used instead of the images folder (see `write_image_manifest`).
+IMAGE_MANIFEST = "images.ffconcat"
+
 
 def check_ivf_file(file_path: str) -> bool:
     with open(file_path, "rb") as file:
@@ -33,25 +42,123 @@ def check_ivf_file(file_path: str) -> bool:
         return True
 
 
-def copy_images(image_paths: list[str], output_folder: str):
+def copy_images(image_paths: list[str], output_folder: str, mode: str = "auto", workers: int = 8):
     """ Copy the images to the output folder.
 
-    The images copied name is being normalized to be in the right format.
+    The images copied name is being normalized to be in the right format
+    (`frame_{index}`, zero padded to at least 4 digits so the names sort in order).
+    The images are hard linked when possible, which costs no copy.
 
     Args:
         image_paths (list[str]): The paths to the images.
         output_folder (str): The path to the output folder.
+        mode (str): "copy", "hardlink", "symlink" or "auto" (hard link when the
+            images are on the same filesystem as the output folder, copy otherwise).
+        workers (int): Number of threads copying the images.
     """
 
+    if mode not in INGESTION_MODES:
+        raise ValueError(f"Unknown ingestion mode: {mode}")
+
     os.makedirs(f"{output_folder}/images", exist_ok=True)
 
+    width = max(4, len(str(len(image_paths) - 1)))
+
+    destinations = []
     for idx, image_path in enumerate(image_paths):
         # Get the extension of the image.
         image_path_extension = image_path.split(".")[-1]
-        
-        new_filename = f"frame_{idx:04d}.{image_path_extension}"
-        dest_path = os.path.join(output_folder, "images", new_filename)
-        shutil.copy2(image_path, dest_path)
+
+        new_filename = f"frame_{idx:0{width}d}.{image_path_extension}"
+        destinations.append(os.path.join(output_folder, "images", new_filename))
+
+    # Copies are bound by I/O, threads overlap them.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda paths: _ingest_image(*paths, mode), zip(image_paths, destinations)))
+
+
+def _ingest_image(image_path: str, dest_path: str, mode: str):
+    """ Copy or link an image (see `copy_images`). """
+
+    if mode == "symlink":
+        os.symlink(os.path.abspath(image_path), dest_path)
+        return
+
+    if mode in ("hardlink", "auto"):
+        try:
+            os.link(image_path, dest_path)
+            return
+        except OSError:
+            # Different filesystems (or no hard link support).
+            if mode == "hardlink":
+                raise
+
+    shutil.copy2(image_path, dest_path)
+
+
+def write_image_manifest(image_paths: list[str], output_folder: str, framerate: int = 60) -> str:
+    """ Write the manifest of the images instead of copying them.
+
+    The manifest is an ffconcat list of the images, read by ffmpeg in place of the
+    images folder. The image of frame `n` is the `n`-th file of the list.
+
+    Args:
+        image_paths (list[str]): The paths to the images.
+        output_folder (str): The path to the output folder.
+        framerate (int): The frame rate of the video.
+
+    Returns:
+        str: The path to the manifest.
+    """
+
+    manifest_path = os.path.join(output_folder, IMAGE_MANIFEST)
+
+    with open(manifest_path, mode="wt", encoding="utf-8") as manifest:
+        manifest.write("ffconcat version 1.0\n")
+
+        for image_path in image_paths:
+            escaped_path = os.path.abspath(image_path).replace("'", "'\\''")
+            manifest.write(f"file '{escaped_path}'\nduration {1 / framerate}\n")
+
+    return manifest_path
+
+
+def get_ingested_images(input_path: str) -> list[str]:
+    """ Get the images encoded in the video, in the order of the frames.
+
+    Args:
+        input_path (str): The path to the folder with the images (or their manifest).
+
+    Returns:
+        list[str]: The paths to the images of the frames.
+    """
+
+    manifest_path = os.path.join(input_path, IMAGE_MANIFEST)
+
+    if not os.path.exists(manifest_path):
+        return sorted(glob.glob(os.path.join(input_path, "images", "frame_*.png")))
+
+    image_paths = []
+    with open(manifest_path, mode="rt", encoding="utf-8") as manifest:
+        for line in manifest:
+            if line.startswith("file "):
+                image_paths.append(line[len("file "):].strip()[1:-1].replace("'\\''", "'"))
+
+    return image_paths
+
+
+def _ffmpeg_input(input_path: str, framerate: int) -> list[str]:
+    """ Get the ffmpeg arguments reading the images (from their manifest if there is one). """
+
+    manifest_path = os.path.join(input_path, IMAGE_MANIFEST)
+
+    if os.path.exists(manifest_path):
+        return ["-f", "concat", "-safe", "0", "-i", manifest_path, "-r", str(framerate)]
+
+    image_pattern = os.path.join(input_path, "images", "frame_*.png")
+
+    return ["-framerate", str(framerate), "-pattern_type", "glob", "-i", image_pattern]
+
 
 def copy_video(video_path: str, output_folder: str):
     """ Copy the video to the output folder.
@@ -64,32 +171,42 @@ def copy_video(video_path: str, output_folder: str):
     shutil.copy2(video_path, os.path.join(output_folder, "video.ivf"))
 
 
-def generate_json(input_path: str):
-    """ Generate json file using AOM inspect tool.
+def generate_metadata(input_path: str, cache_path: str) -> str:
+    """ Generate the metadata cache using AOM inspect tool.
+
+    The output of the inspect tool is parsed while the video is decoded, so the
+    JSON file is never written on disk.
 
-    To get the metadata of an ivf file, we use AOM inspect tool. This tool
-    generate a json file.
-    
     Args:
-        input_path (str): The path to the folder containing the images.
+        input_path (str): The path to the folder containing the video.
+        cache_path (str): The path to the metadata cache.
+
+    Returns:
+        str: The path to the metadata cache.
     """
 
-    command = f"./src/third_parties/aom_build/examples/inspect {input_path}/video.ivf "
-    command += f" -mv -r -bs > {input_path}/video.json"
-    subprocess.run(command, shell=True)
+    command = ["./src/third_parties/aom_build/examples/inspect", f"{input_path}/video.ivf", "-mv", "-r", "-bs"]
+
+    with subprocess.Popen(command, stdout=subprocess.PIPE) as process:
+        build_metadata_cache(process.stdout, cache_path)
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
 
+    return cache_path
 
-def generate_video(input_path: str):
+
+def generate_video(input_path: str, framerate: int = 60):
     """ Generate a video from the images.
 
     Args:
-        input_path (str): The path to the folder containing the images.
+        input_path (str): The path to the folder containing the images (or their manifest).
+        framerate (int): The frame rate of the video.
     """
 
-    command = f"ffmpeg -framerate {60} -pattern_type glob -i './{input_path}/images/frame_*.png' -pix_fmt yuv444p " \
-                    f"{input_path}/video.y4m"
-    
-    subprocess.run(command, shell=True)
+    command = ["ffmpeg", *_ffmpeg_input(input_path, framerate), "-pix_fmt", "yuv444p", f"{input_path}/video.y4m"]
+
+    subprocess.run(command)
 
 
 def generate_ivf_file(input_path: str, encoding_preset: str):
@@ -104,6 +221,50 @@ def generate_ivf_file(input_path: str, encoding_preset: str):
     subprocess.run(command, shell=True)
 
 
+def generate_ivf_stream(input_path: str, encoding_preset: str, framerate: int = 60):
+    """ Generate an ivf file from the images, without writing the y4m video.
+
+    ffmpeg writes the y4m video to a pipe read by the encoding preset, which is
+    given "-" (the standard input) as input path. The frames are never written on
+    disk and the memory used is bounded by the pipe buffer: ffmpeg blocks while
+    the encoder has not consumed the previous frames.
+
+    Args:
+        input_path (str): The path to the folder containing the images (or their manifest).
+        encoding_preset (str): The encoding preset.
+        framerate (int): The frame rate of the video.
+    """
+
+    decode_command = [
+        "ffmpeg", "-loglevel", "error",
+        *_ffmpeg_input(input_path, framerate),
+        "-pix_fmt", "yuv444p", "-f", "yuv4mpegpipe", "-",
+    ]
+    encode_command = [f"./src/encoding/{encoding_preset}.sh", "-", f"{input_path}/video.ivf"]
+
+    pipe_commands(decode_command, encode_command)
+
+
+def pipe_commands(source_command: list[str], sink_command: list[str]):
+    """ Run two commands, the standard output of the first one piped to the second one.
+
+    The pipe connects the two processes directly, the data never goes through Python.
+
+    Args:
+        source_command (list[str]): The command writing to the pipe.
+        sink_command (list[str]): The command reading from the pipe.
+    """
+
+    with subprocess.Popen(source_command, stdout=subprocess.PIPE) as source:
+        with subprocess.Popen(sink_command, stdin=source.stdout) as sink:
+            # Only the sink reads the pipe, so the source stops if the sink exits.
+            source.stdout.close()
+
+    for process, command in ((source, source_command), (sink, sink_command)):
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+
 def get_image_paths(folder_path: str) -> list[str]:
     """ Get the paths of all the images in the folder.
 
@@ -131,16 +292,22 @@ def get_image_paths(folder_path: str) -> list[str]:
     return image_paths
 
 
-def process_images(input_path: str, output_path: str, encoding_preset: str):
+def process_images(input_path: str, output_path: str, encoding_preset: str, pipe: bool = False):
     """ Process the images.
 
     Args:
         input_path (str): The path to the folder containing the images.
         output_path (str): The path to the output folder.
         encoding_preset (str): The encoding preset.
+        pipe (bool): Pipe the video to the encoder instead of writing the y4m file
+            (see `generate_ivf_stream`).
     """
 
     image_paths = get_image_paths(input_path)
     copy_images(image_paths, output_path)
-    generate_video(output_path)
-    generate_ivf_file(output_path, encoding_preset)
\ No newline at end of file
+
+    if pipe:
+        generate_ivf_stream(output_path, encoding_preset)
+    else:
+        generate_video(output_path)
+        generate_ivf_file(output_path, encoding_preset)
\ No newline at end of file
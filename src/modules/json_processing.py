@@ -15,13 +15,19 @@
  '''
 
 
-import os
-import subprocess
+import functools
+import io
+import mmap
+from typing import BinaryIO
+from typing import Iterator
 
 import cv2
+import ijson
 import numpy as np
 import re
 
+from .keypoints import KEYPOINT_DTYPE
+
 
 block_size = {
     0: [4, 4],
@@ -48,145 +54,327 @@ block_size = {
     21: [64, 16],
 }
 
+# Arrays of the frame metadata decoded straight into NumPy by the "numpy" JSON backend.
+ARRAY_KEYS = ("blockSize", "motionVectors", "referenceFrame")
+
+JSON_BACKENDS = ("yajl2_c", "python", "numpy")
+
+# Compact dtypes of the arrays of the frames: block size identifiers (0 to 21),
+# motion vectors in 1/8 pixel units and reference frame indices (-1 to 7).
+ARRAY_DTYPES = {"blockSize": np.uint8, "motionVectors": np.int16, "referenceFrame": np.int8}
+
+# Lookup tables (in pixels) indexed by block size identifier.
+_BLOCK_WIDTHS = np.array([block_size[i][0] for i in range(len(block_size))])
+_BLOCK_HEIGHTS = np.array([block_size[i][1] for i in range(len(block_size))])
+
+
+class MiGrid:
+    """ Lazy full-resolution view of a field stored at the mode info grid resolution.
+
+    AV1 stores the motion vectors and references once per 4x4 block of pixels (mode
+    info unit). The grid keeps the field at this resolution and maps the pixel
+    coordinates to grid cells when it is indexed, so a frame-sized field is never
+    built. Indexing the first two axes with integers or integer arrays gathers the
+    values at those pixels, for example `grid[pixel_y, pixel_x]`.
+
+    Values can be stored in a compact dtype and decoded when they are read: they
+    are first mapped through `lookup` (if any), then multiplied by `unit`.
+
+    Args:
+        values: The field at the grid resolution (height, width, ...).
+        scale: Size in pixels of a grid cell.
+        unit: Value of a unit of the stored values.
+        lookup: Table mapping the stored values to the decoded ones.
+    """
+
+    def __init__(self, values: np.ndarray, scale: int = 4, unit: float = 1, lookup: np.ndarray = None):
+
+        self.values = np.asarray(values)
+        self.scale = scale
+        self.unit = unit
+        self.lookup = None if lookup is None else np.asarray(lookup)
+
+    @property
+    def shape(self) -> tuple:
+        """ Shape of the field at the pixel resolution. """
+
+        height, width = self.values.shape[:2]
+
+        return (height * self.scale, width * self.scale) + self.values.shape[2:]
+
+    @property
+    def dtype(self) -> np.dtype:
+        """ Dtype of the decoded values. """
+
+        return self._decode(self.values[:0, :0]).dtype
+
+    @property
+    def raw(self) -> "MiGrid":
+        """ View of the stored values, without the lookup and the unit. """
+
+        return MiGrid(self.values, self.scale)
+
+    def __getitem__(self, key):
+
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        if len(key) < 2 or not all(_is_integer_index(index) for index in key[:2]):
+            # Slices and masks are taken from the full-resolution field.
+            return np.asarray(self)[key]
+
+        pixel_y, pixel_x = key[:2]
+
+        return self._decode(
+            self.values[(np.floor_divide(pixel_y, self.scale), np.floor_divide(pixel_x, self.scale)) + key[2:]]
+        )
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """ Build the field at the pixel resolution. """
+
+        field = self._decode(np.repeat(np.repeat(self.values, self.scale, axis=0), self.scale, axis=1))
+
+        return field if dtype is None else field.astype(dtype)
+
+    def _decode(self, values: np.ndarray) -> np.ndarray:
+
+        if self.lookup is not None:
+            values = self.lookup[values]
+
+        if self.unit != 1:
+            values = values * self.unit
+
+        return values
+
+
+def _is_integer_index(index) -> bool:
+    """ Check if an index is an integer or an array of integers. """
+
+    return isinstance(index, (int, np.integer)) or (
+        isinstance(index, np.ndarray) and np.issubdtype(index.dtype, np.integer)
+    )
+
+
+def parse_frames(json_path: str | BinaryIO, backend: str = "auto", prefix: str = "frame") -> Iterator[dict]:
+    """ This function is used to stream the metadata of the frames out of the JSON file.
+
+    The JSON generated by AOM inspect tool is huge and mostly made of the arrays of
+    the frames (block sizes, motion vectors and reference frames). Available backends:
+        - "yajl2_c": ijson with its C backend.
+        - "python": ijson with its pure python backend.
+        - "numpy": the arrays of `ARRAY_KEYS` are decoded straight into NumPy arrays,
+          without building nested python lists. The rest of the JSON is parsed by ijson.
+        - "auto": "numpy", which is the fastest one.
+
+    Streams (for example the output of AOM inspect tool) can not be memory mapped,
+    so they are parsed by ijson ("auto" picks "yajl2_c" if it is available).
+
+    Args:
+        json_path: Path to the JSON file, or binary stream of the JSON.
+        backend: Name of the backend.
+        prefix: ijson prefix of the frames.
+
+    Returns:
+        An iterator over the metadata of the frames.
+    """
+
+    if not isinstance(json_path, str):
+        if backend == "auto":
+            backend = "yajl2_c" if _json_backend_available("yajl2_c") else "python"
+        if backend == "numpy":
+            raise ValueError("The numpy JSON backend can only parse files.")
+        yield from ijson.get_backend(_select_json_backend(backend)).items(json_path, prefix)
+        return
+
+    backend = _select_json_backend(backend)
+
+    if backend == "numpy":
+        yield from _parse_frames_numpy(json_path, prefix)
+        return
+
+    with open(json_path, "rb") as json_file:
+        yield from ijson.get_backend(backend).items(json_file, prefix)
+
+
+def block_id_dtype(number_block: int) -> np.dtype:
+    """ This function is used to get the dtype of the block ids of a frame.
+
+    Args:
+        number_block: Number of blocks of the frame.
+
+    Returns:
+        uint16 if all the block ids fit in it, int32 otherwise.
+    """
+
+    if number_block <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+
+    return np.dtype(np.int32)
+
 
-def get_block_map(frame_metadata: dict, temp_folder: str) -> np.ndarray:
+def get_block_map(
+    frame_metadata: dict,
+    temp_folder: str,
+    feat_file: bool = True,
+    image: np.ndarray = None
+) -> tuple[np.ndarray, list[list[float]], np.ndarray, np.ndarray]:
     """ This function is used to get the block map out of AV1 bitstream.
 
+    Every block of the frame gets an index (in raster order of its top-left
+    corner) and is painted with it in the block map (see `block_id_dtype`). The
+    center, minimal size and orientation of every block are its keypoint, which
+    can also be exported as text in the `.feat` file of the frame.
+
     Args:
-        frame_metadata: Metadata of the frame.
+        frame_metadata: Metadata of the frame (from the JSON or a `MetadataCache`).
         temp_folder: Path to the temporary folder.
+        feat_file: Write the `.feat` file of the frame.
+        image: Gray image of the frame (see `frames.FrameSource`). Read from
+            `images/frame_{n}.png` in the temporary folder if None.
     Returns:
-        A numpy array of the block map.
+        A numpy array of the block map, the centers of the blocks, the area of
+        every block in pixels (see `_block_areas`) and the keypoints of the blocks
+        (`KEYPOINT_DTYPE`).
     """
 
-    block_size_data = np.array(frame_metadata["blockSize"])
+    block_size_data = np.asarray(frame_metadata["blockSize"])
 
     height, width = block_size_data.shape
 
-    coord_block = []
     frame_number = frame_metadata["frame"]
-    
-    result = np.zeros((4*height, 4*width), dtype=int)
 
-    block_index = 1
+    labels, origin_y, origin_x = _label_blocks(block_size_data)
 
-    image_path = f"{temp_folder}/images/frame_{frame_number}.png"
-    image = cv2.imread(image_path)
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Every cell of the grid is a 4x4 block of pixels.
+    labels = labels.astype(block_id_dtype(len(origin_y)), copy=False)
+    result = np.repeat(np.repeat(labels, 4, axis=0), 4, axis=1)
 
-    for i in range(height):
-        for j in range(width):
+    block_width = _BLOCK_WIDTHS[block_size_data[origin_y, origin_x]]
+    block_height = _BLOCK_HEIGHTS[block_size_data[origin_y, origin_x]]
 
-            if result[i*4, j*4] == 0:
+    block_areas = _block_areas(labels, origin_y, origin_x, block_width, block_height)
 
-                block_identifier = block_size_data[i, j]
+    block_center_x = (origin_x * 4) + ((block_width - 1) / 2)
+    block_center_y = (origin_y * 4) + ((block_height - 1) / 2)
 
-                block_width, block_height = block_size[block_identifier]
+    minimal_block_size = np.minimum(block_width, block_height)
 
-                result[i*4:i*4+block_height, j*4:j*4+block_width] = block_index
-                block_index += 1
+    x_patch = (block_center_x - minimal_block_size // 2).astype(int)
+    y_patch = (block_center_y - minimal_block_size // 2).astype(int)
 
-                block_center_x = (j*4) + ((block_width-1) / 2)
-                block_center_y = (i*4) + ((block_height-1) / 2)
+    coord_block = np.stack((block_center_x, block_center_y), axis=1).tolist()
 
-                minimal_block_size = min(block_width, block_height)
+    if image is None:
+        image_path = f"{temp_folder}/images/frame_{frame_number}.png"
+        image = cv2.imread(image_path)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-                x_patch = int(block_center_x - minimal_block_size//2)
-                y_patch = int(block_center_y - minimal_block_size//2)
+    angles = _compute_angles(image, x_patch, y_patch, minimal_block_size)
 
-                coord_block.append([block_center_x, block_center_y])
+    keypoints = np.empty(len(origin_y), dtype=KEYPOINT_DTYPE)
+    keypoints["x"] = block_center_x
+    keypoints["y"] = block_center_y
+    keypoints["scale"] = minimal_block_size
+    keypoints["angle"] = angles
 
-                block_patch = image[y_patch:y_patch+minimal_block_size, x_patch:x_patch+minimal_block_size]
+    if feat_file:
+        _write_feat_file(f"{temp_folder}/frame_{frame_number}.feat", coord_block, minimal_block_size, angles)
 
-                angle = _compute_angle(block_patch, minimal_block_size)
+    return result, coord_block, block_areas, keypoints
 
-                with open(f"{temp_folder}/frame_{frame_number}.feat", mode="a", encoding="utf-8") as feat_file:
-                    feat_file.write(f"{block_center_x} {block_center_y} {minimal_block_size} {angle}\n")
 
-    result = result - 1
+def _write_feat_file(path: str, coord_block: list[list[float]], sizes: np.ndarray, angles: np.ndarray) -> None:
+    """ This function is used to export the features of a frame as text.
+
+    Every line is a block: `x y size angle`. The lines of the frame are built in
+    memory and written at once.
+
+    Args:
+        path: Path to the `.feat` file.
+        coord_block: The centers of the blocks.
+        sizes: The minimal size of every block.
+        angles: The orientation of every block.
+    """
 
-    return result, coord_block
+    lines = [
+        f"{center_x} {center_y} {size} {angle}\n"
+        for (center_x, center_y), size, angle in zip(coord_block, sizes.tolist(), angles.tolist())
+    ]
 
-def get_frame_ref_index(temp_folder: str) -> list[list[int]]:
-    """ This function is used to get the order hints out of AV1 bitstream.
+    with open(path, mode="w", encoding="utf-8") as feat_file:
+        feat_file.write("".join(lines))
 
-    When processing the metadata, if we check from reference frame index, we have
-    a number representing the type of frame (last, golden, etc). However, in our
-    case we would rather have the frame number.
-    The conversion array between frame type and frame number is the order hints.
+
+def _block_areas(
+    labels: np.ndarray,
+    origin_y: np.ndarray,
+    origin_x: np.ndarray,
+    block_width: np.ndarray,
+    block_height: np.ndarray
+) -> np.ndarray:
+    """ This function is used to get the area of every block of the frame.
+
+    When the blocks tile the grid, areas come from the block sizes (cropped at the
+    border of the frame) without looking at the pixels. Otherwise blocks overlap
+    and the cells of every label are counted.
 
     Args:
-        temp_folder: Path to the temporary folder.
+        labels: The labels of the 4x4 grid.
+        origin_y: Row of the top-left cell of every block.
+        origin_x: Column of the top-left cell of every block.
+        block_width: Width of every block in pixels.
+        block_height: Height of every block in pixels.
 
     Returns:
-        A list of all the order hints (list of integers).
+        The area of every block in pixels (int32).
     """
 
-    # Call av1parser tool to analyze the bitstrean and save this analysis in a txt file.
-    command = f"cd src/third_parties/av1parser && cargo run ../../../{temp_folder}/video.ivf -vv"
-    command += f" > ../../../{temp_folder}/output_bitstream.txt && cd ../../.."
-    
-    subprocess.run(command, shell=True)
+    height, width = labels.shape
 
-    # Define a RegEx pattern to find the order hints in the txt file.
-    pattern = re.compile("order_hints: \[(.*?)\]")
+    areas = np.minimum(block_height, (height - origin_y) * 4) * np.minimum(block_width, (width - origin_x) * 4)
 
-    # Read the txt file and find the order hints.
-    with open(f"{temp_folder}/output_bitstream.txt", mode="rt", encoding="utf-8") as docFile:
-        doc = docFile.read()
-        refs_frame_index = re.findall(pattern, doc)
+    if areas.sum() != height * width * 16:
+        areas = np.bincount(labels.ravel(), minlength=len(origin_y)) * 16
 
-    # Remove the txt file.
-    os.remove(f"{temp_folder}/output_bitstream.txt")
+    return areas.astype(np.int32)
 
-    return refs_frame_index
 
-
-def get_motion_vectors(frame_metadata: dict) -> np.ndarray:
+def get_motion_vectors(frame_metadata: dict) -> MiGrid:
     """ This function is used to get the motion vectors out of AV1 bitstream.
 
     Args:
-        frame_metadata: Metadata of the frame.
+        frame_metadata: Metadata of the frame (from the JSON or a `MetadataCache`).
 
     Returns:
-        A numpy array of motion vectors with 4 channels. first two are backward motion
-        and the last two are forward motion.
+        A `MiGrid` of motion vectors with 4 channels, indexed by pixel. first two are
+        backward motion and the last two are forward motion.
     """
 
-    # AV1 has 1/* pixel precision. Therefore motion vectors are divided by 8.
-    motion_vectors = np.array(frame_metadata["motionVectors"]) / 8
+    motion_vectors = np.asarray(frame_metadata["motionVectors"], dtype=ARRAY_DTYPES["motionVectors"])
 
     motion_vectors = _inverse_motion(motion_vectors)
 
-    # the array is 1/16 of the size of the frame. we upsample it by giving the same value to all the new pixels.
-    height, width, _ = motion_vectors.shape
-    motion_vectors = cv2.resize(motion_vectors, (width * 4, height * 4), interpolation=cv2.INTER_NEAREST)
-
-    return motion_vectors
+    # the array is 1/16 of the size of the frame. Pixels are mapped to their 4x4 block on access.
+    # AV1 has 1/8 pixel precision. Therefore motion vectors are divided by 8 when they are read.
+    return MiGrid(motion_vectors, unit=1 / 8)
 
 
-def get_reference_frame(frame_metadata: dict, order_hint: list[int]) -> np.ndarray:
+def get_reference_frame(frame_metadata: dict, order_hint: np.ndarray) -> MiGrid:
     """ This function is used to get the reference frame out of AV1 bitstream.
 
     Args:
-        frame_metadata: Metadata of the frame.
-        order_hint: Order hint of the frame.
+        frame_metadata: Metadata of the frame (from the JSON or a `MetadataCache`).
+        order_hint: Order hints of the references of the frame (see `get_frame_ref_index`).
 
     Returns:
-        A numpy array of the reference frame.
+        A `MiGrid` of the reference frame numbers, indexed by pixel.
     """
 
-    reference_frame = np.array(frame_metadata["referenceFrame"])
-
-    mapping = np.array(order_hint)
-    # Use the references as indices into the mapping array
-    reference_frame_index =  mapping[reference_frame]
+    reference_frame = np.asarray(frame_metadata["referenceFrame"], dtype=ARRAY_DTYPES["referenceFrame"])
 
-    height, width, _ = reference_frame_index.shape
-
-    reference_frame_index = cv2.resize(reference_frame_index, (width * 4, height * 4), interpolation=cv2.INTER_NEAREST)
-
-    return reference_frame_index
+    mapping = np.asarray(order_hint)
+    # The references are used as indices into the mapping array when they are read.
+    return MiGrid(reference_frame, lookup=mapping)
 
 
 def _compute_angle(block_patch: np.array, size: int) -> float:
@@ -202,8 +390,7 @@ def _compute_angle(block_patch: np.array, size: int) -> float:
         The main angle of the block.
     """
 
-    weighting = _gaussian2d([size, size], 2)
-    weighting = np.diag(weighting.ravel())
+    weighting = _gaussian_kernel(size).ravel()
 
     block_patch = block_patch.astype(np.float32)
 
@@ -215,7 +402,7 @@ def _compute_angle(block_patch: np.array, size: int) -> float:
     gy = gy.ravel()
 
     g = np.vstack((gx,gy)).T
-    gtwg = g.T.dot(weighting).dot(g)
+    gtwg = (g * weighting[:, None]).T.dot(g)
     w, v = np.linalg.eig(gtwg)
 
     nonzerow = np.count_nonzero(np.isreal(w))
@@ -239,6 +426,350 @@ def _compute_angle(block_patch: np.array, size: int) -> float:
     return angle
 
 
+def _compute_angles(image: np.ndarray, x_patch: np.ndarray, y_patch: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """ This function is used to compute the main orientation of the gradient of many blocks.
+
+    Batched version of `_compute_angle`. Blocks are grouped by size and, for each
+    group, the gradients and the gaussian weighted structure tensors of all the
+    patches are computed at once. The 2x2 eigenproblems are solved in closed form.
+
+    Args:
+        image: Gray image of the frame.
+        x_patch: x coordinate of the top-left corner of every patch.
+        y_patch: y coordinate of the top-left corner of every patch.
+        sizes: Size of every patch.
+
+    Returns:
+        The main angle of every block (in radian, between 0 and pi).
+    """
+
+    x_patch = np.asarray(x_patch, dtype=int)
+    y_patch = np.asarray(y_patch, dtype=int)
+    sizes = np.asarray(sizes, dtype=int)
+
+    image_height, image_width = image.shape[:2]
+
+    angles = np.empty(len(sizes))
+
+    for size in np.unique(sizes):
+
+        group = np.nonzero(sizes == size)[0]
+        x = x_patch[group]
+        y = y_patch[group]
+
+        patches = np.empty((len(group), size, size), dtype=np.float32)
+
+        # Patches fully inside the image are gathered at once.
+        inside = (x + size <= image_width) & (y + size <= image_height)
+        offsets = np.arange(size)
+        rows = y[inside, None, None] + offsets[None, :, None]
+        cols = x[inside, None, None] + offsets[None, None, :]
+        patches[inside] = image[rows, cols]
+
+        # Patches cropped by the border of the image are resized like in `_compute_angle`.
+        for k in np.nonzero(~inside)[0]:
+            block_patch = image[y[k]:y[k]+size, x[k]:x[k]+size].astype(np.float32)
+            patches[k] = cv2.resize(block_patch, (int(size), int(size)))
+
+        angles[group] = _structure_tensor_angles(patches, _gaussian_kernel(int(size)))
+
+    return angles
+
+
+def _structure_tensor_angles(patches: np.ndarray, weighting: np.ndarray) -> np.ndarray:
+    """ This function is used to compute the main orientation of a batch of patches.
+
+    The structure tensor of every patch is [[a, b], [b, c]]. The eigenvector of its
+    largest eigenvalue has the angle 0.5 * arctan2(2b, a - c).
+
+    Args:
+        patches: Patches of the same size (n, size, size).
+        weighting: Weight of every pixel of a patch (size, size).
+
+    Returns:
+        The main angle of every patch (in radian, between 0 and pi).
+    """
+
+    gy, gx = np.gradient(patches, axis=(1, 2))
+
+    gx = gx.astype(np.float64)
+    gy = gy.astype(np.float64)
+
+    a = np.sum(gx * gx * weighting, axis=(1, 2))
+    b = np.sum(gx * gy * weighting, axis=(1, 2))
+    c = np.sum(gy * gy * weighting, axis=(1, 2))
+
+    angles = 0.5 * np.arctan2(2 * b, a - c)
+    angles = np.where(angles < 0, angles + np.pi, angles) + 0.0
+
+    # Isotropic tensors have no main direction. We keep the same convention as
+    # `np.linalg.eig` in `_compute_angle` (vertical direction).
+    angles[(b == 0) & (a == c)] = np.pi / 2
+
+    return angles
+
+
+def _select_json_backend(backend: str) -> str:
+    """ This function is used to resolve the name of a JSON backend.
+
+    Args:
+        backend: Name of the backend (or "auto").
+
+    Returns:
+        The name of an available backend.
+    """
+
+    if backend == "auto":
+        return "numpy"
+
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+
+    if not _json_backend_available(backend):
+        raise ValueError(f"JSON backend not available: {backend}")
+
+    return backend
+
+
+def _json_backend_available(backend: str) -> bool:
+    """ This function is used to check if a JSON backend can be used.
+
+    Args:
+        backend: Name of the backend.
+
+    Returns:
+        True if the backend can be used.
+    """
+
+    if backend == "numpy":
+        return True
+
+    try:
+        ijson.get_backend(backend)
+    except ImportError:
+        return False
+
+    return True
+
+
+def _parse_frames_numpy(json_path: str, prefix: str) -> Iterator[dict]:
+    """ This function is used to stream the frames with the arrays decoded by NumPy.
+
+    The arrays of `ARRAY_KEYS` are located in the (memory-mapped) file and replaced by
+    their index in a small skeleton of the JSON, parsed by ijson. Every array is then
+    decoded when its frame is yielded.
+
+    Args:
+        json_path: Path to the JSON file.
+        prefix: ijson prefix of the frames.
+
+    Returns:
+        An iterator over the metadata of the frames.
+    """
+
+    with open(json_path, "rb") as json_file, mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+        spans = []
+        skeleton = []
+        position = 0
+
+        for match in _ARRAY_PATTERN.finditer(data):
+
+            depth = match.group(2).count(b"[")
+            end = re.compile(rb"\](?:\s*\]){%d}" % (depth - 1)).search(data, match.end(2)).end()
+
+            skeleton.append(data[position:match.start(2)])
+            skeleton.append(str(len(spans)).encode())
+            spans.append((match.start(2), end, depth))
+            position = end
+
+        skeleton.append(data[position:])
+
+        for frame_metadata in ijson.items(io.BytesIO(b"".join(skeleton)), prefix):
+
+            for key in ARRAY_KEYS:
+                if key in frame_metadata:
+                    start, end, depth = spans[frame_metadata[key]]
+                    frame_metadata[key] = _decode_int_array(data[start:end], depth).astype(ARRAY_DTYPES[key])
+
+            yield frame_metadata
+
+
+_ARRAY_PATTERN = re.compile(rb'"(' + rb"|".join(key.encode() for key in ARRAY_KEYS) + rb')"\s*:\s*(\[(?:\s*\[)*)')
+
+_ARRAY_TRANSLATION = bytes.maketrans(b"[],", b"   ")
+
+
+def _decode_int_array(text: bytes, depth: int) -> np.ndarray:
+    """ This function is used to decode a rectangular JSON array of integers.
+
+    Values are parsed by NumPy once brackets and commas are replaced by spaces. The
+    shape comes from the number of brackets: an array of shape (n1, n2, n3) has n1
+    + n1 * n2 inner brackets and n3 values in its first innermost array.
+
+    Args:
+        text: The JSON text of the array.
+        depth: Number of dimensions of the array (1 to 3).
+
+    Returns:
+        The decoded array.
+    """
+
+    if not 1 <= depth <= 3:
+        raise ValueError(f"Arrays of depth {depth} are not supported.")
+
+    values = np.fromstring(text.translate(_ARRAY_TRANSLATION), dtype=np.int64, sep=" ")
+
+    if depth == 1 or len(values) == 0:
+        return values
+
+    # Length of the innermost arrays (values before the first closing bracket).
+    innermost = len(text[:text.index(b"]")].translate(_ARRAY_TRANSLATION).split())
+    number_innermost = len(values) // innermost
+
+    if depth == 2:
+        return values.reshape(number_innermost, innermost)
+
+    number_row = text.count(b"[") - 1 - number_innermost
+
+    return values.reshape(number_row, number_innermost // number_row, innermost)
+
+
+def _label_blocks(block_size_data: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ This function is used to label the blocks of the 4x4 grid.
+
+    Blocks are labelled in raster order of their top-left cell, which gives the
+    same labels as visiting every unlabelled cell of the grid in raster order and
+    painting its block.
+
+    AV1 partitions tile the frame. Therefore, along a row (resp. a column), a run
+    of cells sharing the same block size is a sequence of blocks of the same width
+    (resp. height) starting at the beginning of the run. This gives the position
+    of every cell inside its block and so the top-left cells of all the blocks.
+    Labels are then obtained with a cumulative sum over the top-left cells.
+
+    If the block sizes do not tile the grid, we fall back to the sequential scan.
+
+    Args:
+        block_size_data: Block size identifiers of the 4x4 grid.
+
+    Returns:
+        The labels of the grid (starting at 0) and the row and column of the
+        top-left cell of every block.
+    """
+
+    height, width = block_size_data.shape
+
+    width_cells = _BLOCK_WIDTHS[block_size_data] // 4
+    height_cells = _BLOCK_HEIGHTS[block_size_data] // 4
+
+    rows = np.arange(height)[:, None]
+    cols = np.arange(width)[None, :]
+
+    # Column where the run of the cell begins (along the row).
+    run_start = np.ones(block_size_data.shape, dtype=bool)
+    run_start[:, 1:] = block_size_data[:, 1:] != block_size_data[:, :-1]
+    run_start_col = np.maximum.accumulate(np.where(run_start, cols, 0), axis=1)
+    offset_x = (cols - run_start_col) % width_cells
+
+    # Row where the run of the cell begins (along the column).
+    run_start = np.ones(block_size_data.shape, dtype=bool)
+    run_start[1:, :] = block_size_data[1:, :] != block_size_data[:-1, :]
+    run_start_row = np.maximum.accumulate(np.where(run_start, rows, 0), axis=0)
+    offset_y = (rows - run_start_row) % height_cells
+
+    top_left = (offset_x == 0) & (offset_y == 0)
+
+    parent_y = rows - offset_y
+    parent_x = cols - offset_x
+
+    # The blocks tile the grid if every cell points to a top-left cell of the
+    # same size and the (cropped) areas of the blocks sum up to the grid area.
+    origin_y, origin_x = np.nonzero(top_left)
+    area = np.minimum(height_cells[origin_y, origin_x], height - origin_y) \
+        * np.minimum(width_cells[origin_y, origin_x], width - origin_x)
+
+    is_tiling = (
+        np.all(top_left[parent_y, parent_x])
+        and np.array_equal(block_size_data[parent_y, parent_x], block_size_data)
+        and area.sum() == height * width
+    )
+
+    if not is_tiling:
+        return _label_blocks_scan(block_size_data)
+
+    labels = np.cumsum(top_left.ravel()).reshape(top_left.shape) - 1
+    labels = labels[parent_y, parent_x]
+
+    return labels, origin_y, origin_x
+
+
+def _label_blocks_scan(block_size_data: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ This function is used to label the blocks of the 4x4 grid sequentially.
+
+    Every unlabelled cell of the grid is visited in raster order and its block is
+    painted with a new label. Used when the block sizes do not tile the grid.
+
+    Args:
+        block_size_data: Block size identifiers of the 4x4 grid.
+
+    Returns:
+        The labels of the grid (starting at 0) and the row and column of the
+        top-left cell of every block.
+    """
+
+    height, width = block_size_data.shape
+
+    labels = np.full((height, width), -1, dtype=int)
+    origin_y = []
+    origin_x = []
+
+    for i in range(height):
+        for j in range(width):
+
+            if labels[i, j] == -1:
+
+                block_width, block_height = block_size[int(block_size_data[i, j])]
+
+                labels[i:i+block_height//4, j:j+block_width//4] = len(origin_y)
+                origin_y.append(i)
+                origin_x.append(j)
+
+    return labels, np.array(origin_y, dtype=int), np.array(origin_x, dtype=int)
+
+
+def gaussian_kernel_cache_info() -> functools._CacheInfo:
+    """ This function is used to get the statistics of the gaussian kernel cache.
+
+    Kernels of the AV1 block sizes are built at import. Any other miss means a
+    kernel has been built while processing a frame.
+
+    Returns:
+        The hits, misses, maximum size and current size of the cache.
+    """
+
+    return _gaussian_kernel.cache_info()
+
+
+@functools.lru_cache(maxsize=32)
+def _gaussian_kernel(size: int) -> np.ndarray:
+    """ This function is used to get the gaussian weighting of a block.
+
+    Kernels are cached by size. The returned array is read-only.
+
+    Args:
+        size: Size of the block.
+
+    Returns:
+        The gaussian weighting (size, size) used to compute the orientation.
+    """
+
+    kernel = _gaussian2d([size, size], 2)
+    kernel.setflags(write=False)
+
+    return kernel
+
+
 def _gaussian2d(shape=(3,3),sigma=0.5):
     """
     2D gaussian mask - should give the same result as MATLAB's
@@ -288,17 +819,7 @@ def _inverse_motion(motion_vectors:np.array) -> np.array:
     return result
 
 
-def _get_reference_frame_number(reference_frame: np.array, order_hint: list[int]) -> np.array:
-    """ This function is used to get the reference frame number out of AV1 bitstream.
-
-    Args:
-        reference_frame: The reference frame.
-        order_hint: The order hint.
-
-    Returns:
-        The reference frame number.
-    """
-
-    result = order_hint[int(reference_frame)]
-
-    return result
+# Build the kernels of all the minimal block sizes of AV1 (4 to 128).
+for _size in sorted(set(_BLOCK_WIDTHS.tolist()) | set(_BLOCK_HEIGHTS.tolist())):
+    _gaussian_kernel(_size)
+del _size
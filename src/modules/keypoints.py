@@ -0,0 +1,118 @@
+'''
+ # @ : keypoints.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Binary storage of the keypoints of all the frames.
+
+ Every block of a frame is a keypoint (x, y, scale, angle), the same values as a
+ line of the `.feat` files. The keypoints of all the frames are saved as float32
+ structured arrays in a single file that is memory mapped by the readers, so they
+ never parse text. The keypoint of a block is at the index of the block.
+
+ The store is a container (see `container`):
+    - data: keypoints of every frame, one after the other.
+    - index: for every frame, its number, the offset and the number of keypoints.
+ '''
+
+import os
+
+import numpy as np
+
+from .container import ContainerReader
+from .container import ContainerWriter
+
+
+KEYPOINT_MAGIC = b"AV1SFMKP"
+KEYPOINT_VERSION = 2
+
+KEYPOINT_DTYPE = np.dtype([
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("scale", "<f4"),
+    ("angle", "<f4"),
+])
+
+_INDEX_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("offset", "<u8"),
+    ("count", "<u8"),
+])
+
+
+def keypoint_store_path(temp_folder: str) -> str:
+    """ Get the path of the keypoint store of a temporary folder.
+
+    Args:
+        temp_folder: Path to the temporary folder.
+    Returns:
+        The path of the keypoint store.
+    """
+
+    return os.path.join(temp_folder, "keypoints.bin")
+
+
+class KeypointWriter(ContainerWriter):
+    """ Write keypoints in a keypoint store, one frame at a time.
+
+    The store is written to a temporary file and moved to its path when it is
+    closed, so readers never see a partial store.
+
+    Args:
+        path: Path to the keypoint store (overwritten).
+    """
+
+    MAGIC = KEYPOINT_MAGIC
+    VERSION = KEYPOINT_VERSION
+
+    def __init__(self, path: str):
+
+        super().__init__(path)
+
+        self._index = []
+
+    def write(self, frame_number: int, keypoints: np.ndarray) -> None:
+        """ Append the keypoints of a frame.
+
+        Args:
+            frame_number: The frame number.
+            keypoints: The keypoints of the frame (`KEYPOINT_DTYPE`).
+        """
+
+        keypoints = np.ascontiguousarray(keypoints, dtype=KEYPOINT_DTYPE)
+
+        self._index.append((frame_number, self._append(keypoints), len(keypoints)))
+
+    def _tables(self) -> list[np.ndarray]:
+
+        return [np.array(self._index, dtype=_INDEX_DTYPE)]
+
+
+class KeypointStore(ContainerReader):
+    """ Random access to the keypoints of a keypoint store.
+
+    Args:
+        path: Path to the keypoint store.
+    """
+
+    MAGIC = KEYPOINT_MAGIC
+    VERSION = KEYPOINT_VERSION
+    DESCRIPTION = "keypoint store"
+    TABLE_DTYPES = (_INDEX_DTYPE,)
+
+    def read(self, frame_number: int) -> np.ndarray:
+        """ Get the keypoints of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The keypoints of the frame (`KEYPOINT_DTYPE`, read-only view of the file).
+        """
+
+        entry = self._entry(frame_number)
+
+        return self._view(int(entry["offset"]), int(entry["count"]), KEYPOINT_DTYPE)
@@ -0,0 +1,295 @@
+'''
+ # @ : matches.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Columnar storage of the matches between frames.
+
+ Matches are stored column by column in growable NumPy arrays. Every match links
+ a block of a source frame to a block of a target frame.
+ '''
+
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+
+class MatchStore:
+    """ Columnar store of the matches between frames.
+
+    Every column is a contiguous int32 array. Rows are appended in amortized O(1)
+    by doubling the capacity of the arrays when they are full. Feature ids are -1
+    until the matches are converted to block indices.
+
+    Columns:
+        source_frame: Frame number of the source block.
+        source_x, source_y: Coordinates of the source block center.
+        target_frame: Frame number of the target block.
+        target_x, target_y: Coordinates of the target block center.
+        feature_id: Block index of the source block.
+        feature_id_target: Block index of the target block.
+    """
+
+    COLUMNS = (
+        "source_frame",
+        "source_x",
+        "source_y",
+        "target_frame",
+        "target_x",
+        "target_y",
+        "feature_id",
+        "feature_id_target",
+    )
+
+    DTYPE = np.int32
+
+    def __init__(self, capacity: int = 1024):
+
+        # One row of the array per column, so every column is contiguous.
+        self._data = np.empty((len(self.COLUMNS), max(capacity, 1)), dtype=self.DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """ Get a column of the store (view, no copy). """
+
+        return self._data[self.COLUMNS.index(column), :self._size]
+
+    @property
+    def data(self) -> np.ndarray:
+        """ All the columns of the store (view of shape (number of columns, number of rows)). """
+
+        return self._data[:, :self._size]
+
+    def append(
+        self,
+        source_frame: int,
+        source_coord: list[int],
+        target_frame: int,
+        target_coord: list[int],
+        feature_id: int = -1,
+        feature_id_target: int = -1,
+    ) -> None:
+        """ Append a single match to the store.
+
+        Args:
+            source_frame: Frame number of the source block.
+            source_coord: Coordinates (x, y) of the source block center.
+            target_frame: Frame number of the target block.
+            target_coord: Coordinates (x, y) of the target block center.
+            feature_id: Block index of the source block.
+            feature_id_target: Block index of the target block.
+        """
+
+        self._reserve(self._size + 1)
+
+        self._data[:, self._size] = (
+            source_frame,
+            source_coord[0],
+            source_coord[1],
+            target_frame,
+            target_coord[0],
+            target_coord[1],
+            feature_id,
+            feature_id_target,
+        )
+        self._size += 1
+
+    def extend(self, **columns: np.ndarray) -> None:
+        """ Append many matches to the store at once.
+
+        Columns are given by name. Missing feature ids are set to -1 and scalars
+        are broadcast to the length of the other columns.
+
+        Args:
+            columns: Arrays of the new values of every column.
+        """
+
+        unknown = set(columns) - set(self.COLUMNS)
+        if unknown:
+            raise KeyError(f"Unknown columns: {sorted(unknown)}")
+
+        lengths = [np.size(values) for values in columns.values() if np.ndim(values) > 0]
+        length = max(lengths, default=1)
+        if length == 0:
+            return
+
+        self._reserve(self._size + length)
+
+        for index, column in enumerate(self.COLUMNS):
+            self._data[index, self._size:self._size + length] = columns.get(column, -1)
+
+        self._size += length
+
+    def extend_from(self, other: "MatchStore") -> None:
+        """ Append all the matches of another store.
+
+        Args:
+            other: The store to copy the matches from.
+        """
+
+        self._reserve(self._size + len(other))
+        self._data[:, self._size:self._size + len(other)] = other.data
+        self._size += len(other)
+
+    def select(self, rows: np.ndarray) -> "MatchStore":
+        """ Get a new store with a subset of the matches.
+
+        Args:
+            rows: Boolean mask or indices of the rows to keep.
+
+        Returns:
+            A new store with a copy of the selected rows.
+        """
+
+        data = self.data[:, rows]
+
+        store = MatchStore(capacity=data.shape[1])
+        store._data[:, :data.shape[1]] = data
+        store._size = data.shape[1]
+
+        return store
+
+    def unique(self) -> "MatchStore":
+        """ Get a new store without duplicated matches, sorted by row values.
+
+        Returns:
+            A new store with the unique rows.
+        """
+
+        return self.select(np.unique(self.data, axis=1, return_index=True)[1])
+
+    @classmethod
+    def load(cls, path: str) -> "MatchStore":
+        """ Load the matches written by a `MatchWriter`.
+
+        Args:
+            path: Path to the match file.
+
+        Returns:
+            A store with all the matches of the file.
+        """
+
+        rows = np.fromfile(path, dtype=cls.DTYPE).reshape(-1, len(cls.COLUMNS))
+
+        store = cls(capacity=len(rows))
+        store._data[:, :len(rows)] = rows.T
+        store._size = len(rows)
+
+        return store
+
+    @classmethod
+    def load_chunks(cls, path: str, chunk_rows: int = 1 << 20) -> Iterator["MatchStore"]:
+        """ Load the matches written by a `MatchWriter`, a chunk of rows at a time.
+
+        The file is memory mapped, so only the chunk being read is in memory.
+
+        Args:
+            path: Path to the match file.
+            chunk_rows: Number of matches of every chunk.
+
+        Returns:
+            An iterator over stores of the matches of the file, in the order they were written.
+        """
+
+        if os.path.getsize(path) == 0:
+            return
+
+        rows = np.memmap(path, dtype=cls.DTYPE, mode="r").reshape(-1, len(cls.COLUMNS))
+
+        for start in range(0, len(rows), chunk_rows):
+
+            chunk = rows[start:start + chunk_rows]
+
+            store = cls(capacity=len(chunk))
+            store._data[:, :len(chunk)] = chunk.T
+            store._size = len(chunk)
+
+            yield store
+
+    def to_pandas(self) -> pd.DataFrame:
+        """ Export the matches to a pandas DataFrame without copying them.
+
+        Returns:
+            A DataFrame with one column per column of the store.
+        """
+
+        return pd.DataFrame(self.data.T, columns=list(self.COLUMNS), copy=False)
+
+    def to_arrow(self):
+        """ Export the matches to a pyarrow Table without copying them.
+
+        Returns:
+            A pyarrow Table with one column per column of the store.
+        """
+
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError("pyarrow is required to export the matches to Arrow.") from error
+
+        return pa.table({column: self[column] for column in self.COLUMNS})
+
+    def _reserve(self, capacity: int) -> None:
+        """ Grow the arrays so they can hold at least `capacity` rows.
+
+        Args:
+            capacity: The number of rows the store must be able to hold.
+        """
+
+        if capacity <= self._data.shape[1]:
+            return
+
+        new_capacity = max(capacity, 2 * self._data.shape[1])
+
+        data = np.empty((len(self.COLUMNS), new_capacity), dtype=self.DTYPE)
+        data[:, :self._size] = self._data[:, :self._size]
+        self._data = data
+
+
+class MatchWriter:
+    """ Append matches to a file on disk.
+
+    Matches are written row by row as raw int32 values (one value per column of
+    `MatchStore`), so a file can be filled chunk by chunk while streaming the frames
+    and read back with `MatchStore.load`.
+
+    Args:
+        path: Path to the match file (overwritten).
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.number_rows = 0
+
+        self._file = open(path, mode="wb")
+
+    def __enter__(self) -> "MatchWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, matches: MatchStore) -> None:
+        """ Append matches to the file.
+
+        Args:
+            matches: The matches to write.
+        """
+
+        np.ascontiguousarray(matches.data.T).tofile(self._file)
+        self.number_rows += len(matches)
+
+    def close(self) -> None:
+        """ Flush and close the file. """
+
+        self._file.close()
@@ -0,0 +1,170 @@
+'''
+ # @ : metadata.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Binary cache of the frame metadata generated by AOM inspect tool.
+
+ Decoding the ivf file with AOM inspect tool and parsing the JSON it generates is
+ the slowest part of the pipeline. The arrays of every frame (block sizes, motion
+ vectors and reference frames) are saved once in a binary file that can be memory
+ mapped. The metadata stage of the pipeline keys the cache by the ivf file, so
+ repeated runs on the same video skip decoding and parsing entirely.
+
+ The cache is a container (see `container`):
+    - data: raw arrays of every frame, one after the other.
+    - index: for every frame, its number and the offset, dtype and shape of its arrays.
+ '''
+
+import os
+from typing import BinaryIO
+from typing import Iterator
+
+import numpy as np
+
+from .container import ContainerReader
+from .container import ContainerWriter
+from .json_processing import ARRAY_DTYPES
+from .json_processing import ARRAY_KEYS
+from .json_processing import parse_frames
+
+
+METADATA_MAGIC = b"AV1SFMMD"
+METADATA_VERSION = 2
+
+# Arrays have at most 3 dimensions. Unused dimensions have a size of 1.
+_INDEX_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("offset", "<u8", (len(ARRAY_KEYS),)),
+    ("dtype", "S3", (len(ARRAY_KEYS),)),
+    ("ndim", "<u1", (len(ARRAY_KEYS),)),
+    ("shape", "<i8", (len(ARRAY_KEYS), 3)),
+])
+
+
+def build_metadata_cache(source: str | BinaryIO, cache_path: str, backend: str = "auto") -> str:
+    """ Save the arrays of all the frames of an inspect JSON in a metadata cache.
+
+    Args:
+        source: Path to the JSON file, or stream of the JSON (for example the
+            standard output of AOM inspect tool).
+        cache_path: Path to the metadata cache.
+        backend: Backend used to parse the JSON (see `parse_frames`).
+    Returns:
+        The path to the metadata cache.
+    """
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+
+    with MetadataWriter(cache_path) as writer:
+        for frame_metadata in parse_frames(source, backend):
+            writer.write(frame_metadata)
+
+    return cache_path
+
+
+class MetadataWriter(ContainerWriter):
+    """ Write the arrays of the frames in a metadata cache, one frame at a time.
+
+    The cache is written to a temporary file and moved to its path when it is
+    closed, so an interrupted run never leaves a partial cache.
+
+    Args:
+        path: Path to the metadata cache (overwritten).
+    """
+
+    MAGIC = METADATA_MAGIC
+    VERSION = METADATA_VERSION
+
+    def __init__(self, path: str):
+
+        super().__init__(path)
+
+        self._index = []
+
+    def write(self, frame_metadata: dict) -> None:
+        """ Append the arrays of a frame.
+
+        Args:
+            frame_metadata: Metadata of the frame.
+        """
+
+        entry = np.zeros((), dtype=_INDEX_DTYPE)
+        entry["frame"] = frame_metadata["frame"]
+        entry["shape"] = 1
+
+        for index, key in enumerate(ARRAY_KEYS):
+
+            if key not in frame_metadata:
+                entry["dtype"][index] = b""
+                continue
+
+            array = np.ascontiguousarray(frame_metadata[key], dtype=ARRAY_DTYPES[key])
+            array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+
+            entry["offset"][index] = self._append(array)
+            entry["dtype"][index] = array.dtype.str.encode()
+            entry["ndim"][index] = array.ndim
+            entry["shape"][index, :array.ndim] = array.shape
+
+        self._index.append(entry)
+
+    def _tables(self) -> list[np.ndarray]:
+
+        return [np.array(self._index, dtype=_INDEX_DTYPE)]
+
+
+class MetadataCache(ContainerReader):
+    """ Random access to the frame metadata of a metadata cache.
+
+    The file is memory mapped. Frames are dictionaries with the same keys as the
+    frames of the inspect JSON ("frame" and the arrays of `ARRAY_KEYS`), so they
+    can be given to `get_block_map`, `get_motion_vectors` and `get_reference_frame`.
+
+    Args:
+        path: Path to the metadata cache.
+    """
+
+    MAGIC = METADATA_MAGIC
+    VERSION = METADATA_VERSION
+    DESCRIPTION = "metadata cache"
+    TABLE_DTYPES = (_INDEX_DTYPE,)
+
+    def __iter__(self) -> Iterator[dict]:
+        """ Iterate over the frames in the order of the inspect JSON. """
+
+        for position in range(len(self)):
+            yield self._frame_at(position)
+
+    def frame(self, frame_number: int) -> dict:
+        """ Get the metadata of a frame.
+
+        Args:
+            frame_number: The frame number.
+        Returns:
+            The metadata of the frame. Arrays are read-only views of the file.
+        """
+
+        return self._frame_at(self._positions[frame_number])
+
+    def _frame_at(self, position: int) -> dict:
+
+        entry = self._index[position]
+
+        frame_metadata = {"frame": int(entry["frame"])}
+
+        for index, key in enumerate(ARRAY_KEYS):
+
+            if not entry["dtype"][index]:
+                continue
+
+            dtype = np.dtype(entry["dtype"][index].decode())
+            shape = tuple(entry["shape"][index, :entry["ndim"][index]])
+
+            frame_metadata[key] = self._view(int(entry["offset"][index]), int(np.prod(shape)), dtype).reshape(shape)
+
+        return frame_metadata
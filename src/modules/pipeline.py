@@ -0,0 +1,417 @@
+'''
+ # @ : pipeline.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Incremental pipeline with content-addressed stage artifacts.
+
+ The pipeline is a chain of stages:
+    images -> y4m -> ivf -> metadata -> features -> adjacency -> colmap
+
+ With `pipe`, the y4m stage is skipped: the video is piped to the encoder.
+
+ Every stage writes its artifacts in its own folder of the cache,
+ `{cache_folder}/{stage}/{key}`. The key is a hash of the stage name, its
+ parameters and the keys of its inputs, and the first stage is keyed by the
+ content of the input images (or video). A stage whose folder already exists is
+ not run again, so a rerun only recomputes the stages whose inputs or parameters
+ changed: changing the adjacency threshold only reruns the adjacency stage.
+
+ A stage is built in a temporary folder that is renamed to its key when it
+ succeeds, so an interrupted run never leaves a partial artifact. Stages read the
+ artifacts of their inputs through symbolic links, with the layout of the
+ temporary folder expected by the other modules (images/, video.ivf, ...).
+ '''
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable
+
+import loguru
+import numpy as np
+
+from .colmap import export_colmap_database
+from .features import av1_features_and_matching
+from .features import av1_stream_features_and_matching
+from .frames import ImageFrameSource
+from .frames import VideoFrameSource
+from .io import IMAGE_MANIFEST
+from .io import check_ivf_file
+from .io import copy_images
+from .io import copy_video
+from .io import generate_ivf_file
+from .io import generate_ivf_stream
+from .io import generate_metadata
+from .io import generate_video
+from .io import get_image_paths
+from .io import get_ingested_images
+from .io import write_image_manifest
+from .matches import MatchStore
+from .matches import MatchWriter
+from .sfm import image_adjacency_matrix
+from .sfm import keyframe_pairs
+from .sfm import select_keyframes
+
+
+PIPELINE_STAGES = ("images", "y4m", "ivf", "metadata", "features", "adjacency", "colmap")
+
+
+class ArtifactStore:
+    """ Content-addressed folders of the artifacts of the pipeline stages.
+
+    Args:
+        cache_folder: Root folder of the artifacts.
+        logger: The logger (optional).
+    """
+
+    def __init__(self, cache_folder: str, logger: "loguru.Logger" = None):
+
+        self.cache_folder = cache_folder
+        self.logger = logger
+
+    def key(self, stage: str, parameters: dict = None, inputs: list[str] = ()) -> str:
+        """ Compute the key of a stage.
+
+        Args:
+            stage: Name of the stage.
+            parameters: Parameters of the stage (JSON serializable).
+            inputs: Keys of the inputs of the stage (or content hashes of source files).
+        Returns:
+            The key of the stage (SHA-256, hexadecimal).
+        """
+
+        description = json.dumps(
+            {"stage": stage, "parameters": parameters or {}, "inputs": list(inputs)},
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def path(self, stage: str, key: str) -> str:
+        """ Get the folder of the artifacts of a stage (it may not exist yet). """
+
+        return os.path.join(self.cache_folder, stage, key)
+
+    def run(
+        self,
+        stage: str,
+        build: Callable[[str], None],
+        parameters: dict = None,
+        inputs: list[str] = ()
+    ) -> tuple[str, str]:
+        """ Run a stage, unless its artifacts are already in the store.
+
+        Args:
+            stage: Name of the stage.
+            build: Function writing the artifacts of the stage in the folder it is given.
+            parameters: Parameters of the stage (JSON serializable).
+            inputs: Keys of the inputs of the stage.
+        Returns:
+            The key of the stage and the folder of its artifacts.
+        """
+
+        key = self.key(stage, parameters, inputs)
+        path = self.path(stage, key)
+
+        if os.path.isdir(path):
+            self._log(f"Stage {stage}: cached ({key[:12]}).")
+            return key, path
+
+        self._log(f"Stage {stage}: running ({key[:12]}).")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        build_path = tempfile.mkdtemp(prefix=f"{key}.", suffix=".tmp", dir=os.path.dirname(path))
+
+        try:
+            build(build_path)
+            os.replace(build_path, path)
+        except BaseException:
+            shutil.rmtree(build_path, ignore_errors=True)
+            # Built concurrently by another run.
+            if os.path.isdir(path):
+                return key, path
+            raise
+
+        return key, path
+
+    def _log(self, message: str) -> None:
+
+        if self.logger is not None:
+            self.logger.info(message)
+
+
+def hash_files(paths: list[str]) -> str:
+    """ Compute the content hash of a list of files.
+
+    Args:
+        paths: Paths to the files (the order matters, the names do not).
+    Returns:
+        The SHA-256 of the content of the files (hexadecimal).
+    """
+
+    sha256 = hashlib.sha256()
+
+    for path in paths:
+        file_hash = hashlib.sha256()
+
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(chunk)
+
+        sha256.update(file_hash.digest())
+
+    return sha256.hexdigest()
+
+
+def run_pipeline(
+    cache_folder: str,
+    logger: "loguru.Logger",
+    image_path: str = None,
+    video_path: str = None,
+    encoding_preset: str = "preset_1",
+    framerate: int = 60,
+    pipe: bool = False,
+    ingestion: str = "auto",
+    threshold: float = 25,
+    window: int | str = None,
+    keyframes: bool = False,
+    streaming: bool = False,
+    workers: int = 1,
+    feat_files: bool = False,
+    focal_length: float = None
+) -> dict[str, str]:
+    """ Run the stages of the pipeline that are not in the cache.
+
+    Args:
+        cache_folder: Root folder of the artifacts.
+        logger: The logger.
+        image_path: Folder of the input images.
+        video_path: Input ivf file (used if there is no image path). The images,
+            y4m and ivf stages are replaced by a copy of the video.
+        encoding_preset: The encoding preset.
+        framerate: Frame rate of the y4m video.
+        pipe: Pipe the y4m video to the encoder instead of writing it (see `generate_ivf_stream`).
+        ingestion: How the images are ingested: a mode of `copy_images` ("copy",
+            "hardlink", "symlink", "auto") or "manifest" (see `write_image_manifest`).
+        threshold: Minimum coverage of the adjacency (see `image_adjacency_matrix`).
+        window: Maximum frame distance of the adjacency, or "observed" (see `image_adjacency_matrix`).
+        keyframes: Only keep the pairs of adjacent keyframes (see `select_keyframes`).
+        streaming: Convert the matches and build the tracks while streaming the frames
+            (see `av1_stream_features_and_matching`).
+        workers: Number of processes used to extract the features.
+        feat_files: Also export the keypoints as text `.feat` files.
+        focal_length: Focal length of the COLMAP camera (see `export_colmap_database`).
+    Returns:
+        The folder of the artifacts of every stage that was run or found in the cache.
+    """
+
+    store = ArtifactStore(cache_folder, logger)
+    paths = {}
+
+    if image_path:
+        image_paths = get_image_paths(image_path)
+
+        def build_images(path: str) -> None:
+            if ingestion == "manifest":
+                write_image_manifest(image_paths, path, framerate)
+            else:
+                copy_images(image_paths, path, mode=ingestion)
+
+        images_key, paths["images"] = store.run(
+            "images", build_images, _images_parameters(image_paths, ingestion, framerate), [hash_files(image_paths)]
+        )
+
+        encoding_script = f"src/encoding/{encoding_preset}.sh"
+        ivf_parameters = {
+            "encoding_preset": encoding_preset,
+            "script": hash_files([encoding_script]) if os.path.exists(encoding_script) else None,
+        }
+
+        if pipe:
+            # The y4m video is piped to the encoder and never written.
+            def build_ivf(path: str) -> None:
+                _link_images(paths["images"], path)
+                generate_ivf_stream(path, encoding_preset, framerate)
+                _unlink_images(path)
+                _require(os.path.join(path, "video.ivf"))
+
+            ivf_parameters["framerate"] = framerate
+            ivf_key, paths["ivf"] = store.run("ivf", build_ivf, ivf_parameters, [images_key])
+
+        else:
+            def build_y4m(path: str) -> None:
+                _link_images(paths["images"], path)
+                generate_video(path, framerate)
+                _require(os.path.join(path, "video.y4m"))
+
+            y4m_key, paths["y4m"] = store.run("y4m", build_y4m, {"framerate": framerate}, [images_key])
+
+            def build_ivf(path: str) -> None:
+                _link(os.path.join(paths["y4m"], "video.y4m"), os.path.join(path, "video.y4m"))
+                generate_ivf_file(path, encoding_preset)
+                _require(os.path.join(path, "video.ivf"))
+
+            ivf_key, paths["ivf"] = store.run("ivf", build_ivf, ivf_parameters, [y4m_key])
+
+    else:
+        ivf_key, paths["ivf"] = store.run(
+            "ivf",
+            lambda path: copy_video(video_path, path),
+            inputs=[hash_files([video_path])],
+        )
+
+    ivf_file = os.path.join(paths["ivf"], "video.ivf")
+
+    if not check_ivf_file(ivf_file):
+        raise ValueError(f"{ivf_file} is not an AV1 ivf file.")
+
+    def build_metadata(path: str) -> None:
+        _link(ivf_file, os.path.join(path, "video.ivf"))
+        generate_metadata(path, os.path.join(path, "metadata.meta"))
+
+    metadata_key, paths["metadata"] = store.run("metadata", build_metadata, inputs=[ivf_key])
+
+    def build_features(path: str) -> None:
+        _link(ivf_file, os.path.join(path, "video.ivf"))
+
+        # The frames are read from the ingested images, or decoded from the video.
+        if "images" in paths:
+            frame_source = ImageFrameSource(get_ingested_images(paths["images"]))
+        else:
+            frame_source = VideoFrameSource(ivf_file)
+
+        arguments = {
+            "metadata_path": os.path.join(paths["metadata"], "metadata.meta"),
+            "workers": workers,
+            "feat_files": feat_files,
+            "frame_source": frame_source,
+            "direct_matches_path": os.path.join(path, "direct_matches.bin"),
+        }
+
+        with frame_source:
+            # Streaming never holds all the matches: they are written to the file directly.
+            if streaming:
+                av1_stream_features_and_matching(path, logger, os.path.join(path, "matches.bin"), **arguments)
+                return
+
+            matches, _ = av1_features_and_matching(path, logger, **arguments)
+
+        with MatchWriter(os.path.join(path, "matches.bin")) as writer:
+            writer.write(matches)
+
+    features_key, paths["features"] = store.run(
+        "features",
+        build_features,
+        {"streaming": streaming, "feat_files": feat_files},
+        [ivf_key, metadata_key] + ([images_key] if image_path else []),
+    )
+
+    def build_adjacency(path: str) -> None:
+        matches = MatchStore.load(os.path.join(paths["features"], "matches.bin"))
+        direct_matches = None
+        if window == "observed":
+            direct_matches = MatchStore.load(os.path.join(paths["features"], "direct_matches.bin"))
+
+        (indptr, indices, coverage), pairs = image_adjacency_matrix(
+            matches, threshold, temp_folder=paths["features"], window=window, direct_matches=direct_matches
+        )
+
+        # Every frame is a keyframe unless they are selected.
+        frames = np.arange(len(indptr) - 1)
+        if keyframes:
+            frames = select_keyframes((indptr, indices, coverage))
+            pairs = keyframe_pairs(pairs, frames)
+            logger.info(f"{len(frames)} keyframes selected out of {len(indptr) - 1} frames.")
+
+        np.savez(
+            os.path.join(path, "adjacency.npz"),
+            indptr=indptr, indices=indices, coverage=coverage, pairs=pairs, keyframes=frames
+        )
+
+    adjacency_key, paths["adjacency"] = store.run(
+        "adjacency",
+        build_adjacency,
+        {"threshold": threshold, "window": window, "keyframes": keyframes},
+        [features_key],
+    )
+
+    def build_colmap(path: str) -> None:
+        matches = MatchStore.load(os.path.join(paths["features"], "matches.bin"))
+        pairs = np.load(os.path.join(paths["adjacency"], "adjacency.npz"))["pairs"]
+
+        export_colmap_database(
+            os.path.join(path, "database.db"),
+            paths["features"],
+            matches,
+            pairs,
+            focal_length=focal_length,
+            image_paths=get_ingested_images(paths["images"]) if "images" in paths else None,
+        )
+
+    _, paths["colmap"] = store.run(
+        "colmap",
+        build_colmap,
+        {"focal_length": focal_length},
+        [features_key, adjacency_key] + ([images_key] if image_path else []),
+    )
+
+    return paths
+
+
+def _images_parameters(image_paths: list[str], ingestion: str, framerate: int) -> dict:
+    """ Get the parameters of the images stage.
+
+    Copied and hard linked images keep their content when the sources move, but
+    the manifest and the symbolic links point to the sources: their resolved paths
+    are part of the key, so moved or renamed sources are ingested again.
+
+    Args:
+        image_paths: Paths to the input images.
+        ingestion: How the images are ingested (see `run_pipeline`).
+        framerate: Frame rate of the y4m video (written in the manifest).
+    Returns:
+        The parameters of the images stage.
+    """
+
+    parameters = {"ingestion": ingestion, "framerate": framerate if ingestion == "manifest" else None}
+
+    if ingestion in ("manifest", "symlink"):
+        parameters["sources"] = [os.path.realpath(image_path) for image_path in image_paths]
+
+    return parameters
+
+
+def _link(source: str, destination: str) -> None:
+    """ Link an artifact of another stage in the folder of a stage. """
+
+    os.symlink(os.path.abspath(source), destination)
+
+
+def _link_images(images_path: str, destination: str) -> None:
+    """ Link the images folder (or the manifest) of the images stage in the folder of a stage. """
+
+    for name in ("images", IMAGE_MANIFEST):
+        if os.path.exists(os.path.join(images_path, name)):
+            _link(os.path.join(images_path, name), os.path.join(destination, name))
+
+
+def _unlink_images(path: str) -> None:
+    """ Remove the links made by `_link_images`. """
+
+    for name in ("images", IMAGE_MANIFEST):
+        if os.path.islink(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+
+
+def _require(path: str) -> None:
+    """ Check that a stage wrote an artifact (external tools do not always fail loudly). """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} was not generated.")
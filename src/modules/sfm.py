@@ -10,66 +10,175 @@
  # @ Description:
  '''
 
-import itertools
-import os
-
 import numpy as np
-import pandas as pd
+
+from .block_maps import BlockMapStore
+from .block_maps import block_map_store_path
+from .matches import MatchStore
 
 
-def image_adjacency_matrix(matches: list[pd.DataFrame], threshold: int = 25, temp_folder: str = "temp") -> np.ndarray:
+def image_adjacency_matrix(
+    matches: MatchStore,
+    threshold: int = 25,
+    temp_folder: str = "temp",
+    window: int | str = None,
+    direct_matches: MatchStore = None
+) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
     """ Create the adjacency matrix of the image.
 
     The adjacency matrix is a matrix that represents the connections between
-    the frames.
+    the frames. Two frames are adjacent if the blocks of the first frame matched
+    in the second one cover at least `threshold` % of the first frame.
+
+    The coverage of all the pairs of frames is computed in a single grouped pass
+    over the matches, so only the pairs sharing matches are visited. Block areas
+    come from the tables of the block map store, so block maps are never read.
+    The matrix is sparse and returned in CSR format, which can be given as is to
+    `scipy.sparse.csr_matrix((coverage, indices, indptr))`.
+
+    Motion vector matches only link frames within the reach of the AV1 references
+    (`STREAMING_WINDOW` frames), while propagated tracks can link frames much
+    further apart. `window` restricts the pairs to frames at most `window` frames
+    apart. With `window="observed"`, the window is the largest frame distance of
+    the motion vector matches, before propagation (see `observed_window`).
 
     Args:
         matches: The matches between the frames.
         threshold: The threshold for the matches (%).
-        temp_folder: The folder to save the block maps.
+        temp_folder: The temporary folder (with the block map store).
+        window: Maximum distance between the frames of a pair (None for no limit),
+            or "observed".
+        direct_matches: The matches of the motion vectors, before propagation
+            (required with `window="observed"`).
+    Returns:
+        The adjacency matrix in CSR format (indptr, indices, coverage), with a row
+        per frame of the block map store, and the pairs of adjacent frames (source, target).
+    """
+
+    if window == "observed":
+        if direct_matches is None:
+            raise ValueError("The observed window requires the matches before propagation.")
+        window = observed_window(direct_matches)
+
+    source_frame = matches["source_frame"].astype(np.int64)
+    target_frame = matches["target_frame"].astype(np.int64)
+    feature_id = matches["feature_id"].astype(np.int64)
+
+    # Pairs are counted from the lower frame, every matched block once.
+    keep = (source_frame < target_frame) & (feature_id >= 0)
+    if window is not None:
+        keep &= target_frame - source_frame <= window
+    source_frame, target_frame, feature_id = source_frame[keep], target_frame[keep], feature_id[keep]
+
+    order = np.lexsort((feature_id, target_frame, source_frame))
+    source_frame, target_frame, feature_id = source_frame[order], target_frame[order], feature_id[order]
+
+    new_pair = np.ones(len(order), dtype=bool)
+    new_pair[1:] = (source_frame[1:] != source_frame[:-1]) | (target_frame[1:] != target_frame[:-1])
+
+    unique = new_pair.copy()
+    unique[1:] |= feature_id[1:] != feature_id[:-1]
+    source_frame, target_frame, feature_id, new_pair = \
+        source_frame[unique], target_frame[unique], feature_id[unique], new_pair[unique]
+
+    store = BlockMapStore(block_map_store_path(temp_folder))
+
+    # Area (%) of every matched block in its frame.
+    frames = np.unique(source_frame)
+    areas = [_block_coverage(store, int(frame_number)) for frame_number in frames]
+    offsets = np.concatenate(([0], np.cumsum([len(area) for area in areas])[:-1])).astype(np.int64)
+
+    block_area = np.concatenate(areas) if areas else np.empty(0)
+    block_area = block_area[offsets[np.searchsorted(frames, source_frame)] + feature_id]
+
+    # Coverage of every pair of frames.
+    starts = np.nonzero(new_pair)[0]
+    coverage = np.add.reduceat(block_area, starts) if len(starts) else np.empty(0)
+
+    adjacent = coverage >= threshold
+    pairs = np.stack((source_frame[starts][adjacent], target_frame[starts][adjacent]), axis=1)
+    coverage = coverage[adjacent]
+
+    # Frames without any match still have their (empty) row.
+    number_frame = int(store.frame_numbers.max(initial=-1)) + 1
+    indptr = np.zeros(number_frame + 1, dtype=np.int64)
+    np.add.at(indptr, pairs[:, 0] + 1, 1)
+    indptr = np.cumsum(indptr)
+
+    return (indptr, pairs[:, 1], coverage), pairs
+
+
+def observed_window(matches: MatchStore) -> int:
+    """ Get the largest frame distance of the matches.
+
+    On the matches of the motion vectors (`_av1_match`), this is the reach of the
+    AV1 references in the video, usually much shorter than `STREAMING_WINDOW`.
+
+    Args:
+        matches: The matches between the frames.
     Returns:
-        The adjacency matrix.
+        The largest distance between the frames of a match (0 without matches).
     """
 
-    number_frame = len([name for name in os.listdir(f"{temp_folder}/images") if os.path.isfile(name)])
+    distance = np.abs(matches["target_frame"].astype(np.int64) - matches["source_frame"])
+
+    return int(distance.max(initial=0))
+
 
-    adjacency_matrix = np.zeros((number_frame, number_frame))
-    result_pairs = []
+def select_keyframes(adjacency: tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    """ Select a subset of the frames where consecutive frames are adjacent.
 
-    frames_numbers = list(range(0, number_frame + 1))
+    Starting from the first frame, the next keyframe is the farthest frame adjacent
+    to the current keyframe (its coverage is above the threshold). If the keyframe
+    has no adjacent frame, the next frame is taken.
 
-    pairs = list(itertools.combinations(frames_numbers, 2))
+    Args:
+        adjacency: The adjacency matrix in CSR format (see `image_adjacency_matrix`).
+    Returns:
+        The frame numbers of the keyframes, in increasing order.
+    """
 
-    for pair in pairs:
+    indptr, indices, _ = adjacency
+    number_frame = len(indptr) - 1
 
-        dataframe = matches[pair[0]]
+    if number_frame == 0:
+        return np.empty(0, dtype=np.int64)
 
-        dataframe_filtered = dataframe[dataframe['target_frame'] == pair[1]]
+    keyframes = [0]
 
-        dataframe_filtered["coverage"] = _compute_coverage(index=dataframe_filtered["feature_id"], block_map=f"{temp_folder}/block_maps/frame_{pair[0]}.npy")
-        coverage = dataframe_filtered["coverage"].sum()
+    while keyframes[-1] < number_frame - 1:
 
-        if coverage >= threshold:
-            adjacency_matrix[pair[0], pair[1]] = 1
-            result_pairs.append(pair)
+        keyframe = keyframes[-1]
+        neighbors = indices[indptr[keyframe]:indptr[keyframe + 1]]
 
-    return adjacency_matrix, result_pairs
+        keyframes.append(int(neighbors.max()) if len(neighbors) else keyframe + 1)
 
+    return np.array(keyframes, dtype=np.int64)
 
-def _compute_coverage(index: pd.Index, block_map: str) -> float:
-    """ Compute the coverage of matches.
 
-    We compute the block coverage of the frame between two matches.
+def keyframe_pairs(pairs: np.ndarray, keyframes: np.ndarray) -> np.ndarray:
+    """ Keep the pairs of adjacent frames between keyframes.
 
     Args:
-        index: The index of the matches.
-        block_map: The block map.
+        pairs: The pairs of adjacent frames (see `image_adjacency_matrix`).
+        keyframes: The frame numbers of the keyframes (see `select_keyframes`).
     Returns:
-        The coverage of the matches (%).
+        The pairs whose two frames are keyframes.
     """
 
-    block = np.load(block_map)
+    return pairs[np.isin(pairs, keyframes).all(axis=1)].reshape(-1, 2)
+
+
+def _block_coverage(store: BlockMapStore, frame_number: int) -> np.ndarray:
+    """ Compute the coverage of every block of a frame.
+
+    Args:
+        store: The block map store.
+        frame_number: The frame number.
+    Returns:
+        The area of every block, in % of the frame.
+    """
 
-    coverage = np.mean(block == index) * 100
+    height, width = store.shape(frame_number)
 
-    return coverage
\ No newline at end of file
+    return store.areas(frame_number) * 100 / (height * width)
@@ -0,0 +1,306 @@
+'''
+ # @ : tracks.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: Build feature tracks out of the matches.
+
+ A feature track is the set of observations (frame, feature id) of the same 3D
+ point. Observations are the nodes of a graph and matches are its edges, so the
+ tracks are the connected components of the graph.
+ '''
+
+import numpy as np
+import pandas as pd
+
+from .matches import MatchStore
+from .matches import MatchWriter
+
+
+# Number of following observations of its track every observation is matched with.
+MAX_TRACK_PAIRS = 64
+
+def build_tracks(matches: MatchStore, conflicts: str = "keep") -> pd.DataFrame:
+    """ Build the feature tracks out of the matches.
+
+    Connected components are computed with a union-find over NumPy arrays, so the
+    tracks are built in time roughly linear in the number of matches.
+
+    A track can contain two features of the same frame (two blocks matched to
+    the same block). Those tracks can be kept as is, split or dropped:
+        - "keep": keep the tracks as they are.
+        - "split": number the features of every frame of the track (by feature id),
+          make a track of the features of every number and cut it into its connected
+          parts. Features left alone are removed.
+        - "drop": remove the tracks.
+
+    Args:
+        matches: The matches with feature ids populated.
+        conflicts: Policy for the tracks with two features of the same frame.
+    Returns:
+        A DataFrame with one row per observation (track_id, frame, feature_id, x, y)
+        sorted by track and frame.
+    """
+
+    if conflicts not in ("keep", "split", "drop"):
+        raise ValueError(f"Unknown conflicts policy: {conflicts}")
+
+    node_frames, node_features, node_xs, node_ys, source, target = _graph(matches)
+
+    roots = _connected_components(len(node_frames), source, target)
+
+    if conflicts != "keep":
+        roots = _resolve_conflicts(roots, node_frames, source, target, conflicts)
+
+    keep = roots >= 0
+    _, track_ids = np.unique(roots[keep], return_inverse=True)
+
+    tracks = pd.DataFrame({
+        "track_id": track_ids,
+        "frame": node_frames[keep],
+        "feature_id": node_features[keep],
+        "x": node_xs[keep],
+        "y": node_ys[keep],
+    })
+
+    return tracks.sort_values(["track_id", "frame", "feature_id"], ignore_index=True)
+
+
+def stream_tracks(
+    matches_path: str,
+    output_path: str,
+    window: int,
+    conflicts: str = "keep",
+    max_pairs: int = MAX_TRACK_PAIRS,
+    chunk_rows: int = 1 << 20
+) -> int:
+    """ Build the feature tracks of a match file and write their matches to another file.
+
+    The match file is the one of `av1_stream_matches`: a match is only written
+    when both its frames are among the last `window` frames, and the frames come
+    in increasing order. Once `window` newer frames have been seen in the file, a
+    frame can not get a new match anymore.
+
+    The file is read one chunk at a time. The matches of the tracks that can still
+    grow are carried to the next chunk, so the union-find runs over the matches of
+    the current window and not of the whole sequence. A track whose frames can not
+    get a new match is complete: its matches (see `tracks_to_matches`) are written
+    and it is forgotten. This gives the same matches as `build_tracks` followed by
+    `tracks_to_matches` over the whole file, up to their order.
+
+    Args:
+        matches_path: Path to the match file of the matches before propagation.
+        output_path: Path to the match file written with the matches of the tracks.
+        window: Number of frames a frame can be matched with (see `av1_stream_matches`).
+        conflicts: Policy for the tracks with two features of the same frame (see `build_tracks`).
+        max_pairs: Number of following observations matched with every observation
+            (see `tracks_to_matches`).
+        chunk_rows: Number of matches read at a time.
+    Returns:
+        The number of tracks.
+    """
+
+    number_track = 0
+    active = MatchStore()
+    recent_frames = np.empty(0, dtype=np.int64)
+
+    with MatchWriter(output_path) as writer:
+
+        for chunk in MatchStore.load_chunks(matches_path, chunk_rows):
+
+            active.extend_from(chunk)
+
+            # The last `window` frames seen: older frames can not get a new match.
+            recent_frames = np.union1d(
+                recent_frames, np.concatenate((chunk["source_frame"], chunk["target_frame"]))
+            )[-window:]
+            if len(recent_frames) < window:
+                continue
+
+            node_frames, _, _, _, source, target = _graph(active)
+            roots = _connected_components(len(node_frames), source, target)
+
+            track_end = np.full(len(node_frames), -1, dtype=np.int64)
+            np.maximum.at(track_end, roots, node_frames)
+
+            complete = track_end[roots[source]] < recent_frames[0]
+            if not np.any(complete):
+                continue
+
+            tracks = build_tracks(active.select(complete), conflicts)
+            writer.write(tracks_to_matches(tracks, max_pairs))
+            number_track += tracks["track_id"].nunique()
+
+            active = active.select(~complete)
+
+        # The end of the file: the remaining tracks are complete.
+        tracks = build_tracks(active, conflicts)
+        writer.write(tracks_to_matches(tracks, max_pairs))
+        number_track += tracks["track_id"].nunique()
+
+    return number_track
+
+
+def tracks_to_matches(tracks: pd.DataFrame, max_pairs: int = MAX_TRACK_PAIRS) -> MatchStore:
+    """ Get the matches between the observations of every track.
+
+    Matching every pair of observations of a track gives k * (k - 1) / 2 matches
+    for a track of k observations. Every observation is therefore only matched
+    with the next `max_pairs` observations of its track (in frame order), which
+    bounds the matches to `max_pairs` per observation while still linking frames
+    up to `max_pairs` observations apart. Observations of the same frame are not
+    matched together.
+
+    Args:
+        tracks: The tracks built by `build_tracks`.
+        max_pairs: Number of following observations matched with every observation
+            (None to match all the pairs of observations, quadratic in the track length).
+    Returns:
+        matches: A match per pair of observations of a track (lower frame first).
+    """
+
+    tracks = tracks.sort_values(["track_id", "frame", "feature_id"], ignore_index=True)
+
+    track_ids = tracks["track_id"].to_numpy()
+
+    # Every observation is paired with the next ones of its track.
+    track_end = np.searchsorted(track_ids, track_ids, side="right")
+    count = track_end - np.arange(len(track_ids)) - 1
+    if max_pairs is not None:
+        count = np.minimum(count, max_pairs)
+
+    first = np.repeat(np.arange(len(track_ids)), count)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(count) - count, count)
+
+    frames = tracks["frame"].to_numpy()
+    different_frames = frames[first] != frames[second]
+    first = first[different_frames]
+    second = second[different_frames]
+
+    matches = MatchStore(capacity=len(first))
+    matches.extend(
+        source_frame=frames[first],
+        source_x=tracks["x"].to_numpy()[first],
+        source_y=tracks["y"].to_numpy()[first],
+        target_frame=frames[second],
+        target_x=tracks["x"].to_numpy()[second],
+        target_y=tracks["y"].to_numpy()[second],
+        feature_id=tracks["feature_id"].to_numpy()[first],
+        feature_id_target=tracks["feature_id"].to_numpy()[second],
+    )
+
+    return matches
+
+
+def _graph(matches: MatchStore) -> tuple[np.ndarray, ...]:
+    """ Get the graph of the matches.
+
+    Every (frame, feature id) of the matches is a node of the graph, and every
+    match is an edge.
+
+    Args:
+        matches: The matches with feature ids populated.
+    Returns:
+        The frame, feature id, x and y of every node, then the source and target
+        node of every match.
+    """
+
+    frames = np.concatenate((matches["source_frame"], matches["target_frame"])).astype(np.int64)
+    feature_ids = np.concatenate((matches["feature_id"], matches["feature_id_target"])).astype(np.int64)
+    xs = np.concatenate((matches["source_x"], matches["target_x"]))
+    ys = np.concatenate((matches["source_y"], matches["target_y"]))
+
+    keys = frames * (int(feature_ids.max(initial=0)) + 1) + feature_ids
+    _, first, nodes = np.unique(keys, return_index=True, return_inverse=True)
+
+    return frames[first], feature_ids[first], xs[first], ys[first], nodes[:len(matches)], nodes[len(matches):]
+
+
+def _connected_components(number_node: int, source: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """ Compute the connected components of a graph with a vectorized union-find.
+
+    At every iteration, the root of each edge with the highest index is attached to
+    the other root, then the paths are compressed so every node points to its root.
+
+    Args:
+        number_node: Number of nodes of the graph.
+        source: First node of every edge.
+        target: Second node of every edge.
+    Returns:
+        The root (smallest node) of the component of every node.
+    """
+
+    parent = np.arange(number_node)
+
+    while True:
+
+        root_source = parent[source]
+        root_target = parent[target]
+
+        different = root_source != root_target
+        if not np.any(different):
+            break
+
+        low = np.minimum(root_source[different], root_target[different])
+        high = np.maximum(root_source[different], root_target[different])
+        np.minimum.at(parent, high, low)
+
+        # Path compression.
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent = grand_parent
+
+    return parent
+
+
+def _resolve_conflicts(
+    roots: np.ndarray,
+    node_frames: np.ndarray,
+    source: np.ndarray,
+    target: np.ndarray,
+    conflicts: str
+) -> np.ndarray:
+    """ Split or drop the tracks with two features of the same frame.
+
+    Args:
+        roots: The root of the track of every node.
+        node_frames: The frame of every node.
+        source: First node of every match.
+        target: Second node of every match.
+        conflicts: "split" or "drop".
+    Returns:
+        The updated roots. Nodes of dropped tracks have a root of -1.
+    """
+
+    # Rank of every node among the nodes of the same track and frame (nodes of a
+    # frame are sorted by feature id). Only the tracks with at least two nodes in
+    # the same frame have ranks other than 0.
+    order = np.lexsort((np.arange(len(roots)), node_frames, roots))
+    sorted_roots, sorted_frames = roots[order], node_frames[order]
+
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = (sorted_roots[1:] != sorted_roots[:-1]) | (sorted_frames[1:] != sorted_frames[:-1])
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - group_start
+
+    if conflicts == "drop":
+        conflicting = np.zeros(len(roots), dtype=bool)
+        conflicting[roots[rank > 0]] = True
+        return np.where(conflicting[roots], -1, roots)
+
+    # Nodes of the same rank form a new track, cut into its connected parts.
+    same_rank = rank[source] == rank[target]
+    roots = _connected_components(len(roots), source[same_rank], target[same_rank])
+
+    # A node left alone has no match anymore.
+    roots[np.bincount(roots, minlength=len(roots))[roots] < 2] = -1
+
+    return roots
@@ -0,0 +1,85 @@
+'''
+ # @ : bitstream_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the bitstream test.
+ '''
+
+
+class BitstreamTestConfig(object):
+
+    get_frame_ref_index = [
+        (
+            "src/test/data/",
+            [
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 1, 0, 0, 0, 0, 0, 0],
+                [0, 2, 1, 0, 0, 0, 0, 0],
+                [0, 3, 2, 1, 0, 0, 0, 0],
+                [0, 3, 2, 1, 4, 0, 0, 0],
+                [0, 5, 3, 2, 4, 0, 1, 0],
+                [0, 6, 5, 3, 4, 0, 2, 1],
+                [0, 7, 6, 5, 4, 0, 3, 2],
+                [0, 7, 6, 5, 8, 0, 4, 3]
+            ]
+        )
+    ]
+
+    # Synthetic streams: frame headers and the expected order hints.
+    read_order_hints = [
+        # Low delay: every frame refreshes one slot.
+        (
+            [
+                {"type": "key", "order_hint": 0},
+                {"type": "inter", "order_hint": 1, "refresh": 0b00000001, "refs": [0, 1, 2, 3, 4, 5, 6]},
+                {"type": "inter", "order_hint": 2, "refresh": 0b00000010, "refs": [0, 1, 2, 3, 4, 5, 6]},
+                {"type": "inter", "order_hint": 3, "refresh": 0b00000100, "refs": [1, 0, 2, 3, 4, 5, 6]},
+            ],
+            [
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 1, 0, 0, 0, 0, 0, 0],
+                [0, 2, 1, 0, 0, 0, 0, 0],
+            ]
+        ),
+        # Hidden ALTREF frame, shown later as an existing frame.
+        (
+            [
+                {"type": "key", "order_hint": 0},
+                {"type": "inter", "order_hint": 4, "show": 0, "refresh": 0b01000000, "refs": [0] * 7},
+                {"type": "inter", "order_hint": 1, "refresh": 0b00000001, "refs": [0, 0, 0, 0, 0, 0, 6]},
+                {"type": "existing", "index": 6},
+            ],
+            [
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 4],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+            ]
+        ),
+        # References inferred from the last and golden frames (short signaling).
+        (
+            [
+                {"type": "key", "order_hint": 0},
+                {"type": "inter", "order_hint": 8, "show": 0, "refresh": 0b10000000, "refs": [0] * 7},
+                {"type": "short", "order_hint": 1, "refresh": 0b00000001, "last": 0, "gold": 0},
+            ],
+            [
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0, 8],
+            ]
+        ),
+    ]
+
+    set_frame_refs = [
+        # Last frame index, golden frame index, order hint, order hints of the slots, expected indices.
+        (0, 0, 1, [0, 0, 0, 0, 0, 0, 0, 8], [0, 6, 5, 0, 4, 3, 7]),
+        (2, 1, 5, [4, 0, 3, 8, 6, 2, 1, 7], [2, 0, 5, 1, 4, 7, 3]),
+    ]
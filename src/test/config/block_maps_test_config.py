@@ -0,0 +1,23 @@
+'''
+ # @ : block_maps_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the block_maps test.
+ '''
+
+
+class BlockMapsTestConfig(object):
+
+    block_map_store = [
+        # Block maps constant on 4x4 cells (stored at the grid resolution).
+        ("zlib", (64, 96), 4, "uint16", 16),
+        ("zlib", (64, 96), 4, "int32", 3),
+        # Block maps not aligned on the 4x4 grid (stored at the pixel resolution).
+        ("zlib", (30, 45), 1, "uint16", 7),
+        ("zstd", (64, 96), 4, "uint16", 16),
+    ]
@@ -0,0 +1,34 @@
+'''
+ # @ : colmap_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the colmap test.
+ '''
+
+
+class ColmapTestConfig(object):
+
+    pair_id = [
+        (1, 2, 2147483649),
+        (2, 1, 2147483649),
+        (5, 9, 5 * 2147483647 + 9),
+    ]
+
+    export_colmap_database = [
+        (
+            # Matches (source frame, target frame, feature id, target feature id).
+            [[0, 1, 0, 1], [0, 1, 0, 1], [0, 1, 2, 0], [1, 0, 1, 2], [1, 2, 0, 0], [0, 2, 1, 1], [0, 1, -1, 0]],
+            # Adjacent pairs.
+            [[0, 1], [1, 2]],
+            # Expected matches by pair of image ids.
+            {
+                (1, 2): [[0, 1], [2, 0], [2, 1]],
+                (2, 3): [[0, 0]],
+            },
+        ),
+    ]
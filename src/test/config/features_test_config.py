@@ -0,0 +1,87 @@
+'''
+ # @ : features_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the features test.
+ '''
+
+
+class FeaturesTestConfig(object):
+
+    # (seed, frame_number, number of frames, height, width, number of blocks)
+    _av1_match = [
+        (0, 0, 8, 32, 48, 20),
+        (1, 4, 8, 32, 48, 50),
+        (2, 7, 8, 64, 64, 100),
+        (3, 12, 16, 128, 96, 200),
+    ]
+
+    _av1_convert_matches = [
+        (
+            # (source_frame, source_x, source_y, target_frame, target_x, target_y)
+            [
+                [0, 0, 0, 1, 7, 3],
+                [0, 5, 2, 2, 1, 1],
+                [1, 7, 3, 2, -1, 2],
+                [1, 2, 1, 2, 9, 5],
+            ],
+            "drop",
+            [
+                [0, 0, 0, 1, 7, 3, 0, 137],
+                [0, 5, 2, 2, 1, 1, 25, 211],
+            ]
+        ),
+        (
+            [
+                [0, 0, 0, 1, 7, 3],
+                [0, 5, 2, 2, 1, 1],
+                [1, 7, 3, 2, -1, 2],
+                [1, 2, 1, 2, 9, 5],
+            ],
+            "clip",
+            [
+                [0, 0, 0, 1, 7, 3, 0, 137],
+                [0, 5, 2, 2, 1, 1, 25, 211],
+                [1, 7, 3, 2, 0, 2, 137, 220],
+                [1, 2, 1, 2, 7, 3, 112, 237],
+            ]
+        ),
+    ]
+
+    _av1_propagate_matches = [
+        (
+            # (source_frame, target_frame, feature_id, feature_id_target)
+            [
+                [0, 1, 10, 20],
+                [1, 2, 20, 30],
+                [2, 3, 30, 40],
+                [1, 3, 21, 41],
+            ],
+            [
+                [0, 1, 10, 20],
+                [0, 2, 10, 30],
+                [0, 3, 10, 40],
+                [1, 2, 20, 30],
+                [1, 3, 20, 40],
+                [1, 3, 21, 41],
+                [2, 3, 30, 40],
+            ]
+        )
+    ]
+
+    _extract_frames = [
+        # More frames than twice the number of workers, so results are consumed while extracting.
+        [
+            [[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[3,3,0,3,3],[3,3,0,3,3]],
+            [[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6]],
+            [[0,0,0,0,0],[0,0,0,0,0],[0,0,0,0,0],[0,0,0,0,0],[0,0,0,0,0],[0,0,0,0,0]],
+            [[3,3,0,3,3],[3,3,0,3,3],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6]],
+            [[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[3,3,0,3,3],[3,3,0,3,3]],
+            [[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6],[6,6,6,6,6],[0,0,0,0,0],[0,0,0,0,0]],
+        ],
+    ]
@@ -133,3 +133,11 @@ class IoTestConfig:
             ],
         )
     ]
+
+    # Ingestion mode, whether the images are hard links and whether they are symbolic links.
+    copy_images_modes = [
+        ("copy", False, False),
+        ("hardlink", True, False),
+        ("symlink", False, True),
+        ("auto", True, False),
+    ]
@@ -13,24 +13,6 @@
 
 class JsonProcessingTestConfig(object):
 
-    get_frame_ref_index = [
-        (
-            "src/test/data/",
-            [
-                '0, 0, 0, 0, 0, 0, 0, 0', 
-                '0, 0, 0, 0, 0, 0, 0, 0', 
-                '0, 1, 0, 0, 0, 0, 0, 0', 
-                '0, 2, 1, 0, 0, 0, 0, 0', 
-                '0, 3, 2, 1, 0, 0, 0, 0', 
-                '0, 3, 2, 1, 4, 0, 0, 0', 
-                '0, 5, 3, 2, 4, 0, 1, 0', 
-                '0, 6, 5, 3, 4, 0, 2, 1', 
-                '0, 7, 6, 5, 4, 0, 3, 2', 
-                '0, 7, 6, 5, 8, 0, 4, 3'
-            ]
-        )
-    ]
-
     _compute_angle = [
         (
             "src/test/data/images/orientation/0_5.png",
@@ -82,6 +64,70 @@ class JsonProcessingTestConfig(object):
         ),
     ]
 
+    _compute_angles = [
+        (
+            [
+                "src/test/data/images/orientation/0_5.png",
+                "src/test/data/images/orientation/45_5.png",
+                "src/test/data/images/orientation/90_5.png",
+                "src/test/data/images/orientation/135_5.png",
+                "src/test/data/images/orientation/0_9.png",
+                "src/test/data/images/orientation/45_9.png",
+                "src/test/data/images/orientation/90_9.png",
+                "src/test/data/images/orientation/135_9.png",
+                "src/test/data/images/orientation/0_12.png",
+                "src/test/data/images/orientation/45_12.png",
+                "src/test/data/images/orientation/90_12.png",
+                "src/test/data/images/orientation/135_12.png",
+            ],
+            [0, 45, 90, 135, 0, 45, 90, 135, 0, 45, 90, 135]
+        )
+    ]
+
+    gaussian_kernel_cache_info = [
+        [4, 8, 16, 32, 64, 128],
+        [8, 8, 16, 16],
+    ]
+
+    # Frames of a JSON file generated by AOM inspect tool (compact and indented arrays).
+    parse_frames = [
+        (
+            backend,
+            '{"frame": {"frame": 0, "showFrame": 1, "blockSize": [[3,3],[0,12]], '
+            '"motionVectors": [[[0,0,8,-8],[1,2,3,4]]], "referenceFrame": [[[0,-1],[2,1]]], "config": {"MI_SIZE": 4}}, '
+            '"frame": {"frame": 1, "showFrame": 0, "blockSize": [ [ 6, 6, 6 ], [ 6, 6, 6 ] ], '
+            '"motionVectors": [ [ [ -16, 24, 0, 0 ] ], [ [ 5, 6, 7, 8 ] ] ], "referenceFrame": [ [ [ 1, 2 ] ], [ [ 3, -1 ] ] ], '
+            '"config": {"MI_SIZE": 4}}}',
+            [
+                {
+                    "frame": 0,
+                    "blockSize": [[3, 3], [0, 12]],
+                    "motionVectors": [[[0, 0, 8, -8], [1, 2, 3, 4]]],
+                    "referenceFrame": [[[0, -1], [2, 1]]],
+                },
+                {
+                    "frame": 1,
+                    "blockSize": [[6, 6, 6], [6, 6, 6]],
+                    "motionVectors": [[[-16, 24, 0, 0]], [[5, 6, 7, 8]]],
+                    "referenceFrame": [[[1, 2]], [[3, -1]]],
+                },
+            ]
+        )
+        for backend in ["auto", "yajl2_c", "python", "numpy"]
+    ]
+
+    mi_grid = [
+        ((3, 5), 0),
+        ((6, 4, 2), 1),
+        ((2, 7, 4), 2),
+    ]
+
+    block_id_dtype = [
+        (1, "uint16"),
+        (65536, "uint16"),
+        (65537, "int32"),
+    ]
+
     get_block_map = [
         (
             [[0,6,6,6,6,],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[3,3,0,3,3],[3,3,0,3,3]],
@@ -93,6 +139,15 @@ class JsonProcessingTestConfig(object):
         )
     ]
 
+    _label_blocks = [
+        # Blocks tiling the grid.
+        [[0,6,6,6,6,],[0,6,6,6,6],[0,6,6,6,6],[0,6,6,6,6],[3,3,0,3,3],[3,3,0,3,3]],
+        [[6,6,6,6,16,17,17,17,17],[6,6,6,6,16,0,1,2,2],[6,6,6,6,16,0,1,0,0],[6,6,6,6,16,3,3,5,5]],
+        # Block sizes not tiling the grid (overlapping blocks).
+        [[6,0,6,6],[6,6,6,6],[0,6,6,6],[6,6,6,6]],
+        [[3,9,0],[1,3,3],[3,0,0]],
+    ]
+
     get_motion_vectors = [
         (
             [[[0,0,0,0],[0,0,0,0]],[[8,8,8,8],[8,8,8,8]]],
@@ -0,0 +1,61 @@
+'''
+ # @ : matches_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the matches test.
+ '''
+
+
+class MatchesTestConfig(object):
+
+    append = [
+        (
+            [
+                (0, [1, 2], 1, [3, 4]),
+                (0, [5, 6], 2, [7, 8]),
+                (1, [9, 10], 2, [11, 12]),
+            ],
+            [
+                [0, 1, 2, 1, 3, 4, -1, -1],
+                [0, 5, 6, 2, 7, 8, -1, -1],
+                [1, 9, 10, 2, 11, 12, -1, -1],
+            ]
+        )
+    ]
+
+    extend = [
+        (
+            {
+                "source_frame": 3,
+                "source_x": [1, 2, 3],
+                "source_y": [4, 5, 6],
+                "target_frame": [4, 5, 6],
+                "target_x": [7, 8, 9],
+                "target_y": [10, 11, 12],
+            },
+            [
+                [3, 1, 4, 4, 7, 10, -1, -1],
+                [3, 2, 5, 5, 8, 11, -1, -1],
+                [3, 3, 6, 6, 9, 12, -1, -1],
+            ]
+        )
+    ]
+
+    unique = [
+        (
+            [
+                [1, 0, 0, 2, 0, 0, 5, 6],
+                [0, 0, 0, 1, 0, 0, 3, 4],
+                [1, 0, 0, 2, 0, 0, 5, 6],
+            ],
+            [
+                [0, 0, 0, 1, 0, 0, 3, 4],
+                [1, 0, 0, 2, 0, 0, 5, 6],
+            ]
+        )
+    ]
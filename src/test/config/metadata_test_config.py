@@ -0,0 +1,44 @@
+'''
+ # @ : metadata_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the metadata test.
+ '''
+
+
+class MetadataTestConfig(object):
+
+    build_metadata_cache = [
+        (
+            source,
+            '{"frame": {"frame": 0, "blockSize": [[3,3],[0,12]], '
+            '"motionVectors": [[[0,0,8,-8],[1,2,3,4]]], "referenceFrame": [[[0,-1],[2,1]]]}, '
+            '"frame": {"frame": 1, "blockSize": [[6,6,6],[6,6,6]], '
+            '"motionVectors": [[[-16,24,0,0]],[[5,6,7,8]]], "referenceFrame": [[[1,2]],[[3,-1]]]}, '
+            '"frame": {"frame": 2, "blockSize": [[9]]}}',
+            [
+                {
+                    "frame": 0,
+                    "blockSize": [[3, 3], [0, 12]],
+                    "motionVectors": [[[0, 0, 8, -8], [1, 2, 3, 4]]],
+                    "referenceFrame": [[[0, -1], [2, 1]]],
+                },
+                {
+                    "frame": 1,
+                    "blockSize": [[6, 6, 6], [6, 6, 6]],
+                    "motionVectors": [[[-16, 24, 0, 0]], [[5, 6, 7, 8]]],
+                    "referenceFrame": [[[1, 2]], [[3, -1]]],
+                },
+                {
+                    "frame": 2,
+                    "blockSize": [[9]],
+                },
+            ]
+        )
+        for source in ["file", "stream"]
+    ]
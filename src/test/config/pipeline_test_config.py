@@ -0,0 +1,44 @@
+'''
+ # @ : pipeline_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the pipeline test.
+ '''
+
+
+class PipelineTestConfig(object):
+
+    # Two stage descriptions (stage, parameters, inputs) and whether they have the same key.
+    key = [
+        (
+            ("adjacency", {"threshold": 25, "window": None}, ["a"]),
+            ("adjacency", {"window": None, "threshold": 25}, ["a"]),
+            True
+        ),
+        (("adjacency", {"threshold": 25}, ["a"]), ("adjacency", {"threshold": 30}, ["a"]), False),
+        (("adjacency", {"threshold": 25}, ["a"]), ("adjacency", {"threshold": 25}, ["b"]), False),
+        (("metadata", {}, ["a"]), ("features", {}, ["a"]), False),
+        (("metadata", None, ["a"]), ("metadata", {}, ["a"]), True),
+    ]
+
+    # Parameters of the stages of a toy pipeline for two runs, and the stages run the second time.
+    rerun = [
+        ({"first": 1, "second": 1, "third": 1}, {"first": 1, "second": 1, "third": 1}, []),
+        ({"first": 1, "second": 1, "third": 1}, {"first": 1, "second": 1, "third": 2}, ["third"]),
+        ({"first": 1, "second": 1, "third": 1}, {"first": 1, "second": 2, "third": 1}, ["second", "third"]),
+        ({"first": 1, "second": 1, "third": 1}, {"first": 2, "second": 1, "third": 1}, ["first", "second", "third"]),
+    ]
+
+    # Ingestion of the images and whether the images stage depends on their location.
+    images_parameters = [
+        ("copy", False),
+        ("hardlink", False),
+        ("auto", False),
+        ("symlink", True),
+        ("manifest", True),
+    ]
@@ -0,0 +1,30 @@
+'''
+ # @ : sfm_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the sfm test.
+ '''
+
+
+class SfmTestConfig(object):
+
+    image_adjacency_matrix = [
+        # (seed, number of frames, number of matches, threshold)
+        (0, 6, 200, 25),
+        (1, 12, 1000, 10),
+        (2, 4, 0, 25),
+    ]
+
+    select_keyframes = [
+        # Jumps to the farthest adjacent frame.
+        (6, [[0, 1], [0, 3], [1, 2], [3, 4], [3, 5], [4, 5]], [0, 3, 5]),
+        # Frames without adjacent frames are followed by the next frame.
+        (5, [[0, 1], [2, 4]], [0, 1, 2, 4]),
+        (3, [], [0, 1, 2]),
+        (0, [], []),
+    ]
@@ -0,0 +1,104 @@
+'''
+ # @ : tracks_test_config.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to define the configuration for the tracks test.
+ '''
+
+
+class TracksTestConfig(object):
+
+    # Matches are (source_frame, target_frame, feature_id, feature_id_target).
+    # Tracks are lists of (frame, feature_id).
+    build_tracks = [
+        (
+            [
+                [0, 1, 10, 20],
+                [1, 2, 20, 30],
+                [3, 2, 40, 30],
+                [0, 1, 11, 21],
+            ],
+            "keep",
+            [
+                [(0, 10), (1, 20), (2, 30), (3, 40)],
+                [(0, 11), (1, 21)],
+            ]
+        ),
+        (
+            # Features 20 and 22 of frame 1 end up in the same track.
+            [
+                [0, 1, 10, 20],
+                [0, 2, 10, 30],
+                [1, 2, 22, 30],
+                [0, 1, 11, 21],
+            ],
+            "keep",
+            [
+                [(0, 10), (1, 20), (1, 22), (2, 30)],
+                [(0, 11), (1, 21)],
+            ]
+        ),
+        (
+            [
+                [0, 1, 10, 20],
+                [0, 2, 10, 30],
+                [1, 2, 22, 30],
+                [0, 1, 11, 21],
+            ],
+            "split",
+            [
+                [(0, 10), (1, 20), (2, 30)],
+                [(0, 11), (1, 21)],
+            ]
+        ),
+        (
+            # Features 20 and 22 of frame 1 are in the same track: the second features
+            # of frames 1 and 2 form a track of their own.
+            [
+                [0, 1, 10, 20],
+                [1, 2, 20, 30],
+                [0, 1, 10, 22],
+                [1, 2, 22, 31],
+                [2, 3, 30, 40],
+            ],
+            "split",
+            [
+                [(0, 10), (1, 20), (2, 30), (3, 40)],
+                [(1, 22), (2, 31)],
+            ]
+        ),
+        (
+            [
+                [0, 1, 10, 20],
+                [0, 2, 10, 30],
+                [1, 2, 22, 30],
+                [0, 1, 11, 21],
+            ],
+            "drop",
+            [
+                [(0, 11), (1, 21)],
+            ]
+        ),
+    ]
+
+    # Pairs of feature ids matched, with the number of following observations matched.
+    tracks_to_matches = [
+        (
+            None,
+            [
+                (10, 20), (10, 30), (10, 31), (10, 40), (10, 50),
+                (20, 30), (20, 31), (20, 40), (20, 50),
+                (30, 40), (30, 50), (31, 40), (31, 50),
+                (40, 50),
+            ]
+        ),
+        (
+            2,
+            [(10, 20), (10, 30), (20, 30), (20, 31), (30, 40), (31, 40), (31, 50), (40, 50)]
+        ),
+    ]
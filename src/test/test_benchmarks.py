@@ -0,0 +1,65 @@
+'''
+ # @ : test_benchmarks.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the benchmarks.
+ '''
+
+import numpy as np
+
+from ..benchmarks.json_processing import benchmark_frame_memory
+from ..benchmarks.json_processing import benchmark_json_backends
+from ..benchmarks.json_processing import write_inspect_json
+from ..modules.json_processing import JSON_BACKENDS
+from ..modules.json_processing import parse_frames
+
+from .config.json_processing_test_config import JsonProcessingTestConfig
+
+
+def test_benchmark_frame_memory():
+
+    # 4K frame made of 16x16 blocks.
+    height, width = 2160 // 4, 3840 // 4
+    frame_data = {
+        "blockSize": np.full((height, width), 6),
+        "motionVectors": np.zeros((height, width, 4), dtype=int),
+        "referenceFrame": np.zeros((height, width, 2), dtype=int),
+    }
+
+    memory = benchmark_frame_memory(frame_data)
+
+    assert memory["blockMap"] == {"before": 2160 * 3840 * 8, "after": 2160 * 3840 * 2}
+    assert memory["motionVectors"] == {"before": 2160 * 3840 * 4 * 8, "after": height * width * 4 * 2}
+    assert memory["referenceFrame"] == {"before": 2160 * 3840 * 2 * 8, "after": height * width * 2}
+
+
+def test_benchmark_json_backends(tmp_path):
+
+    _, json_text, _ = JsonProcessingTestConfig.parse_frames[0]
+
+    json_path = f"{tmp_path}/video.json"
+    with open(json_path, "w", encoding="utf-8") as json_file:
+        json_file.write(json_text)
+
+    speed = benchmark_json_backends(json_path)
+
+    assert set(speed) <= set(JSON_BACKENDS)
+    assert all(value > 0 for value in speed.values())
+
+
+def test_write_inspect_json(tmp_path):
+
+    json_path = f"{tmp_path}/video.json"
+    write_inspect_json(json_path, 64, 32, 3)
+
+    frames = list(parse_frames(json_path))
+
+    assert [frame_metadata["frame"] for frame_metadata in frames] == [0, 1, 2]
+    assert np.asarray(frames[0]["blockSize"]).shape == (8, 16)
+    assert np.asarray(frames[0]["motionVectors"]).shape == (8, 16, 4)
+    assert np.asarray(frames[0]["referenceFrame"]).shape == (8, 16, 2)
@@ -0,0 +1,207 @@
+'''
+ # @ : test_bitstream.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the bitstream module.
+ '''
+
+import struct
+
+import numpy as np
+import pytest
+
+from ..modules.bitstream import OBU_FRAME_HEADER
+from ..modules.bitstream import OBU_SEQUENCE_HEADER
+from ..modules.bitstream import _BitReader
+from ..modules.bitstream import _leb128
+from ..modules.bitstream import _set_frame_refs
+from ..modules.bitstream import get_frame_ref_index
+from ..modules.bitstream import read_order_hints
+
+from .config.bitstream_test_config import BitstreamTestConfig
+
+
+ORDER_HINT_BITS = 7
+DELTA_FRAME_ID_LENGTH = 5
+ID_LENGTH = 8
+
+
+class BitWriter:
+    """ Write bits, most significant bit first. """
+
+    def __init__(self):
+        self.bits = []
+
+    def f(self, n: int, value: int) -> "BitWriter":
+        self.bits += [(value >> (n - 1 - index)) & 1 for index in range(n)]
+        return self
+
+    def tobytes(self) -> bytes:
+        bits = self.bits + [0] * (-len(self.bits) % 8)
+        return bytes(int("".join(map(str, bits[index:index + 8])), 2) for index in range(0, len(bits), 8))
+
+
+def sequence_header(frame_ids: bool = False) -> bytes:
+
+    writer = BitWriter()
+    writer.f(3, 0).f(1, 0).f(1, 0)  # seq_profile, still_picture, reduced_still_picture_header
+    writer.f(1, 0).f(1, 0)  # timing_info_present_flag, initial_display_delay_present_flag
+    writer.f(5, 0).f(12, 0).f(5, 8).f(1, 0)  # one operating point, seq_level_idx 8 and seq_tier
+    writer.f(4, 15).f(4, 15).f(16, 1919).f(16, 1079)  # frame size
+    writer.f(1, frame_ids)  # frame_id_numbers_present_flag
+    if frame_ids:
+        writer.f(4, DELTA_FRAME_ID_LENGTH - 2).f(3, ID_LENGTH - DELTA_FRAME_ID_LENGTH - 1)
+    writer.f(3, 0)  # use_128x128_superblock, enable_filter_intra, enable_intra_edge_filter
+    writer.f(4, 0)  # enable_interintra_compound ... enable_dual_filter
+    writer.f(1, 1).f(1, 0).f(1, 0)  # enable_order_hint, enable_jnt_comp, enable_ref_frame_mvs
+    writer.f(1, 1).f(1, 1)  # seq_choose_screen_content_tools, seq_choose_integer_mv
+    writer.f(3, ORDER_HINT_BITS - 1)
+    writer.f(16, 0xFFFF)  # Rest of the sequence header (not parsed).
+
+    return writer.tobytes()
+
+
+def frame_header(frame: dict, frame_ids: bool = False) -> bytes:
+
+    writer = BitWriter()
+
+    if frame["type"] == "existing":
+        writer.f(1, 1).f(3, frame["index"])
+        if frame_ids:
+            writer.f(ID_LENGTH, 0xA5)  # display_frame_id
+        return writer.tobytes()
+
+    show_frame = frame.get("show", 1)
+
+    writer.f(1, 0)  # show_existing_frame
+    writer.f(2, 0 if frame["type"] == "key" else 1).f(1, show_frame)
+
+    if not show_frame:
+        writer.f(1, 1)  # showable_frame
+    if frame["type"] != "key":
+        writer.f(1, 0)  # error_resilient_mode
+
+    writer.f(1, 0).f(1, 0)  # disable_cdf_update, allow_screen_content_tools
+    if frame_ids:
+        writer.f(ID_LENGTH, frame["order_hint"])  # current_frame_id
+    writer.f(1, 0)  # frame_size_override_flag
+    writer.f(ORDER_HINT_BITS, frame["order_hint"])
+
+    if frame["type"] != "key":
+        writer.f(3, 7)  # primary_ref_frame
+        writer.f(8, frame["refresh"])
+        writer.f(1, frame["type"] == "short")
+
+        if frame["type"] == "short":
+            writer.f(3, frame["last"]).f(3, frame["gold"])
+
+        for index in range(7):
+            if frame["type"] != "short":
+                writer.f(3, frame["refs"][index])
+            if frame_ids:
+                writer.f(DELTA_FRAME_ID_LENGTH, 0b10101)  # delta_frame_id_minus_1
+
+    writer.f(16, 0xFFFF)  # Rest of the frame header (not parsed).
+
+    return writer.tobytes()
+
+
+def obu(obu_type: int, payload: bytes) -> bytes:
+
+    size = bytearray()
+    value = len(payload)
+    while True:
+        size.append((value & 0x7F) | (0x80 if value >> 7 else 0))
+        value >>= 7
+        if not value:
+            break
+
+    return bytes([(obu_type << 3) | 0b10]) + bytes(size) + payload
+
+
+def write_ivf(path: str, frames: list[dict], frame_ids: bool = False) -> None:
+
+    with open(path, "wb") as ivf_file:
+        ivf_file.write(struct.pack("<4sHH4sHHIIII", b"DKIF", 0, 32, b"AV01", 1920, 1080, 30, 1, len(frames), 0))
+
+        for index, frame in enumerate(frames):
+            temporal_unit = obu(2, b"")  # Temporal delimiter.
+            if index == 0:
+                temporal_unit += obu(OBU_SEQUENCE_HEADER, sequence_header(frame_ids))
+            temporal_unit += obu(OBU_FRAME_HEADER, frame_header(frame, frame_ids))
+
+            ivf_file.write(struct.pack("<IQ", len(temporal_unit), index))
+            ivf_file.write(temporal_unit)
+
+
+@pytest.mark.parametrize(
+    "input_path, expected_output",
+    BitstreamTestConfig.get_frame_ref_index
+)
+def test_get_frame_ref_index(input_path, expected_output):
+
+    result = get_frame_ref_index(input_path)
+
+    assert result.dtype == np.int32
+    assert result.tolist() == expected_output
+
+
+@pytest.mark.parametrize(
+    "frames, expected_output",
+    BitstreamTestConfig.read_order_hints
+)
+def test_read_order_hints(tmp_path, frames, expected_output):
+
+    write_ivf(f"{tmp_path}/video.ivf", frames)
+
+    assert read_order_hints(f"{tmp_path}/video.ivf").tolist() == expected_output
+
+
+@pytest.mark.parametrize(
+    "frames, expected_output",
+    BitstreamTestConfig.read_order_hints
+)
+def test_read_order_hints_frame_ids(tmp_path, frames, expected_output):
+
+    # The frame ids are read, and skipped, in the frame headers.
+    write_ivf(f"{tmp_path}/video.ivf", frames, frame_ids=True)
+
+    assert read_order_hints(f"{tmp_path}/video.ivf").tolist() == expected_output
+
+
+def test_read_order_hints_not_ivf():
+
+    with pytest.raises(ValueError):
+        read_order_hints("src/test/data/000046.avi")
+
+
+@pytest.mark.parametrize(
+    "last_frame_idx, gold_frame_idx, order_hint, ref_order_hint, expected_output",
+    BitstreamTestConfig.set_frame_refs
+)
+def test_set_frame_refs(last_frame_idx, gold_frame_idx, order_hint, ref_order_hint, expected_output):
+
+    result = _set_frame_refs(last_frame_idx, gold_frame_idx, order_hint, ref_order_hint, ORDER_HINT_BITS)
+
+    assert result == expected_output
+
+
+def test_bit_reader():
+
+    reader = _BitReader(bytes([0b10110000, 0b01010000]))
+
+    assert reader.f(1) == 1
+    assert reader.f(3) == 0b011
+    # uvlc: 5 leading zeros, then 0b01000 -> 8 + 2^5 - 1.
+    assert reader.uvlc() == 39
+
+
+def test_leb128():
+
+    assert _leb128(bytes([0x05]), 0) == (5, 1)
+    assert _leb128(bytes([0xFF, 0xE5, 0x8E, 0x26]), 1) == (624485, 4)
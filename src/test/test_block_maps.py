@@ -0,0 +1,74 @@
+'''
+ # @ : test_block_maps.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the block_maps module.
+ '''
+
+import os
+
+import numpy as np
+import pytest
+
+from ..modules.block_maps import BlockMapStore
+from ..modules.block_maps import BlockMapWriter
+from ..modules.block_maps import _zstd_available
+
+from .config.block_maps_test_config import BlockMapsTestConfig
+
+
+@pytest.mark.parametrize(
+    "codec, shape, scale, dtype, chunk_rows",
+    BlockMapsTestConfig.block_map_store
+)
+def test_block_map_store(codec, shape, scale, dtype, chunk_rows, tmp_path):
+
+    if codec == "zstd" and not _zstd_available():
+        pytest.skip("zstandard is not installed.")
+
+    rng = np.random.default_rng(0)
+
+    # Piecewise constant block maps with random blocks of scale x scale pixels.
+    height, width = shape
+    block_maps = {}
+    for frame_number in (3, 0, 7):
+        grid = np.cumsum(rng.random((height // scale + 1, width // scale + 1)) < 0.3).reshape(-1, width // scale + 1)
+        block_map = np.repeat(np.repeat(grid, scale, axis=0), scale, axis=1)[:height, :width]
+        block_maps[frame_number] = block_map.astype(dtype)
+
+    path = f"{tmp_path}/block_maps.bin"
+    with BlockMapWriter(path, codec=codec, chunk_rows=chunk_rows) as writer:
+        for frame_number, block_map in block_maps.items():
+            writer.write(frame_number, block_map)
+
+    # The store is only visible once it is complete.
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    store = BlockMapStore(path)
+
+    assert store.codec == codec
+    assert store.frame_numbers.tolist() == [3, 0, 7]
+    assert 7 in store and 1 not in store
+
+    for frame_number, block_map in block_maps.items():
+
+        result = store.read(frame_number)
+        assert result.dtype == block_map.dtype
+        assert np.array_equal(result, block_map)
+        assert np.array_equal(store.areas(frame_number), np.bincount(block_map.ravel()))
+
+        # Regions, including unaligned ones and ones crossing the border.
+        for _ in range(20):
+            top, bottom = np.sort(rng.integers(-2, height + 3, size=2))
+            left, right = np.sort(rng.integers(-2, width + 3, size=2))
+            region = store.read_region(frame_number, top, bottom, left, right)
+            assert np.array_equal(region, block_map[max(top, 0):bottom, max(left, 0):right])
+
+    # Block maps aligned on the grid compress well.
+    if scale == 4:
+        assert os.path.getsize(path) < sum(block_map.nbytes for block_map in block_maps.values()) / 2
@@ -0,0 +1,118 @@
+'''
+ # @ : test_colmap.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the colmap module.
+ '''
+
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from ..modules.block_maps import BlockMapWriter
+from ..modules.block_maps import block_map_store_path
+from ..modules.colmap import export_colmap_database
+from ..modules.colmap import pair_id
+from ..modules.io import copy_images
+from ..modules.io import get_image_paths
+from ..modules.io import get_ingested_images
+from ..modules.keypoints import KEYPOINT_DTYPE
+from ..modules.keypoints import KeypointWriter
+from ..modules.keypoints import keypoint_store_path
+from ..modules.matches import MatchStore
+
+from .config.colmap_test_config import ColmapTestConfig
+
+
+@pytest.mark.parametrize(
+    "image_id1, image_id2, expected_output",
+    ColmapTestConfig.pair_id
+)
+def test_pair_id(image_id1, image_id2, expected_output):
+    assert pair_id(image_id1, image_id2) == expected_output
+
+
+@pytest.mark.parametrize(
+    "input, pairs, expected_output",
+    ColmapTestConfig.export_colmap_database
+)
+def test_export_colmap_database(input, pairs, expected_output, tmp_path):
+
+    # Images ingested like the images stage of the pipeline, features in another folder.
+    image_paths = get_image_paths("src/test/data/images/png/")[:3]
+    copy_images(image_paths, f"{tmp_path}/ingested")
+
+    temp_folder = f"{tmp_path}/features"
+    os.makedirs(temp_folder)
+
+    keypoints = {}
+    with KeypointWriter(keypoint_store_path(temp_folder)) as writer, \
+            BlockMapWriter(block_map_store_path(temp_folder)) as block_map_writer:
+        for frame_number in range(3):
+            keypoints[frame_number] = np.arange(12, dtype=np.float32).reshape(3, 4) + frame_number / 2
+            writer.write(frame_number, keypoints[frame_number].view(KEYPOINT_DTYPE).ravel())
+            block_map_writer.write(frame_number, np.zeros((64, 96), dtype=np.uint16))
+
+    source_frame, target_frame, feature_id, feature_id_target = np.array(input).T
+
+    matches = MatchStore()
+    matches.extend(
+        source_frame=source_frame,
+        target_frame=target_frame,
+        feature_id=feature_id,
+        feature_id_target=feature_id_target,
+    )
+
+    database_path = export_colmap_database(
+        f"{tmp_path}/database.db",
+        temp_folder,
+        matches,
+        pairs,
+        image_paths=get_ingested_images(f"{tmp_path}/ingested"),
+    )
+
+    connection = sqlite3.connect(database_path)
+
+    # The names are the files written by `copy_images`.
+    images = connection.execute("SELECT image_id, name, camera_id FROM images ORDER BY image_id").fetchall()
+    assert images == [(1, "frame_0000.png", 1), (2, "frame_0001.png", 1), (3, "frame_0002.png", 1)]
+    for _, name, _ in images:
+        assert os.path.exists(f"{tmp_path}/ingested/images/{name}")
+
+    assert connection.execute("SELECT width, height FROM cameras").fetchall() == [(96, 64)]
+
+    for image_id, rows, cols, data in connection.execute("SELECT * FROM keypoints"):
+        assert (rows, cols) == (3, 4)
+        # Keypoints are shifted to the COLMAP convention (center of the first pixel at (0.5, 0.5)).
+        expected_keypoints = keypoints[image_id - 1] + np.array([0.5, 0.5, 0, 0], dtype=np.float32)
+        assert np.array_equal(np.frombuffer(data, dtype=np.float32).reshape(rows, cols), expected_keypoints)
+
+    result = {}
+    for identifier, rows, cols, data in connection.execute("SELECT pair_id, rows, cols, data FROM matches"):
+        image_ids = (identifier // 2147483647, identifier % 2147483647)
+        result[image_ids] = np.frombuffer(data, dtype=np.uint32).reshape(rows, cols).tolist()
+
+    assert result == expected_output
+
+    # Every pair with matches has a calibrated two view geometry with the matches as inliers.
+    geometries = {}
+    for identifier, rows, cols, data, config, F, E, H in connection.execute(
+        "SELECT pair_id, rows, cols, data, config, F, E, H FROM two_view_geometries"
+    ):
+        image_ids = (identifier // 2147483647, identifier % 2147483647)
+        geometries[image_ids] = np.frombuffer(data, dtype=np.uint32).reshape(rows, cols).tolist()
+
+        assert config == 2
+        for matrix in (F, E, H):
+            assert np.array_equal(np.frombuffer(matrix, dtype=np.float64).reshape(3, 3), np.eye(3))
+
+    assert geometries == expected_output
+
+    connection.close()
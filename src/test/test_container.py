@@ -0,0 +1,132 @@
+'''
+ # @ : test_container.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the container module.
+ '''
+
+import os
+
+import numpy as np
+import pytest
+
+from ..modules.container import ContainerReader
+from ..modules.container import ContainerWriter
+
+
+_INDEX_DTYPE = np.dtype([("frame", "<i8"), ("offset", "<u8"), ("count", "<u8")])
+_EXTRA_DTYPE = np.dtype([("value", "<f4")])
+
+
+class _Writer(ContainerWriter):
+
+    MAGIC = b"TESTCONT"
+    VERSION = 3
+
+    def __init__(self, path):
+
+        super().__init__(path)
+
+        self.flags = 5
+        self._index = []
+
+    def write(self, frame_number, data):
+        self._index.append((frame_number, self._append(data), len(data)))
+
+    def _tables(self):
+        return [np.array(self._index, dtype=_INDEX_DTYPE), np.array([(0.5,), (1.5,)], dtype=_EXTRA_DTYPE)]
+
+
+class _Reader(ContainerReader):
+
+    MAGIC = b"TESTCONT"
+    VERSION = 3
+    DESCRIPTION = "test container"
+    TABLE_DTYPES = (_INDEX_DTYPE, _EXTRA_DTYPE)
+
+    def read(self, frame_number):
+        entry = self._entry(frame_number)
+        return self._view(int(entry["offset"]), int(entry["count"]), np.uint8)
+
+
+def test_container(tmp_path):
+
+    path = f"{tmp_path}/data.bin"
+    with _Writer(path) as writer:
+        writer.write(4, b"abc")
+        writer.write(1, np.arange(5, dtype=np.uint8))
+        writer.write(2, b"")
+
+    # The container is only visible once it is complete.
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+    reader = _Reader(path)
+
+    assert reader.flags == 5
+    assert len(reader) == 3
+    assert reader.frame_numbers.tolist() == [4, 1, 2]
+    assert 1 in reader and 3 not in reader
+    assert reader.read(4).tobytes() == b"abc"
+    assert reader.read(1).tolist() == [0, 1, 2, 3, 4]
+    assert reader.read(2).tolist() == []
+    assert reader._tables[1]["value"].tolist() == [0.5, 1.5]
+
+
+def test_container_failure(tmp_path):
+
+    path = f"{tmp_path}/data.bin"
+    with _Writer(path) as writer:
+        writer.write(0, b"complete")
+
+    # An exception in the body leaves the previous container in place, and no temporary file.
+    with pytest.raises(RuntimeError):
+        with _Writer(path) as writer:
+            writer.write(1, b"partial")
+            raise RuntimeError
+
+    assert os.listdir(tmp_path) == ["data.bin"]
+    assert _Reader(path).frame_numbers.tolist() == [0]
+
+
+def test_container_concurrent(tmp_path):
+
+    # Two writers of the same path have their own temporary file: the last one closed wins.
+    path = f"{tmp_path}/data.bin"
+    first, second = _Writer(path), _Writer(path)
+    first.write(0, b"first")
+    second.write(1, b"second")
+    first.close()
+    second.close()
+
+    assert os.listdir(tmp_path) == ["data.bin"]
+    assert _Reader(path).frame_numbers.tolist() == [1]
+
+
+def test_container_abstract(tmp_path):
+
+    class _NoTables(ContainerWriter):
+        pass
+
+    # A writer without the tables of its index can not be created.
+    with pytest.raises(TypeError):
+        _NoTables(f"{tmp_path}/data.bin")
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_container_wrong_format(tmp_path):
+
+    path = f"{tmp_path}/data.bin"
+    with _Writer(path) as writer:
+        writer.write(0, b"data")
+
+    class _OtherVersion(_Reader):
+        VERSION = 4
+
+    with pytest.raises(ValueError):
+        _OtherVersion(path)
@@ -0,0 +1,316 @@
+'''
+ # @ : test_features.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the features module.
+ '''
+
+import itertools
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from ..modules.block_maps import BlockMapWriter
+from ..modules.block_maps import block_map_store_path
+from ..modules.features import BlockMapCache
+from ..modules.features import _av1_convert_matches
+from ..modules.features import _av1_match
+from ..modules.features import _av1_propagate_matches
+from ..modules.features import _extract_frames
+from ..modules.features import _flush_matches
+from ..modules.frames import ImageFrameSource
+from ..modules.json_processing import MiGrid
+from ..modules.matches import MatchStore
+from ..modules.matches import MatchWriter
+
+from .config.features_test_config import FeaturesTestConfig
+
+
+def _av1_match_reference(coord_block, motion_vectors, reference_frame, frame_number):
+    """ Scalar implementation of `_av1_match`, one block at a time. """
+
+    result = []
+
+    for current_block_x, current_block_y in coord_block:
+
+        x, y = int(current_block_x), int(current_block_y)
+
+        coords_motion = {frame_number: (x, y)}
+
+        for reference in range(2):
+
+            motion = motion_vectors[y, x, 2*reference:2*reference+2]
+            target_frame = int(reference_frame[y, x, reference])
+
+            if (motion[0] == 0 and motion[1] == 0) or target_frame in (-1, frame_number):
+                continue
+
+            distance = abs(target_frame - frame_number)
+            direction = 1 if target_frame > frame_number else -1
+
+            for step in range(1, distance + 1):
+                coords_motion[frame_number + direction * step] = (
+                    int(current_block_x + motion[0] * step / distance),
+                    int(current_block_y + motion[1] * step / distance),
+                )
+
+        for frame_1, frame_2 in itertools.combinations(sorted(coords_motion), 2):
+            result.append([frame_1, *coords_motion[frame_1], frame_2, *coords_motion[frame_2]])
+
+    return result
+
+
+@pytest.mark.parametrize(
+    "seed, frame_number, number_frame, height, width, number_block",
+    FeaturesTestConfig._av1_match
+)
+def test__av1_match(seed, frame_number, number_frame, height, width, number_block):
+
+    rng = np.random.default_rng(seed)
+
+    coord_block = np.stack(
+        (rng.integers(0, width // 4, number_block) * 4 + 1.5, rng.integers(0, height // 4, number_block) * 4 + 1.5),
+        axis=1,
+    ).tolist()
+    motion_vectors = rng.integers(-16, 17, (height, width, 4)) / 8
+    motion_vectors[rng.random((height, width)) < 0.2, :2] = 0
+    reference_frame = rng.integers(-1, number_frame, (height, width, 2))
+
+    matches = _av1_match(coord_block, motion_vectors, reference_frame, MatchStore(), frame_number)
+
+    result = np.stack(
+        [matches[column] for column in MatchStore.COLUMNS[:6]],
+        axis=1,
+    )
+    expected_output = _av1_match_reference(coord_block, motion_vectors, reference_frame, frame_number)
+
+    assert len(expected_output) > 0
+    assert sorted(result.tolist()) == sorted(expected_output)
+
+
+def test__av1_match_single_reference():
+
+    # The second reference of the block is unused (-1): only the first one is matched,
+    # even though the lookup maps -1 to the last order hint.
+    reference_frame = MiGrid(np.tile(np.array([2, -1], dtype=np.int8), (4, 4, 1)), lookup=[6, 5, 4, 3, 2, 1, 0, 9])
+    motion_vectors = np.tile([1, 1, 2, 2], (16, 16, 1))
+
+    matches = _av1_match([[5.5, 5.5]], motion_vectors, reference_frame, MatchStore(), 6)
+
+    result = np.stack([matches[column] for column in MatchStore.COLUMNS[:6]], axis=1)
+
+    assert sorted(result.tolist()) == [[4, 6, 6, 5, 6, 6], [4, 6, 6, 6, 5, 5], [5, 6, 6, 6, 5, 5]]
+
+
+@pytest.mark.parametrize(
+    "input, out_of_bounds, expected_output",
+    FeaturesTestConfig._av1_convert_matches
+)
+def test__av1_convert_matches(input, out_of_bounds, expected_output, tmp_path):
+
+    # Block maps of 4x8 pixels where the block index is 100 * frame + 10 * y + x.
+    with BlockMapWriter(block_map_store_path(str(tmp_path))) as writer:
+        for frame_number in range(3):
+            writer.write(frame_number, 100 * frame_number + 10 * np.arange(4)[:, None] + np.arange(8)[None, :])
+
+    matches = MatchStore()
+    matches.extend(**dict(zip(MatchStore.COLUMNS[:6], np.array(input).T)))
+
+    # Block maps bigger than the budget: every load is a decode.
+    cache = BlockMapCache(max_bytes=0)
+    frame_numbers = np.union1d(matches["source_frame"], matches["target_frame"])
+
+    matches = _av1_convert_matches(str(tmp_path), matches, cache, out_of_bounds)
+
+    assert matches.data.T.tolist() == expected_output
+
+    # Every block map is decoded once, for the sources and the targets.
+    assert cache.misses == len(frame_numbers)
+
+    with pytest.raises(ValueError):
+        _av1_convert_matches(str(tmp_path), matches, BlockMapCache(), "wrap")
+
+
+@pytest.mark.parametrize(
+    "input, expected_output",
+    FeaturesTestConfig._av1_propagate_matches
+)
+def test__av1_propagate_matches(input, expected_output):
+
+    source_frame, target_frame, feature_id, feature_id_target = np.array(input).T
+
+    matches = MatchStore()
+    matches.extend(
+        source_frame=source_frame,
+        target_frame=target_frame,
+        feature_id=feature_id,
+        feature_id_target=feature_id_target,
+    )
+
+    matches = _av1_propagate_matches(matches)
+
+    result = np.stack(
+        (matches["source_frame"], matches["target_frame"], matches["feature_id"], matches["feature_id_target"]),
+        axis=1,
+    )
+
+    assert sorted(result.tolist()) == expected_output
+
+
+def test_block_map_cache(tmp_path):
+
+    store_path = block_map_store_path(str(tmp_path))
+    with BlockMapWriter(store_path) as writer:
+        for frame_number in range(3):
+            writer.write(frame_number, np.full((4, 8), frame_number, dtype=np.int64))
+
+    # Room for two block maps of 256 bytes.
+    cache = BlockMapCache(max_bytes=512)
+
+    assert cache.load(store_path, 0)[0, 0] == 0
+    assert cache.load(store_path, 1)[0, 0] == 1
+    assert cache.load(store_path, 0)[0, 0] == 0
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.bytes_resident == 512
+
+    # Frame 1 is the least recently used block map, so it is evicted.
+    cache.load(store_path, 2)
+    cache.load(store_path, 0)
+    cache.load(store_path, 1)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.hit_rate == 2 / 6
+    assert cache.bytes_resident == 512
+
+    # Only the last block map bigger than the budget is kept, outside of the budget.
+    cache = BlockMapCache(max_bytes=128)
+    assert cache.load(store_path, 2)[0, 0] == 2
+    assert cache.load(store_path, 2)[0, 0] == 2
+    cache.load(store_path, 1)
+    cache.load(store_path, 2)
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.bytes_resident == 0
+
+
+def test__flush_matches(tmp_path):
+
+    # Window with the block maps of frames 2 to 4 (block index is 10 * frame + x).
+    block_maps = {frame_number: np.tile(10 * frame_number + np.arange(4), (2, 1)) for frame_number in range(2, 5)}
+
+    pending = MatchStore()
+    pending.extend(
+        source_frame=[2, 3, 1, 4],
+        source_x=[0, 1, 2, 3],
+        source_y=0,
+        target_frame=[4, 6, 3, 5],
+        target_x=[1, 2, 3, 0],
+        target_y=1,
+    )
+
+    with MatchWriter(f"{tmp_path}/matches.bin") as writer:
+        pending, dropped = _flush_matches(pending, block_maps, writer, "drop")
+
+    # 2 -> 4 is converted, 1 -> 3 left the window, 3 -> 6 and 4 -> 5 wait for their target.
+    assert dropped == 1
+    assert pending["source_frame"].tolist() == [3, 4]
+
+    written = MatchStore.load(f"{tmp_path}/matches.bin")
+    assert written["feature_id"].tolist() == [20]
+    assert written["feature_id_target"].tolist() == [41]
+
+
+@pytest.mark.parametrize(
+    "blockSizes",
+    FeaturesTestConfig._extract_frames
+)
+def test__extract_frames(blockSizes, tmp_path):
+
+    frames = [{"frame": frame_number, "blockSize": blockSize} for frame_number, blockSize in enumerate(blockSizes)]
+
+    outputs = []
+
+    for workers in (1, 2):
+
+        temp_folder = f"{tmp_path}/workers_{workers}"
+        os.makedirs(f"{temp_folder}/images")
+
+        for frame_data in frames:
+            shutil.copy(
+                "src/test/data/get_block_map/images/frame_0.png",
+                f"{temp_folder}/images/frame_{frame_data['frame']}.png"
+            )
+
+        outputs.append((temp_folder, list(_extract_frames(iter(frames), temp_folder, workers, feat_files=True))))
+
+    (sequential_folder, sequential), (parallel_folder, parallel) = outputs
+
+    # Frames come back in order with the same block maps, block centers, block areas, keypoints and files.
+    assert [frame_data["frame"] for frame_data, *_ in parallel] == list(range(len(frames)))
+
+    for (_, *result), (_, *result_parallel) in zip(sequential, parallel):
+        block_map, coord_block, block_areas, keypoints = result
+        block_map_parallel, coord_block_parallel, block_areas_parallel, keypoints_parallel = result_parallel
+        assert np.array_equal(block_map, block_map_parallel)
+        assert coord_block == coord_block_parallel
+        assert np.array_equal(block_areas, block_areas_parallel)
+        assert np.array_equal(keypoints, keypoints_parallel)
+
+    for frame_data in frames:
+
+        name = f"frame_{frame_data['frame']}.feat"
+        with open(f"{sequential_folder}/{name}", "rb") as sequential_file:
+            with open(f"{parallel_folder}/{name}", "rb") as parallel_file:
+                assert sequential_file.read() == parallel_file.read()
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="Shared memory blocks are listed in /dev/shm.")
+def test__extract_frames_closed_early(tmp_path):
+
+    frames = [{"frame": frame_number, "blockSize": [[3, 3], [3, 3]]} for frame_number in range(8)]
+    image_paths = ["src/test/data/get_block_map/images/frame_0.png"] * len(frames)
+
+    before = set(os.listdir("/dev/shm"))
+
+    # Frames still in flight when the iterator is closed release their shared memory.
+    with ImageFrameSource(image_paths) as frame_source:
+        extracted = _extract_frames(iter(frames), str(tmp_path), 2, frame_source=frame_source)
+        next(extracted)
+        extracted.close()
+
+    assert set(os.listdir("/dev/shm")) <= before
+
+
+@pytest.mark.parametrize(
+    "blockSizes",
+    FeaturesTestConfig._extract_frames
+)
+def test__extract_frames_frame_source(blockSizes, tmp_path):
+
+    frames = [{"frame": frame_number, "blockSize": blockSize} for frame_number, blockSize in enumerate(blockSizes)]
+
+    # Reference: images read from the temporary folder.
+    os.makedirs(f"{tmp_path}/images")
+    for frame_data in frames:
+        shutil.copy(
+            "src/test/data/get_block_map/images/frame_0.png",
+            f"{tmp_path}/images/frame_{frame_data['frame']}.png"
+        )
+
+    expected = list(_extract_frames(iter(frames), str(tmp_path)))
+
+    # The frame source gives the images, the temporary folder has none.
+    image_paths = ["src/test/data/get_block_map/images/frame_0.png"] * len(frames)
+
+    for workers in (1, 2):
+        with ImageFrameSource(image_paths) as frame_source:
+            result = list(_extract_frames(iter(frames), f"{tmp_path}/empty", workers, frame_source=frame_source))
+
+        for (_, *frame_result), (_, *frame_expected) in zip(result, expected):
+            assert np.array_equal(frame_result[0], frame_expected[0])
+            assert np.array_equal(frame_result[3], frame_expected[3])
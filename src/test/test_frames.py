@@ -0,0 +1,60 @@
+'''
+ # @ : test_frames.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the frames module.
+ '''
+
+import cv2
+import numpy as np
+import pytest
+
+from ..modules.frames import ImageFrameSource
+from ..modules.frames import VideoFrameSource
+from ..modules.io import get_image_paths
+
+
+def test_image_frame_source():
+
+    image_paths = get_image_paths("src/test/data/images/png/")[:6]
+
+    with ImageFrameSource(image_paths, workers=2, prefetch=2) as frame_source:
+
+        # In order, then skipping frames and going back.
+        for frame_number in (0, 1, 4, 2, 5):
+            image = cv2.cvtColor(cv2.imread(image_paths[frame_number]), cv2.COLOR_BGR2GRAY)
+            assert np.array_equal(frame_source.read(frame_number), image)
+
+        with pytest.raises(IndexError):
+            frame_source.read(len(image_paths))
+
+
+def test_video_frame_source():
+
+    video_path = "src/test/data/000046.avi"
+
+    capture = cv2.VideoCapture(video_path)
+    expected = [cv2.cvtColor(capture.read()[1], cv2.COLOR_BGR2GRAY) for _ in range(4)]
+    capture.release()
+
+    with VideoFrameSource(video_path) as frame_source:
+
+        # The video is decoded again from the start to go back.
+        for frame_number in (0, 1, 3, 2):
+            image = frame_source.read(frame_number)
+            assert image.dtype == np.uint8
+            assert np.array_equal(image, expected[frame_number])
+
+        with pytest.raises(IndexError):
+            frame_source.read(10**6)
+
+
+def test_video_frame_source_not_a_video():
+
+    with pytest.raises(ValueError):
+        VideoFrameSource("src/test/data/get_block_map/frame_0_ref.feat").read(0)
@@ -12,11 +12,16 @@
 
 import os
 import shutil
+import subprocess
+import sys
 import pytest
 
 from ..modules.io import check_ivf_file
 from ..modules.io import copy_images
+from ..modules.io import get_ingested_images
 from ..modules.io import get_image_paths
+from ..modules.io import pipe_commands
+from ..modules.io import write_image_manifest
 from .config.io_test_config import IoTestConfig
 
 
@@ -58,4 +63,73 @@ def test_copy_images(input_path, expected_result):
 def test_get_image_paths(input_path, expected_result):
     result = get_image_paths(input_path)
 
-    assert result == expected_result
\ No newline at end of file
+    assert result == expected_result
+
+def test_pipe_commands(tmp_path):
+
+    # More data than the pipe buffer, so both processes have to run concurrently.
+    size = 8 * 2**20
+    source = [sys.executable, "-c", f"import sys; sys.stdout.buffer.write(bytes({size}))"]
+    sink = [sys.executable, "-c", f"import sys; open('{tmp_path}/size', 'w').write(str(len(sys.stdin.buffer.read())))"]
+
+    pipe_commands(source, sink)
+
+    assert open(f"{tmp_path}/size").read() == str(size)
+
+
+def test_pipe_commands_failure():
+
+    source = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(bytes(2**20))"]
+    sink = [sys.executable, "-c", "import sys; sys.exit(3)"]
+
+    with pytest.raises(subprocess.CalledProcessError):
+        pipe_commands(source, sink)
+
+
+@pytest.mark.parametrize(
+    "mode, hard_link, symbolic_link",
+    IoTestConfig.copy_images_modes
+)
+def test_copy_images_modes(tmp_path, mode, hard_link, symbolic_link):
+
+    # Input images on the same filesystem as the output folder, so they can be hard linked.
+    shutil.copytree("src/test/data/images/png/", f"{tmp_path}/input")
+    image_paths = get_image_paths(f"{tmp_path}/input")[:3]
+
+    copy_images(image_paths, str(tmp_path), mode=mode)
+
+    for index, image_path in enumerate(image_paths):
+        dest_path = f"{tmp_path}/images/frame_{index:04d}.png"
+
+        assert open(dest_path, "rb").read() == open(image_path, "rb").read()
+        assert os.path.islink(dest_path) == symbolic_link
+        assert (os.stat(dest_path).st_ino == os.stat(image_path).st_ino) == (hard_link or symbolic_link)
+
+
+def test_copy_images_many(tmp_path):
+
+    os.makedirs(f"{tmp_path}/input")
+    image_paths = [f"{tmp_path}/input/{index:05d}.png" for index in range(10001)]
+    for image_path in image_paths:
+        open(image_path, "wb").close()
+
+    copy_images(image_paths, f"{tmp_path}/output")
+
+    # The names are padded to the number of frames, so they still sort in order.
+    assert get_ingested_images(f"{tmp_path}/output")[-2:] == [
+        f"{tmp_path}/output/images/frame_09999.png",
+        f"{tmp_path}/output/images/frame_10000.png",
+    ]
+
+
+def test_image_manifest(tmp_path):
+
+    image_paths = get_image_paths("src/test/data/images/png/")[:3]
+    os.makedirs(f"{tmp_path}/it's")
+    shutil.copy2(image_paths[0], f"{tmp_path}/it's/frame.png")
+    image_paths.append(f"{tmp_path}/it's/frame.png")
+
+    write_image_manifest(image_paths, str(tmp_path))
+
+    assert not os.path.exists(f"{tmp_path}/images")
+    assert get_ingested_images(str(tmp_path)) == [os.path.abspath(path) for path in image_paths]
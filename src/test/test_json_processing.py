@@ -17,22 +17,21 @@ import numpy as np
 import pytest
 
 from ..modules.json_processing import _compute_angle
+from ..modules.json_processing import _compute_angles
+from ..modules.json_processing import _json_backend_available
+from ..modules.json_processing import _label_blocks
+from ..modules.json_processing import _label_blocks_scan
+from ..modules.json_processing import MiGrid
+from ..modules.json_processing import block_id_dtype
+from ..modules.json_processing import gaussian_kernel_cache_info
 from ..modules.json_processing import get_block_map
-from ..modules.json_processing import get_frame_ref_index
 from ..modules.json_processing import get_motion_vectors
 from ..modules.json_processing import get_reference_frame
+from ..modules.json_processing import parse_frames
 
 from .config.json_processing_test_config import JsonProcessingTestConfig
 
 
-@pytest.mark.parametrize(
-    "input_path, expected_output", 
-    JsonProcessingTestConfig.get_frame_ref_index
-)
-def test_get_frame_ref_index(input_path, expected_output):
-    assert get_frame_ref_index(input_path) == expected_output
-
-
 @pytest.mark.parametrize(
     "input, expected_output",
     JsonProcessingTestConfig.get_motion_vectors
@@ -44,6 +43,39 @@ def test_get_motion_vectors(input, expected_output):
     assert np.array_equal(get_motion_vectors(frame_data), expected_output)
 
 
+@pytest.mark.parametrize(
+    "shape, seed",
+    JsonProcessingTestConfig.mi_grid
+)
+def test_mi_grid(shape, seed):
+
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-64, 64, size=shape)
+
+    grid = MiGrid(values)
+    field = cv2.resize(values.astype(np.float64), (shape[1] * 4, shape[0] * 4), interpolation=cv2.INTER_NEAREST)
+    field = field.reshape(grid.shape)
+
+    assert grid.shape == field.shape
+    assert np.array_equal(np.asarray(grid), field)
+
+    pixel_y = rng.integers(0, field.shape[0], size=100)
+    pixel_x = rng.integers(0, field.shape[1], size=100)
+
+    # Gathers by coordinates read the grid cells, slices the full-resolution field.
+    assert np.array_equal(grid[pixel_y, pixel_x], field[pixel_y, pixel_x])
+    assert np.array_equal(grid[int(pixel_y[0]), int(pixel_x[0])], field[pixel_y[0], pixel_x[0]])
+    assert np.array_equal(grid[1:7, 2], field[1:7, 2])
+
+
+@pytest.mark.parametrize(
+    "number_block, expected_output",
+    JsonProcessingTestConfig.block_id_dtype
+)
+def test_block_id_dtype(number_block, expected_output):
+    assert block_id_dtype(number_block) == expected_output
+
+
 @pytest.mark.parametrize(
     "input, order_hint, expected_output",
     JsonProcessingTestConfig.get_reference_frame
@@ -69,6 +101,53 @@ def test__compute_angle(input_path, expected_output):
     assert interval_result
 
 
+@pytest.mark.parametrize(
+    "input_paths, expected_output",
+    JsonProcessingTestConfig._compute_angles
+)
+def test__compute_angles(input_paths, expected_output):
+
+    images = [cv2.cvtColor(cv2.imread(input_path), cv2.COLOR_BGR2GRAY) for input_path in input_paths]
+
+    # Place all the patches side by side in a single image.
+    sizes = np.array([image.shape[0] for image in images])
+    x_patch = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    y_patch = np.zeros(len(images), dtype=int)
+
+    mosaic = np.zeros((sizes.max(), sizes.sum()), dtype=np.uint8)
+    for image, x, size in zip(images, x_patch, sizes):
+        mosaic[:size, x:x+size] = image
+
+    angles = np.rad2deg(_compute_angles(mosaic, x_patch, y_patch, sizes))
+
+    assert np.all(np.abs(angles - np.array(expected_output)) < 0.1)
+
+    # Same orientation as the per-block implementation.
+    angles_ref = np.rad2deg([_compute_angle(image, size) for image, size in zip(images, sizes)])
+    difference = np.abs(angles - angles_ref) % 180
+
+    assert np.all(np.minimum(difference, 180 - difference) < 1e-6)
+
+
+@pytest.mark.parametrize(
+    "sizes",
+    JsonProcessingTestConfig.gaussian_kernel_cache_info
+)
+def test_gaussian_kernel_cache_info(sizes):
+
+    image = np.random.default_rng(0).integers(0, 255, (128, 128 * len(sizes)), dtype=np.uint8)
+    x_patch = 128 * np.arange(len(sizes))
+    y_patch = np.zeros(len(sizes), dtype=int)
+
+    cache_info = gaussian_kernel_cache_info()
+    _compute_angles(image, x_patch, y_patch, np.array(sizes))
+    cache_info_after = gaussian_kernel_cache_info()
+
+    # AV1 block sizes never rebuild a kernel.
+    assert cache_info_after.misses == cache_info.misses
+    assert cache_info_after.hits == cache_info.hits + len(set(sizes))
+
+
 @pytest.mark.parametrize(
     "blockSize, temp_folder, frame_number, feat_path, block_map_path, coord_ref",
     JsonProcessingTestConfig.get_block_map
@@ -80,12 +159,17 @@ def test_get_block_map(blockSize, temp_folder, frame_number, feat_path, block_ma
         "blockSize": blockSize
     }
 
-    block_map, coord_test = get_block_map(metadata, temp_folder)
+    block_map, coord_test, block_areas, keypoints = get_block_map(metadata, temp_folder)
     
     block_map_ref = np.load(block_map_path)
 
     assert np.array_equal(block_map, block_map_ref)
     assert np.array_equal(coord_test, coord_ref)
+    assert np.array_equal(block_areas, np.bincount(block_map_ref.ravel()))
+
+    # Keypoints hold the same values as the lines of the .feat file.
+    feat_values = np.loadtxt(f"{temp_folder}/frame_{frame_number}.feat", dtype=np.float32, ndmin=2)
+    assert np.allclose(keypoints.view(np.float32).reshape(-1, 4), feat_values, atol=1e-5)
 
     # check that both feat files are identical
     with open(feat_path, "r") as feat_file:
@@ -97,3 +181,43 @@ def test_get_block_map(blockSize, temp_folder, frame_number, feat_path, block_ma
     assert feat_ref == feat_test
 
     os.remove("src/test/data/get_block_map/frame_0.feat")
+
+
+@pytest.mark.parametrize(
+    "blockSize",
+    JsonProcessingTestConfig._label_blocks
+)
+def test__label_blocks(blockSize):
+
+    block_size_data = np.array(blockSize)
+
+    labels, origin_y, origin_x = _label_blocks(block_size_data)
+    labels_ref, origin_y_ref, origin_x_ref = _label_blocks_scan(block_size_data)
+
+    assert np.array_equal(labels, labels_ref)
+    assert np.array_equal(origin_y, origin_y_ref)
+    assert np.array_equal(origin_x, origin_x_ref)
+
+
+@pytest.mark.parametrize(
+    "backend, json_text, expected_output",
+    JsonProcessingTestConfig.parse_frames
+)
+def test_parse_frames(backend, json_text, expected_output, tmp_path):
+
+    if backend != "auto" and not _json_backend_available(backend):
+        pytest.skip(f"JSON backend {backend} not installed.")
+
+    json_path = f"{tmp_path}/video.json"
+    with open(json_path, "w", encoding="utf-8") as json_file:
+        json_file.write(json_text)
+
+    frames = list(parse_frames(json_path, backend))
+
+    assert len(frames) == len(expected_output)
+
+    for frame_metadata, expected_frame in zip(frames, expected_output):
+        assert frame_metadata["frame"] == expected_frame["frame"]
+        assert frame_metadata["config"] == {"MI_SIZE": 4}
+        for key in ["blockSize", "motionVectors", "referenceFrame"]:
+            assert np.array_equal(np.asarray(frame_metadata[key]), expected_frame[key])
@@ -0,0 +1,48 @@
+'''
+ # @ : test_keypoints.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the keypoints module.
+ '''
+
+import os
+
+import numpy as np
+
+from ..modules.keypoints import KEYPOINT_DTYPE
+from ..modules.keypoints import KeypointStore
+from ..modules.keypoints import KeypointWriter
+
+
+def test_keypoint_store(tmp_path):
+
+    rng = np.random.default_rng(0)
+
+    keypoints = {}
+    for frame_number, count in ((2, 5), (0, 0), (1, 3)):
+        keypoints[frame_number] = np.zeros(count, dtype=KEYPOINT_DTYPE)
+        for field in KEYPOINT_DTYPE.names:
+            keypoints[frame_number][field] = rng.random(count)
+
+    path = f"{tmp_path}/keypoints.bin"
+    with KeypointWriter(path) as writer:
+        for frame_number, frame_keypoints in keypoints.items():
+            writer.write(frame_number, frame_keypoints)
+
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    store = KeypointStore(path)
+
+    assert len(store) == 3
+    assert store.frame_numbers.tolist() == [2, 0, 1]
+    assert 1 in store and 3 not in store
+
+    for frame_number, frame_keypoints in keypoints.items():
+        result = store.read(frame_number)
+        assert result.dtype == KEYPOINT_DTYPE
+        assert np.array_equal(result, frame_keypoints)
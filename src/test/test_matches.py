@@ -0,0 +1,99 @@
+'''
+ # @ : test_matches.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the matches module.
+ '''
+
+import numpy as np
+import pytest
+
+from ..modules.matches import MatchStore
+from ..modules.matches import MatchWriter
+
+from .config.matches_test_config import MatchesTestConfig
+
+
+@pytest.mark.parametrize(
+    "rows, expected_output",
+    MatchesTestConfig.append
+)
+def test_append(rows, expected_output):
+
+    # A capacity of 1 forces the store to grow.
+    matches = MatchStore(capacity=1)
+
+    for row in rows:
+        matches.append(*row)
+
+    assert len(matches) == len(expected_output)
+    assert np.array_equal(matches.data.T, expected_output)
+
+
+@pytest.mark.parametrize(
+    "columns, expected_output",
+    MatchesTestConfig.extend
+)
+def test_extend(columns, expected_output):
+
+    matches = MatchStore(capacity=1)
+    matches.extend(**columns)
+
+    assert np.array_equal(matches.data.T, expected_output)
+
+    with pytest.raises(KeyError):
+        matches.extend(unknown_column=[1])
+
+
+@pytest.mark.parametrize(
+    "rows, expected_output",
+    MatchesTestConfig.unique
+)
+def test_unique(rows, expected_output):
+
+    matches = MatchStore()
+    matches.extend(**dict(zip(MatchStore.COLUMNS, np.array(rows).T)))
+
+    assert np.array_equal(matches.unique().data.T, expected_output)
+
+
+def test_to_pandas():
+
+    matches = MatchStore()
+    matches.extend(source_frame=[0, 1], target_frame=[1, 2])
+
+    dataframe = matches.to_pandas()
+
+    assert list(dataframe.columns) == list(MatchStore.COLUMNS)
+    assert dataframe["target_frame"].tolist() == [1, 2]
+    # The DataFrame is a view of the store.
+    assert np.shares_memory(dataframe["source_frame"].to_numpy(), matches.data)
+
+
+def test_match_writer(tmp_path):
+
+    path = f"{tmp_path}/matches.bin"
+
+    with MatchWriter(path) as writer:
+        for frame_number in range(3):
+            matches = MatchStore()
+            matches.extend(source_frame=frame_number, target_frame=[frame_number + 1, frame_number + 2])
+            writer.write(matches)
+
+    assert writer.number_rows == 6
+
+    matches = MatchStore.load(path)
+
+    assert matches["source_frame"].tolist() == [0, 0, 1, 1, 2, 2]
+    assert matches["target_frame"].tolist() == [1, 2, 2, 3, 3, 4]
+    assert matches["feature_id"].tolist() == [-1] * 6
+
+    chunks = list(MatchStore.load_chunks(path, chunk_rows=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert [chunk["target_frame"].tolist() for chunk in chunks] == [[1, 2, 2, 3], [3, 4]]
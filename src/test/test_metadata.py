@@ -0,0 +1,56 @@
+'''
+ # @ : test_metadata.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the metadata module.
+ '''
+
+import io
+
+import numpy as np
+import pytest
+
+from ..modules.json_processing import get_motion_vectors
+from ..modules.metadata import MetadataCache
+from ..modules.metadata import build_metadata_cache
+
+from .config.metadata_test_config import MetadataTestConfig
+
+
+@pytest.mark.parametrize(
+    "source, json_text, expected_output",
+    MetadataTestConfig.build_metadata_cache
+)
+def test_build_metadata_cache(source, json_text, expected_output, tmp_path):
+
+    json_path = f"{tmp_path}/video.json"
+    with open(json_path, "w", encoding="utf-8") as json_file:
+        json_file.write(json_text)
+
+    if source == "stream":
+        json_path = io.BytesIO(json_text.encode())
+
+    cache_path = build_metadata_cache(json_path, f"{tmp_path}/cache/video.meta")
+
+    metadata = MetadataCache(cache_path)
+
+    assert len(metadata) == len(expected_output)
+    assert metadata.frame_numbers.tolist() == [frame["frame"] for frame in expected_output]
+
+    # Random access, in reverse order.
+    for expected_frame in expected_output[::-1]:
+
+        frame_metadata = metadata.frame(expected_frame["frame"])
+
+        assert frame_metadata.keys() == expected_frame.keys()
+        for key, value in expected_frame.items():
+            assert np.array_equal(frame_metadata[key], value)
+
+    # Frames of the cache can be used as frames of the JSON.
+    frame_metadata = next(iter(metadata))
+    assert np.array_equal(get_motion_vectors(frame_metadata), get_motion_vectors(expected_output[0]))
@@ -0,0 +1,117 @@
+'''
+ # @ : test_pipeline.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the pipeline module.
+ '''
+
+import os
+
+import pytest
+
+from ..modules.pipeline import ArtifactStore
+from ..modules.pipeline import _images_parameters
+from ..modules.pipeline import hash_files
+
+from .config.pipeline_test_config import PipelineTestConfig
+
+
+@pytest.mark.parametrize(
+    "first, second, expected_output",
+    PipelineTestConfig.key
+)
+def test_key(tmp_path, first, second, expected_output):
+
+    store = ArtifactStore(str(tmp_path))
+
+    assert (store.key(*first) == store.key(*second)) == expected_output
+
+
+def run_toy_pipeline(store: ArtifactStore, parameters: dict, runs: list[str]) -> str:
+    """ Chain three stages, every stage appends its name to the file of its input. """
+
+    key, path = None, None
+
+    for stage in ("first", "second", "third"):
+
+        def build(build_path: str, stage=stage, input_path=path) -> None:
+            runs.append(stage)
+            content = open(f"{input_path}/output.txt").read() if input_path else ""
+            with open(f"{build_path}/output.txt", "w") as file:
+                file.write(content + stage)
+
+        key, path = store.run(stage, build, {"value": parameters[stage]}, [key] if key else [])
+
+    return path
+
+
+@pytest.mark.parametrize(
+    "parameters, new_parameters, expected_output",
+    PipelineTestConfig.rerun
+)
+def test_rerun(tmp_path, parameters, new_parameters, expected_output):
+
+    store = ArtifactStore(str(tmp_path))
+
+    runs = []
+    run_toy_pipeline(store, parameters, runs)
+    assert runs == ["first", "second", "third"]
+
+    runs = []
+    path = run_toy_pipeline(store, new_parameters, runs)
+
+    assert runs == expected_output
+    assert open(f"{path}/output.txt").read() == "firstsecondthird"
+
+
+def test_failed_stage(tmp_path):
+
+    store = ArtifactStore(str(tmp_path))
+
+    def build(build_path: str) -> None:
+        open(f"{build_path}/partial.txt", "w").close()
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError):
+        store.run("stage", build)
+
+    # Nothing is left behind, so the stage runs again next time.
+    assert os.listdir(f"{tmp_path}/stage") == []
+
+    _, path = store.run("stage", lambda build_path: None)
+    assert os.path.isdir(path)
+
+
+def test_hash_files(tmp_path):
+
+    for name, content in (("a.png", b"first"), ("b.png", b"second"), ("c.png", b"first")):
+        with open(f"{tmp_path}/{name}", "wb") as file:
+            file.write(content)
+
+    # Only the content matters, not the names.
+    assert hash_files([f"{tmp_path}/a.png"]) == hash_files([f"{tmp_path}/c.png"])
+    assert hash_files([f"{tmp_path}/a.png", f"{tmp_path}/b.png"]) != hash_files([f"{tmp_path}/b.png", f"{tmp_path}/a.png"])
+    assert hash_files([f"{tmp_path}/a.png"]) != hash_files([f"{tmp_path}/b.png"])
+
+
+@pytest.mark.parametrize(
+    "ingestion, expected_output",
+    PipelineTestConfig.images_parameters
+)
+def test_images_parameters(tmp_path, ingestion, expected_output):
+
+    for folder in ("first", "second"):
+        os.makedirs(f"{tmp_path}/{folder}")
+        with open(f"{tmp_path}/{folder}/image.png", "wb") as file:
+            file.write(b"image")
+
+    # The same images in another folder: the key only changes if the images stage points to them.
+    first = _images_parameters([f"{tmp_path}/first/image.png"], ingestion, 60)
+    second = _images_parameters([f"{tmp_path}/second/image.png"], ingestion, 60)
+
+    assert (first != second) == expected_output
@@ -0,0 +1,109 @@
+'''
+ # @ : test_sfm.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the sfm module.
+ '''
+
+import itertools
+
+import numpy as np
+import pytest
+
+from ..modules.block_maps import BlockMapWriter
+from ..modules.block_maps import block_map_store_path
+from ..modules.matches import MatchStore
+from ..modules.sfm import image_adjacency_matrix
+from ..modules.sfm import keyframe_pairs
+from ..modules.sfm import observed_window
+from ..modules.sfm import select_keyframes
+
+from .config.sfm_test_config import SfmTestConfig
+
+
+@pytest.mark.parametrize(
+    "seed, number_frame, number_match, threshold",
+    SfmTestConfig.image_adjacency_matrix
+)
+def test_image_adjacency_matrix(seed, number_frame, number_match, threshold, tmp_path):
+
+    rng = np.random.default_rng(seed)
+
+    # Frames of 16x16 pixels made of 8 horizontal blocks of increasing heights.
+    heights = np.array([1, 1, 1, 2, 2, 2, 3, 4])
+    block_map = np.repeat(np.arange(8), heights)[:, None].repeat(16, axis=1)
+
+    with BlockMapWriter(block_map_store_path(str(tmp_path))) as writer:
+        for frame_number in range(number_frame):
+            writer.write(frame_number, block_map)
+
+    matches = MatchStore()
+    matches.extend(
+        source_frame=rng.integers(0, number_frame, size=number_match),
+        target_frame=rng.integers(0, number_frame, size=number_match),
+        feature_id=rng.integers(0, 8, size=number_match),
+    )
+
+    (indptr, indices, coverage), pairs = image_adjacency_matrix(matches, threshold, str(tmp_path))
+
+    # Reference: every pair of frames, one by one.
+    expected_pairs = []
+    expected_coverage = []
+    for source, target in itertools.combinations(range(number_frame), 2):
+        rows = (matches["source_frame"] == source) & (matches["target_frame"] == target)
+        pair_coverage = heights[np.unique(matches["feature_id"][rows])].sum() * 100 / 16
+        if pair_coverage >= threshold:
+            expected_pairs.append([source, target])
+            expected_coverage.append(pair_coverage)
+
+    assert pairs.tolist() == expected_pairs
+    assert np.allclose(coverage, expected_coverage)
+
+    # CSR rows are the source frames.
+    assert len(indptr) == number_frame + 1
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    assert np.array_equal(np.stack((rows, indices), axis=1).reshape(-1, 2), pairs.reshape(-1, 2))
+
+    # The windowed mode keeps the pairs of frames close enough.
+    _, window_pairs = image_adjacency_matrix(matches, threshold, str(tmp_path), window=2)
+    assert window_pairs.tolist() == [pair for pair in expected_pairs if pair[1] - pair[0] <= 2]
+
+    # The observed window is the largest frame distance of the matches before propagation.
+    direct_matches = MatchStore()
+    direct_matches.extend(source_frame=[0, 3, 4], target_frame=[1, 1, 5])
+    assert observed_window(direct_matches) == 2
+
+    _, observed_pairs = image_adjacency_matrix(
+        matches, threshold, str(tmp_path), window="observed", direct_matches=direct_matches
+    )
+    assert observed_pairs.tolist() == window_pairs.tolist()
+
+    with pytest.raises(ValueError):
+        image_adjacency_matrix(matches, threshold, str(tmp_path), window="observed")
+
+
+@pytest.mark.parametrize(
+    "number_frame, pairs, expected_output",
+    SfmTestConfig.select_keyframes
+)
+def test_select_keyframes(number_frame, pairs, expected_output):
+
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(pairs[:, 0], minlength=number_frame))))
+    adjacency = (indptr, pairs[:, 1], np.full(len(pairs), 100.0))
+
+    assert select_keyframes(adjacency).tolist() == expected_output
+
+
+def test_keyframe_pairs():
+
+    pairs = np.array([[0, 1], [0, 3], [1, 2], [3, 5], [4, 5]])
+
+    assert keyframe_pairs(pairs, np.array([0, 3, 5])).tolist() == [[0, 3], [3, 5]]
+    assert keyframe_pairs(pairs, np.array([2])).shape == (0, 2)
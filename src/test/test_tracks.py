@@ -0,0 +1,135 @@
+'''
+ # @ : test_tracks.py
+ # @ Created by: Julien Zouein
+ # @ Create Time: 2026-10-18
+ # @ Copyright: © 2024 Sigmedia.tv. All rights reserved.
+ # @          : © 2024 Julien Zouein (zoueinj@tcd.ie).
+ # @ Modified by: Julien Zouein
+ # @ Modified time: 2026-10-18
+ # @  :----------------------------------------------------------------------------:
+ # @ Description: File used to test the tracks module.
+ '''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..modules.matches import MatchStore
+from ..modules.matches import MatchWriter
+from ..modules.tracks import _connected_components
+from ..modules.tracks import build_tracks
+from ..modules.tracks import stream_tracks
+from ..modules.tracks import tracks_to_matches
+
+from .config.tracks_test_config import TracksTestConfig
+
+
+@pytest.mark.parametrize(
+    "input, conflicts, expected_output",
+    TracksTestConfig.build_tracks
+)
+def test_build_tracks(input, conflicts, expected_output):
+
+    source_frame, target_frame, feature_id, feature_id_target = np.array(input).T
+
+    matches = MatchStore()
+    matches.extend(
+        source_frame=source_frame,
+        target_frame=target_frame,
+        feature_id=feature_id,
+        feature_id_target=feature_id_target,
+    )
+
+    tracks = build_tracks(matches, conflicts)
+
+    result = [
+        list(zip(track["frame"].tolist(), track["feature_id"].tolist()))
+        for _, track in tracks.groupby("track_id")
+    ]
+
+    assert sorted(result) == sorted(expected_output)
+
+
+@pytest.mark.parametrize(
+    "max_pairs, expected_output",
+    TracksTestConfig.tracks_to_matches
+)
+def test_tracks_to_matches(max_pairs, expected_output):
+
+    # A track over frames 0 to 4, with two observations of frame 2.
+    tracks = pd.DataFrame({
+        "track_id": [0, 0, 0, 0, 0, 0],
+        "frame": [0, 1, 2, 2, 3, 4],
+        "feature_id": [10, 20, 30, 31, 40, 50],
+        "x": [0, 1, 2, 3, 4, 5],
+        "y": [0, 1, 2, 3, 4, 5],
+    })
+
+    matches = tracks_to_matches(tracks, max_pairs)
+
+    result = list(zip(matches["feature_id"].tolist(), matches["feature_id_target"].tolist()))
+
+    assert sorted(result) == sorted(expected_output)
+
+
+@pytest.mark.parametrize("conflicts", ["keep", "split"])
+def test_stream_tracks(tmp_path, conflicts):
+
+    rng = np.random.default_rng(0)
+
+    # Matches written while streaming 100 frames with a window of 5 frames: every
+    # frame is matched with the 4 previous ones.
+    window = 5
+    source_frame = np.repeat(np.arange(100), 20)
+    target_frame = source_frame - rng.integers(1, window, len(source_frame))
+    keep = target_frame >= 0
+
+    matches = MatchStore()
+    matches.extend(
+        source_frame=source_frame[keep],
+        target_frame=target_frame[keep],
+        feature_id=rng.integers(0, 64, len(source_frame))[keep],
+        feature_id_target=rng.integers(0, 64, len(source_frame))[keep],
+    )
+
+    with MatchWriter(f"{tmp_path}/direct_matches.bin") as writer:
+        writer.write(matches)
+
+    number_track = stream_tracks(
+        f"{tmp_path}/direct_matches.bin", f"{tmp_path}/matches.bin", window, conflicts, chunk_rows=50
+    )
+
+    tracks = build_tracks(matches, conflicts)
+    expected = tracks_to_matches(tracks)
+    result = MatchStore.load(f"{tmp_path}/matches.bin")
+
+    def rows(matches):
+        return sorted(map(tuple, matches.data[[0, 6, 3, 7]].T.tolist()))
+
+    assert number_track == tracks["track_id"].nunique()
+    assert rows(result) == rows(expected)
+
+
+def test__connected_components():
+
+    rng = np.random.default_rng(0)
+
+    number_node = 1000
+    source = rng.integers(0, number_node, 700)
+    target = rng.integers(0, number_node, 700)
+
+    roots = _connected_components(number_node, source, target)
+
+    # Reference: sequential union-find.
+    parent = list(range(number_node))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for u, v in zip(source.tolist(), target.tolist()):
+        root_u, root_v = find(u), find(v)
+        parent[max(root_u, root_v)] = min(root_u, root_v)
+
+    assert roots.tolist() == [find(node) for node in range(number_node)]